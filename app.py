@@ -1,85 +1,444 @@
 # app.py
-from flask import Flask, jsonify, send_file
+from flask import Flask, abort, g, jsonify, make_response, request, send_file
+import math
 import os
+import shutil
+import threading
+import time
+import uuid
+from modules import instrumentation
+from modules.uploads import MAX_UPLOAD_BYTES
 
-# --- Import all modules ---
-from modules.dicom_metadata.dicom_extractor import extract_dicom_metadata
-from modules.dna_analyzer import analyze_dna
-from modules.sample_dna import generate_sample_dna
-from modules.dose_response.dose_response_fitter import fit_dose_response
-from modules.dose_response.sample_dose_response import generate_sample_dose_response
-from modules.ecg_analyzer import analyze_ecg
-from modules.ecg_generator import generate_ecg
-from modules.stat_analysis.stats_analyzer import analyze_clinical_data
-from modules.stat_analysis.sample_clinical import generate_sample_clinical_data
-
-# --- Create folders ---
-PLOT_FOLDER = "static/plots"
-os.makedirs(PLOT_FOLDER, exist_ok=True)
+# Tool modules are imported inside their routes: a worker only loads pandas,
+# scipy, matplotlib, Bio or pydicom once a request needs them.
+
+# --- DICOM metadata index ---
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+DICOM_ROOT = os.environ.get("DICOM_ROOT", os.path.join(APP_DIR, "modules", "dicom_metadata"))
+DICOM_INDEX_FILE = os.environ.get("DICOM_INDEX_FILE", "dicom_index.sqlite")
+DICOM_INDEX_REFRESH_SEC = 60
+DICOM_QUERY_LIMIT = 100  # records per /dicom_metadata response unless ?limit= is given
+MAX_DICOM_QUERY_LIMIT = 1000  # larger ?limit= values are clamped to this
+_dicom_index_refreshed_at = 0.0
+_dicom_index_lock = threading.Lock()  # one index update (SQLite writer) at a time
+
+# --- Clinical statistics (incremental, seeded from the sample dataset) ---
+CLINICAL_DATA_FILE = "sample_clinical_data.csv"
+CLINICAL_STATS = None  # ClinicalAccumulator, created on first request
+CLINICAL_GROUPS = ("Treatment", "Control")
+_clinical_lock = threading.Lock()
+
+# --- Job queue (bounded process pool + content-addressed result cache) ---
+JOB_FOLDER = os.path.join("static", "jobs")
+JOB_WAIT_SEC = 60  # GET routes wait this long before answering with the job id
+JOB_QUEUE = None  # JobQueue, created on first job
+_job_lock = threading.Lock()
+# Largest resample counts a request may ask for (larger values answer 400)
+MAX_N_BOOT = 100_000
+MAX_N_PERMUTATIONS = 100_000
+
+# --- Uploads (streamed to disk; limits in modules/uploads.py) ---
+MAX_CONCURRENT_UPLOADS = 4
+_upload_slots = threading.BoundedSemaphore(MAX_CONCURRENT_UPLOADS)
+
+# --- Instrumentation (INSTRUMENTATION=1; see modules/instrumentation.py) ---
+# Requests with ?profile=1 are run under cProfile (reports in PROFILE_FOLDER,
+# jobs add profile.txt to their files)
+PROFILE_FOLDER = os.path.join("static", "profiles")
+PROFILE_FILES = 100
 
 app = Flask(__name__)
+app.config["MAX_CONTENT_LENGTH"] = MAX_UPLOAD_BYTES  # declared sizes are rejected before reading
+
+def record_job(job):
+    """Job metrics, including the stage timings measured in the worker process."""
+    if not instrumentation.enabled():
+        return
+    instrumentation.observe("job_seconds", job.finished_at - job.submitted_at, task=job.task, status=job.status)
+    if job.result is not None and "timings" in job.result:
+        instrumentation.record_trace(job.result["timings"])
+
+def job_queue():
+    global JOB_QUEUE
+    with _job_lock:
+        if JOB_QUEUE is None:
+            from modules.api_tasks import run_task
+            from modules.jobs import JobQueue, ResultCache
+
+            JOB_QUEUE = JobQueue(run_task, cache=ResultCache(JOB_FOLDER), on_finish=record_job)
+    return JOB_QUEUE
+
+@app.before_request
+def start_request_trace():
+    if not instrumentation.enabled():
+        return
+    g.started = time.perf_counter()
+    g.trace_context = instrumentation.trace()
+    g.trace = g.trace_context.__enter__()
+    g.profile = instrumentation.Profile(request.args.get("profile") == "1").__enter__()
+
+@app.after_request
+def finish_request_trace(response):
+    if "trace" not in g:
+        return response
+    elapsed = time.perf_counter() - g.started
+    instrumentation.observe(
+        "http_request_seconds", elapsed,
+        endpoint=request.endpoint or "unknown", method=request.method, status=response.status_code,
+    )
+    g.profile.__exit__(None, None, None)
+    if g.profile.text:
+        name = uuid.uuid4().hex
+        os.makedirs(PROFILE_FOLDER, exist_ok=True)
+        with open(os.path.join(PROFILE_FOLDER, name + ".txt"), "w") as f:
+            f.write(g.profile.text)
+        prune_profiles()
+        response.headers["X-Profile-URL"] = f"/profiles/{name}"
+    elif g.profile.busy:
+        response.headers["X-Profile-URL"] = "busy"
+    stages = instrumentation.server_timing(g.trace)
+    response.headers["Server-Timing"] = ", ".join(filter(None, [stages, f"total;dur={1000 * elapsed:.2f}"]))
+    return response
+
+@app.teardown_request
+def close_request_trace(error=None):
+    if "trace_context" in g:
+        g.profile.__exit__(None, None, None)
+        g.pop("trace_context").__exit__(None, None, None)
+
+def prune_profiles():
+    reports = sorted(os.scandir(PROFILE_FOLDER), key=lambda entry: entry.stat().st_mtime)
+    for entry in reports[: max(len(reports) - PROFILE_FILES, 0)]:
+        os.remove(entry.path)
+
+def staging_dir():
+    """Private folder for a request's input files until they are handed to the job queue."""
+    folder = os.path.join(JOB_FOLDER, "_staging", uuid.uuid4().hex)
+    os.makedirs(folder)
+    return folder
+
+def request_params(types, json_body=True):
+    """
+    Known job parameters from the JSON body (unless json_body=False) or the
+    query string, converted to their types.
+    """
+    body = request.get_json(silent=True) if json_body else None
+    if body is None:
+        body = {}
+    elif not isinstance(body, dict):
+        bad_request("JSON body must be an object")
+    params = {}
+    for name, kind in types.items():
+        value = body.get(name, request.args.get(name))
+        if value is not None:
+            try:
+                params[name] = kind(value)
+            except (TypeError, ValueError):
+                bad_request(f"Invalid value for {name}: {value!r}")
+    return params
+
+def bad_request(message):
+    """Abort with a JSON 400, like the API's other errors."""
+    abort(make_response(jsonify({"error": message}), 400))
+
+def count_param(maximum):
+    """Converter for a resample count: an int in [1, maximum]."""
+    def convert(value):
+        if isinstance(value, (bool, float)):
+            raise TypeError(value)
+        value = int(value)
+        if not 1 <= value <= maximum:
+            raise ValueError(f"must be between 1 and {maximum}")
+        return value
+    return convert
+
+def seed_param(value):
+    """Converter for a random seed: a non-negative int (numpy rejects negative seeds)."""
+    if isinstance(value, (bool, float)):
+        raise TypeError(value)
+    value = int(value)
+    if value < 0:
+        raise ValueError("seed must be non-negative")
+    return value
+
+def ci_method(value):
+    """Validated dose-response CI method (a ValueError becomes a 400)."""
+    from modules.dose_response.dose_response_fitter import check_ci
+
+    return check_ci(value)
+
+def job_info(job):
+    info = job.to_dict()
+    info["status_url"] = f"/jobs/{job.id}"
+    if job.result is not None:
+        # Stage timings are internal: they feed /metrics and Server-Timing
+        info["result"] = {k: v for k, v in job.result.items() if k != "timings"}
+        info["files"] = {name: f"/jobs/{job.id}/files/{name}" for name in job.result.get("files", [])}
+    return info
+
+def submit_job(task, params, files, staging=None):
+    """
+    Queue a task. POST answers 202 with the job id at once; GET waits up to
+    JOB_WAIT_SEC and returns the job (with its result when finished).
+    """
+    from modules.jobs import QueueFull
+
+    if "profile" in g and g.profile.on:
+        params = {**params, "profile": True}
+    try:
+        job = job_queue().submit(task, params, files)
+    except QueueFull as e:
+        return jsonify({"error": str(e)}), 503
+    finally:
+        if staging:
+            shutil.rmtree(staging, ignore_errors=True)
+    if job.cached and "plot_id" in job.result:
+        from modules.plotting import touch_plot
+
+        touch_plot(job.result["plot_id"])  # keeps the plot as long as the cached result
+    if request.method == "GET":
+        job_queue().wait(job, JOB_WAIT_SEC)
+        if job.status == "done":
+            if not job.cached:
+                instrumentation.add_to_trace(job.result.get("timings"))
+            # Same shape as the synchronous API: the result itself, plus links
+            return jsonify({
+                **{k: v for k, v in job.result.items() if k not in ("files", "timings")},
+                "job_id": job.id,
+                "cached": job.cached,
+                **({"profile_url": f"/jobs/{job.id}/files/profile.txt"} if "profile.txt" in job.result["files"] else {}),
+            })
+    return jsonify(job_info(job)), 200 if job.status in ("done", "failed") else 202
 
 # --- Routes ---
 @app.route("/")
 def index():
     return "<h1>Biomedical Engineering Portfolio API</h1>" \
-           "<p>Available routes: /dicom_metadata, /dna_analyzer, /dose_response, /ecg, /clinical_stats</p>"
+           "<p>Available routes: /dicom_metadata?Modality=CT, /dna_analyzer, /dose_response, /ecg, /clinical_stats, " \
+           "/clinical_tests, /upload/&lt;fasta|ecg|dose_response|dicom&gt; (POST), /jobs/&lt;job_id&gt;, /metrics</p>"
+
+# 1. DICOM Metadata (served from the persistent index, refreshed at most once a minute)
+def refresh_dicom_index(force=False):
+    global _dicom_index_refreshed_at
+    from modules.dicom_metadata.dicom_index import update_dicom_index
+    from modules.dicom_metadata.sample_dicom import generate_sample_dicom
+
+    # In-process (workers=1): a request must not start a process pool
+    with _dicom_index_lock:
+        if not force and time.time() - _dicom_index_refreshed_at < DICOM_INDEX_REFRESH_SEC:
+            return
+        summary = update_dicom_index(DICOM_ROOT, db_file=DICOM_INDEX_FILE, workers=1)
+        if summary["files_indexed"] + summary["files_unchanged"] == 0:
+            print(" No DICOM files found, generating a sample one...")
+            os.makedirs(DICOM_ROOT, exist_ok=True)
+            generate_sample_dicom(os.path.join(DICOM_ROOT, "sample.dcm"))
+            update_dicom_index(DICOM_ROOT, db_file=DICOM_INDEX_FILE, workers=1)
+        _dicom_index_refreshed_at = time.time()
 
-# 1. DICOM Metadata
 @app.route("/dicom_metadata")
 def run_dicom_metadata():
-    meta = extract_dicom_metadata()
-    return jsonify(meta)
+    from modules.dicom_metadata.dicom_index import QUERY_FIELDS, query_dicom_index
+
+    refresh_dicom_index(force=request.args.get("refresh") == "1")
+    limit = request.args.get("limit", type=int)
+    if "limit" not in request.args:
+        limit = DICOM_QUERY_LIMIT
+    elif limit is None or limit < 0:
+        return jsonify({"error": "limit must be a non-negative integer"}), 400
+    filters = {field: request.args.get(field) for field in QUERY_FIELDS}
+    records = query_dicom_index(DICOM_INDEX_FILE, limit=min(limit, MAX_DICOM_QUERY_LIMIT), **filters)
+    return jsonify({"count": len(records), "records": records})
 
 # 2. DNA Analyzer
 @app.route("/dna_analyzer")
 def run_dna_analyzer():
+    from modules.dna_analyzer.dna_analyzer import analyze_dna
+    from modules.dna_analyzer.sample_dna import generate_sample_dna
+
     seq = generate_sample_dna(length=60)
     results = analyze_dna(seq)
     results["Generated_Sequence"] = seq
     return jsonify(results)
 
-# 3. Dose-Response Curve Fitter
-@app.route("/dose_response")
+# 3. Dose-Response Curve Fitter (job on a freshly generated sample)
+@app.route("/dose_response", methods=["GET", "POST"])
 def run_dose_response():
-    generate_sample_dose_response()
-    plot_path = os.path.join(PLOT_FOLDER, "dose_response.png")
-    ec50, slope = fit_dose_response(save_path=plot_path)
-    return jsonify({
-        "EC50_uM": ec50,
-        "Hill_Slope": slope,
-        "plot_url": f"/plot/dose_response"
-    })
+    from modules.dose_response.sample_dose_response import generate_sample_dose_response
+
+    params = request_params({"model": str, "ci": ci_method, "n_boot": count_param(MAX_N_BOOT), "seed": seed_param})
+    staging = staging_dir()
+    data_file = os.path.join(staging, "dose_response.csv")
+    generate_sample_dose_response(data_file)
+    return submit_job("dose_response", params, [data_file], staging)
 
-# 4. ECG Analyzer
-@app.route("/ecg")
+# 4. ECG Analyzer (job on a freshly generated record)
+@app.route("/ecg", methods=["GET", "POST"])
 def run_ecg():
-    df, file_path = generate_ecg()
-    plot_path = os.path.join(PLOT_FOLDER, "ecg.png")
-    results = analyze_ecg(file_path=file_path, save_path=plot_path)
-    return jsonify({
-        **results,
-        "plot_url": f"/plot/ecg"
-    })
+    from modules.ecg_simulator.ecg_generator import generate_ecg
+
+    staging = staging_dir()
+    _, file_path = generate_ecg(output_dir=staging)
+    return submit_job("ecg", {}, [file_path], staging)
 
-# Serve plots
+# Job status/results and their output files (tables)
+@app.route("/jobs/<job_id>")
+def get_job(job_id):
+    job = job_queue().get(job_id)
+    if job is None:
+        return jsonify({"error": "Unknown job"}), 404
+    return jsonify(job_info(job)), 200 if job.status in ("done", "failed") else 202
+
+@app.route("/jobs/<job_id>/files/<name>")
+def get_job_file(job_id, name):
+    job = job_queue().get(job_id)
+    path = job_queue().output_file(job, name) if job is not None else None
+    if path is None:
+        return jsonify({"error": "File not found"}), 404
+    return send_file(os.path.abspath(path))
+
+# Serve plots: rendered from the stored plot data on first request, then cached
 @app.route("/plot/<plot_name>")
 def serve_plot(plot_name):
-    plot_file = os.path.join(PLOT_FOLDER, f"{plot_name}.png")
-    if os.path.exists(plot_file):
-        return send_file(plot_file, mimetype="image/png")
-    return jsonify({"error": "Plot not found"})
+    from modules.plotting import render_plot
+
+    plot_file = render_plot(plot_name)
+    if plot_file is None:
+        return jsonify({"error": "Plot not found"}), 404
+    return send_file(os.path.abspath(plot_file), mimetype="image/png")
 
-# 5. Clinical Data Statistics
-@app.route("/clinical_stats")
+# 5. Clinical Data Statistics (served from the running accumulator, no rescan)
+def clinical_rows(body):
+    """
+    Validated (group, measurement) pairs of a POSTed row or list of rows.
+    Raises ValueError on any bad row, before anything is accumulated.
+    """
+    rows = body if isinstance(body, list) else [body]
+    pairs = []
+    for i, row in enumerate(rows):
+        if not isinstance(row, dict) or "Group" not in row or "Measurement" not in row:
+            raise ValueError(f"Row {i}: expected an object with Group and Measurement")
+        if row["Group"] not in CLINICAL_GROUPS:
+            raise ValueError(f"Row {i}: Group must be one of {list(CLINICAL_GROUPS)}")
+        value = row["Measurement"]
+        if isinstance(value, bool) or not isinstance(value, (int, float)) or not math.isfinite(value):
+            raise ValueError(f"Row {i}: Measurement must be a finite number")
+        pairs.append((row["Group"], float(value)))
+    return pairs
+
+@app.route("/clinical_stats", methods=["GET", "POST"])
 def run_clinical_stats():
-    generate_sample_clinical_data()
-    summary, (t_stat, p_val) = analyze_clinical_data()
+    global CLINICAL_STATS
+    from modules.stats_analysis.sample_clinical import generate_sample_clinical_data
+    from modules.stats_analysis.stats_online import ClinicalAccumulator
+    from modules.tabular_io import read_table
+
+    with _clinical_lock:
+        if CLINICAL_STATS is None:
+            CLINICAL_STATS = ClinicalAccumulator()
+        if request.method == "POST":
+            # Body: one {"Group": ..., "Measurement": ...} row or a list of rows
+            try:
+                rows = clinical_rows(request.get_json(force=True))
+            except ValueError as e:
+                return jsonify({"error": str(e)}), 400
+            for group, value in rows:
+                CLINICAL_STATS.update(group, value)
+        elif CLINICAL_STATS.n_rows == 0:
+            if not os.path.exists(CLINICAL_DATA_FILE):
+                generate_sample_clinical_data(CLINICAL_DATA_FILE)
+            CLINICAL_STATS.update_frame(read_table(CLINICAL_DATA_FILE))
+        summary = CLINICAL_STATS.describe()
+        t_stat, p_val = CLINICAL_STATS.ttest()
     return jsonify({
+        "n_rows": CLINICAL_STATS.n_rows,
         "summary": summary.to_dict(),
         "t_statistic": t_stat,
         "p_value": p_val
     })
 
+# 6. Clinical hypothesis tests (permutation + bootstrap; cached per dataset content)
+@app.route("/clinical_tests", methods=["GET", "POST"])
+def run_clinical_tests():
+    from modules.stats_analysis.sample_clinical import generate_sample_clinical_data
+
+    params = {"seed": 0, **request_params({
+        "n_permutations": count_param(MAX_N_PERMUTATIONS),
+        "n_boot": count_param(MAX_N_BOOT),
+        "seed": seed_param,
+    })}
+    if not os.path.exists(CLINICAL_DATA_FILE):
+        generate_sample_clinical_data(CLINICAL_DATA_FILE)
+    staging = staging_dir()
+    data_file = os.path.join(staging, os.path.basename(CLINICAL_DATA_FILE))
+    shutil.copyfile(CLINICAL_DATA_FILE, data_file)
+    return submit_job("clinical_tests", params, [data_file], staging)
+
+# 7. Uploads: the request body (raw, ?filename=..., or multipart field "file")
+# is streamed to disk in chunks and analyzed as a job by the chunked analyzers
+def motif_list(value):
+    motifs = value.split(",") if isinstance(value, str) else value
+    if not isinstance(motifs, list) or not all(isinstance(motif, str) and motif for motif in motifs):
+        raise TypeError("motifs must be a comma-separated string or a list of strings")
+    return motifs
+
+@app.route("/upload/<kind>", methods=["POST"])
+def upload(kind):
+    from werkzeug.exceptions import ClientDisconnected
+    from modules.uploads import UPLOAD_KINDS, UploadError, save_stream, upload_extension
+
+    # Parameters come from the query string (the body is the data) and are
+    # checked before anything is written to disk
+    params = request_params({
+        "model": str,
+        "ci": ci_method,
+        "n_boot": count_param(MAX_N_BOOT),
+        "seed": seed_param,
+        "motifs": motif_list,
+    }, json_body=False)
+    if not _upload_slots.acquire(blocking=False):
+        return jsonify({"error": "Too many uploads in progress; try again later"}), 503
+    staging = staging_dir()
+    try:
+        if request.mimetype == "multipart/form-data":
+            upload_file = request.files.get("file")
+            if upload_file is None:
+                raise UploadError('Multipart uploads need a "file" field')
+            filename, stream = upload_file.filename, upload_file.stream
+        else:
+            filename, stream = request.args.get("filename"), request.stream
+        path = os.path.join(staging, "upload" + upload_extension(kind, filename))
+        size = save_stream(stream, path)
+    except UploadError as e:
+        shutil.rmtree(staging, ignore_errors=True)
+        return jsonify({"error": str(e)}), e.status
+    except ClientDisconnected:  # body cut off, e.g. by the stall timeout
+        shutil.rmtree(staging, ignore_errors=True)
+        return jsonify({"error": "Upload stalled or disconnected"}), 408
+    except Exception:  # e.g. werkzeug's 413 for a declared oversize body
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+    finally:
+        _upload_slots.release()
+    instrumentation.count("upload_bytes", size, kind=kind)
+    return submit_job(UPLOAD_KINDS[kind][0], params, [path], staging)
+
+# Metrics: stage/request/job latency histograms and counters (Prometheus text format)
+@app.route("/metrics")
+def metrics():
+    return app.response_class(instrumentation.render_prometheus(), mimetype="text/plain; version=0.0.4")
+
+@app.route("/profiles/<name>")
+def get_profile(name):
+    path = os.path.join(PROFILE_FOLDER, name + ".txt")
+    if not name.isalnum() or not os.path.isfile(path):
+        return jsonify({"error": "Profile not found"}), 404
+    return send_file(os.path.abspath(path), mimetype="text/plain")
+
 if __name__ == "__main__":
-    app.run(debug=True)
+    from werkzeug.serving import WSGIRequestHandler
+    from modules.uploads import UPLOAD_STALL_SEC
+
+    class RequestHandler(WSGIRequestHandler):
+        timeout = UPLOAD_STALL_SEC  # socket timeout: stalled uploads cannot block a thread
+
+    app.run(debug=True, request_handler=RequestHandler)
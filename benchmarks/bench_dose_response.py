@@ -0,0 +1,107 @@
+# benchmarks/bench_dose_response.py
+"""
+Solver-cost benchmark for batched dose-response fitting.
+
+Fits the same synthetic plate with the legacy fixed starting point
+(p0=[10, 1]) and with data-driven initial estimates for each model, and
+reports wall time, function evaluations and failure rate.
+
+With --ci it also compares the cost of EC50/slope confidence intervals:
+covariance-based, vectorized bootstrap, and a naive bootstrap that calls
+curve_fit once per resample.
+
+Run: python -m benchmarks.bench_dose_response --compounds 1536 --ci
+"""
+import argparse
+import json
+import time
+import numpy as np
+from modules.dose_response.dose_response_batch import fit_curve, fit_dose_response_batch
+from modules.dose_response.sample_dose_response import generate_sample_plate
+
+# (label, model, fixed p0 or None for data-driven estimates)
+CASES = [
+    ("hill, p0=[10, 1]", "hill", [10, 1]),
+    ("hill, estimated p0", "hill", None),
+    ("4pl, estimated p0", "4pl", None),
+    ("5pl, estimated p0", "5pl", None),
+]
+
+
+def measure_fit(df, model, p0, workers=1):
+    t0 = time.perf_counter()
+    results = fit_dose_response_batch(df, workers=workers, model=model, p0=p0)
+    elapsed = time.perf_counter() - t0
+    return {
+        "seconds": elapsed,
+        "curves_per_sec": len(results) / elapsed,
+        "nfev_median": float(results["nfev"].median()),
+        "nfev_mean": float(results["nfev"].mean()),
+        "nfev_total": int(results["nfev"].sum()),
+        "failure_rate": float(1 - results["success"].mean()),
+    }
+
+
+def naive_bootstrap(dose, response, n_boot, seed):
+    """Reference bootstrap: one curve_fit call per resample."""
+    rng = np.random.default_rng(seed)
+    ec50 = []
+    for _ in range(n_boot):
+        idx = rng.integers(0, len(dose), len(dose))
+        ec50.append(fit_curve(dose[idx], response[idx]).get("EC50_uM", np.nan))
+    return np.nanquantile(ec50, [0.025, 0.975])
+
+
+def measure_ci(df, n_curves, n_boot, seed=0):
+    curves = [
+        (group["Dose_uM"].to_numpy(), group["Response_percent"].to_numpy())
+        for _, group in list(df.groupby("Compound"))[:n_curves]
+    ]
+    timings = {}
+    for label, run in [
+        ("covariance", lambda d, r: fit_curve(d, r, ci="covariance")),
+        ("bootstrap, vectorized", lambda d, r: fit_curve(d, r, ci="bootstrap", n_boot=n_boot, seed=seed)),
+        ("bootstrap, naive loop", lambda d, r: naive_bootstrap(d, r, n_boot, seed)),
+    ]:
+        t0 = time.perf_counter()
+        for dose, response in curves:
+            run(dose, response)
+        timings[label] = (time.perf_counter() - t0) / len(curves)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--compounds", type=int, default=1536)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--ci", action="store_true", help="also benchmark confidence intervals")
+    parser.add_argument("--ci-curves", type=int, default=20)
+    parser.add_argument("--n-boot", type=int, default=1000)
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args()
+
+    df = generate_sample_plate(args.compounds, file_path=None)
+    results = []
+    print(f"{'case':<22} {'seconds':>8} {'curves/s':>9} {'nfev med':>9} {'nfev mean':>10} {'failed':>7}")
+    for label, model, p0 in CASES:
+        row = {"case": label, **measure_fit(df, model, p0, args.workers)}
+        results.append(row)
+        print(
+            f"{label:<22} {row['seconds']:>8.2f} {row['curves_per_sec']:>9.0f} {row['nfev_median']:>9.0f} "
+            f"{row['nfev_mean']:>10.1f} {row['failure_rate']:>7.1%}"
+        )
+
+    if args.ci:
+        print(f"\n{'CI method':<22} {'ms/curve':>10}   ({args.n_boot} resamples)")
+        for label, seconds in measure_ci(df, args.ci_curves, args.n_boot).items():
+            results.append({"case": f"ci: {label}", "seconds_per_curve": seconds})
+            print(f"{label:<22} {1000 * seconds:>10.1f}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f" Results saved to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+# benchmarks/bench_ecg_realtime.py
+"""
+Throughput and beat-latency benchmark for the real-time ECG stream.
+
+For each channel count it measures:
+- sustained samples/sec (all channels) with pacing disabled
+- per-beat detection latency (wall clock from the arrival of the beat
+  sample to its detection) while streaming at real-time pace
+
+Run: python -m benchmarks.bench_ecg_realtime --channels 1 12 64 256
+"""
+import argparse
+import json
+import time
+import numpy as np
+from modules.ecg_simulator.ecg_realtime import OnlineRPeakDetector, stream_ecg
+
+
+def measure_throughput(channels, fs=250, packet_size=25, duration=60):
+    detector = OnlineRPeakDetector(fs, channels)
+    n_beats = 0
+    t0 = time.perf_counter()
+    for _, packet in stream_ecg(fs, packet_size, channels, duration, speed=None):
+        n_beats += len(detector.update(packet))
+    elapsed = time.perf_counter() - t0
+    return {
+        "samples_per_sec": duration * fs * channels / elapsed,
+        "realtime_factor": duration / elapsed,
+        "beats": n_beats,
+    }
+
+
+def measure_latency(channels, fs=250, packet_size=25, duration=10):
+    detector = OnlineRPeakDetector(fs, channels)
+    arrival = {}  # global sample index -> wall time its packet arrived
+    latencies = []
+    for start, packet in stream_ecg(fs, packet_size, channels, duration, speed=1.0):
+        now = time.perf_counter()
+        arrival.update((start + i, now) for i in range(len(packet)))
+        for _, sample, _ in detector.update(packet):
+            latencies.append(time.perf_counter() - arrival[sample])
+    latencies = np.array(latencies) * 1000
+    return {
+        "beats": len(latencies),
+        "latency_ms_p50": float(np.percentile(latencies, 50)) if len(latencies) else None,
+        "latency_ms_p95": float(np.percentile(latencies, 95)) if len(latencies) else None,
+        "latency_ms_max": float(latencies.max()) if len(latencies) else None,
+        "latency_bound_ms": 1000 * (detector.distance + packet_size - 1) / fs,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--channels", type=int, nargs="+", default=[1, 4, 12, 64, 256])
+    parser.add_argument("--fs", type=int, default=250)
+    parser.add_argument("--packet-size", type=int, default=25)
+    parser.add_argument("--duration", type=float, default=60, help="signal seconds for throughput")
+    parser.add_argument("--latency-duration", type=float, default=5, help="real-time seconds for latency")
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args()
+
+    results = []
+    print(f"{'channels':>8} {'samples/s':>14} {'x realtime':>11} {'p50 ms':>8} {'p95 ms':>8} {'max ms':>8}")
+    for channels in args.channels:
+        row = {"channels": channels}
+        row.update(measure_throughput(channels, args.fs, args.packet_size, args.duration))
+        row.update(measure_latency(channels, args.fs, args.packet_size, args.latency_duration))
+        results.append(row)
+        print(
+            f"{channels:>8} {row['samples_per_sec']:>14,.0f} {row['realtime_factor']:>11.1f} "
+            f"{row['latency_ms_p50'] or float('nan'):>8.1f} {row['latency_ms_p95'] or float('nan'):>8.1f} "
+            f"{row['latency_ms_max'] or float('nan'):>8.1f}"
+        )
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f" Results saved to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
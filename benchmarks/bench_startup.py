@@ -0,0 +1,104 @@
+# benchmarks/bench_startup.py
+"""
+Startup-time benchmark for the entry points (python -X importtime).
+
+Each target is imported in a fresh interpreter with -X importtime; the
+cumulative import time of the target, the slowest modules it pulls in and
+any heavy scientific dependency loaded at import are reported. With
+--max-ms and/or --no-heavy the exit status is non-zero when a target goes
+over budget or imports a heavy dependency, so regressions can be caught
+in CI.
+
+Run: python -m benchmarks.bench_startup --targets main app --max-ms 1500 --no-heavy
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Dependencies that must only be loaded once a tool is actually used
+HEAVY_MODULES = ("numpy", "pandas", "scipy", "matplotlib", "Bio", "pydicom", "pyarrow")
+
+
+def import_profile(target):
+    """
+    Parse -X importtime output for `import target`: {module: (self_us, cumulative_us)}
+    for the target and the modules it imports (interpreter startup excluded).
+    """
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {target}"],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    rows = []
+    for line in proc.stderr.splitlines():
+        if line.startswith("import time:") and "[us]" not in line:
+            self_us, cumulative_us, name = line[len("import time:"):].split("|")
+            rows.append((name, int(self_us), int(cumulative_us)))
+    # Nested imports are listed (more indented) right before the module importing them
+    end = max(i for i, (name, _, _) in enumerate(rows) if name.strip() == target)
+    depth = len(rows[end][0]) - len(rows[end][0].lstrip())
+    start = end
+    while start > 0 and len(rows[start - 1][0]) - len(rows[start - 1][0].lstrip()) > depth:
+        start -= 1
+    profile = {}
+    for name, self_us, cumulative_us in rows[start : end + 1]:
+        profile.setdefault(name.strip(), (self_us, cumulative_us))
+    return profile
+
+
+def measure(target, repeat=5, top=5):
+    runs = [import_profile(target) for _ in range(repeat)]
+    best = min(runs, key=lambda profile: profile[target][1])
+    slowest = sorted(
+        ((name, cumulative) for name, (_, cumulative) in best.items() if name != target),
+        key=lambda item: -item[1],
+    )[:top]
+    return {
+        "target": target,
+        "import_ms": best[target][1] / 1000,
+        "modules_imported": len(best),
+        "heavy_imported": [m for m in HEAVY_MODULES if m in best],
+        "slowest": [{"module": name, "ms": cumulative / 1000} for name, cumulative in slowest],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--targets", nargs="+", default=["main", "app"])
+    parser.add_argument("--repeat", type=int, default=5, help="fresh interpreters per target (best is kept)")
+    parser.add_argument("--max-ms", type=float, help="fail when a target's import time exceeds this")
+    parser.add_argument("--no-heavy", action="store_true", help="fail when a target imports a heavy dependency")
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args()
+
+    results, failures = [], []
+    width = max(len(t) for t in args.targets)
+    print(f"{'target':>{width}} {'import ms':>10} {'modules':>8}  heavy / slowest imports")
+    for target in args.targets:
+        row = measure(target, args.repeat)
+        results.append(row)
+        slowest = ", ".join(f"{s['module']} {s['ms']:.0f}ms" for s in row["slowest"])
+        heavy = ",".join(row["heavy_imported"]) or "-"
+        print(f"{target:>{width}} {row['import_ms']:>10.1f} {row['modules_imported']:>8}  {heavy} / {slowest}")
+        if args.max_ms is not None and row["import_ms"] > args.max_ms:
+            failures.append(f"{target}: {row['import_ms']:.0f} ms > {args.max_ms:.0f} ms")
+        if args.no_heavy and row["heavy_imported"]:
+            failures.append(f"{target}: imports {', '.join(row['heavy_imported'])} at startup")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f" Results saved to {args.json}")
+    for failure in failures:
+        print(f" Startup regression: {failure}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,225 @@
+# benchmarks/run_benchmarks.py
+"""
+Benchmark suite: every module's hot path at several data scales.
+
+Synthetic inputs are built with the modules' own generators at each scale
+(1x = the generator defaults, e.g. 10 messy rows, 60 bp, 10 s of ECG, 50
+patients, 1 DICOM file). Each analysis is timed (best of --repeat runs;
+larger inputs stop repeating once --max-seconds is spent) and run once more
+under tracemalloc for its peak Python/numpy allocation. Results go to a
+JSON file tagged with the git commit; --compare flags benchmarks that got
+slower than a previous results file by more than --threshold (non-zero exit).
+
+Run: python -m benchmarks.run_benchmarks --scales 1 100 10000 --json results.json
+     python -m benchmarks.run_benchmarks --only analyze_ecg --compare results.json
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+import numpy as np
+import pandas as pd
+
+SCALES = (1, 100, 10_000)
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+# --- Inputs (built in a scratch folder) and the call being measured ---
+
+def clean_data_case(scale, folder):
+    from modules.data_cleaner.data_cleaner import clean_data
+    from modules.data_cleaner.sample_messy_data import generate_messy_data
+
+    df = generate_messy_data(num_rows=10 * scale, save_csv=False)
+    return len(df), lambda: clean_data(df)
+
+
+def analyze_dna_case(scale, folder, min_orf_length=None):
+    from modules.dna_analyzer.dna_analyzer import analyze_dna
+    from modules.dna_analyzer.sample_dna import generate_sample_dna
+
+    sequence = generate_sample_dna(length=60 * scale)
+    return len(sequence), lambda: analyze_dna(sequence, min_orf_length)
+
+
+def fit_dose_response_case(scale, folder):
+    """`scale` replicate measurements of the generator's 10-dose series in one table."""
+    from modules.dose_response.dose_response_fitter import fit_dose_response
+    from modules.dose_response.sample_dose_response import generate_sample_dose_response
+
+    base = generate_sample_dose_response(os.path.join(folder, "dose_base.csv"))
+    df = pd.concat([base] * scale, ignore_index=True)
+    df["Response_percent"] += np.random.default_rng(0).normal(0, 5, len(df)) * (scale > 1)
+    data_file = os.path.join(folder, "dose.csv")
+    df.to_csv(data_file, index=False)
+    results_file = os.path.join(folder, "fitted.csv")
+    return len(df), lambda: fit_dose_response(data_file, results_file)
+
+
+def analyze_ecg_case(scale, folder, file_format="csv"):
+    from modules.ecg_simulator.ecg_analyzer import analyze_ecg
+    from modules.ecg_simulator.ecg_generator import generate_ecg
+
+    df, file_path = generate_ecg(duration=10 * scale, file_format=file_format, output_dir=folder)
+    return len(df), lambda: analyze_ecg(file_path)
+
+
+def analyze_clinical_data_case(scale, folder):
+    from modules.stats_analysis.sample_clinical import generate_sample_clinical_data
+    from modules.stats_analysis.stats_analyzer import analyze_clinical_data
+
+    data_file = os.path.join(folder, "clinical.csv")
+    df = generate_sample_clinical_data(data_file, n_patients=50 * scale)
+    return len(df), lambda: analyze_clinical_data(data_file)
+
+
+def extract_dicom_metadata_case(scale, folder):
+    """One file per scale unit; above 1x the batch extractor reads the whole folder."""
+    from modules.dicom_metadata.dicom_extractor import extract_dicom_metadata, extract_dicom_metadata_batch
+    from modules.dicom_metadata.sample_dicom import generate_sample_dicom
+
+    dicom_folder = os.path.join(folder, "dicom")
+    os.makedirs(dicom_folder)
+    paths = [generate_sample_dicom(os.path.join(dicom_folder, f"{i:06d}.dcm")) for i in range(scale)]
+    csv_file, json_file = os.path.join(folder, "dicom.csv"), os.path.join(folder, "dicom.json")
+    if scale == 1:
+        return 1, lambda: extract_dicom_metadata(paths[0], csv_file, json_file)
+    return scale, lambda: extract_dicom_metadata_batch(dicom_folder, csv_file, workers=1)
+
+
+BENCHMARKS = {
+    "clean_data": (clean_data_case, "rows"),
+    "analyze_dna": (analyze_dna_case, "bp"),
+    "analyze_dna_orfs": (lambda scale, folder: analyze_dna_case(scale, folder, min_orf_length=30), "bp"),
+    "fit_dose_response": (fit_dose_response_case, "points"),
+    "analyze_ecg": (analyze_ecg_case, "samples"),
+    "analyze_ecg_binary": (lambda scale, folder: analyze_ecg_case(scale, folder, "binary"), "samples"),
+    "analyze_clinical_data": (analyze_clinical_data_case, "patients"),
+    "extract_dicom_metadata": (extract_dicom_metadata_case, "files"),
+}
+
+
+def measure(run, repeat, max_seconds, memory):
+    """Best and all wall times of `run`, plus the tracemalloc peak (MB) of one extra run."""
+    times = []
+    while len(times) < repeat and (not times or sum(times) < max_seconds):
+        t0 = time.perf_counter()
+        run()
+        times.append(time.perf_counter() - t0)
+    peak_mb = None
+    if memory:
+        tracemalloc.start()
+        try:
+            run()
+            peak_mb = tracemalloc.get_traced_memory()[1] / 2**20
+        finally:
+            tracemalloc.stop()
+    return min(times), times, peak_mb
+
+
+def run_benchmark(name, scale, repeat, max_seconds, memory):
+    case, unit = BENCHMARKS[name]
+    with tempfile.TemporaryDirectory() as folder, contextlib.redirect_stdout(io.StringIO()):
+        cwd = os.getcwd()
+        os.chdir(folder)  # analyses that write default files keep them out of the tree
+        try:
+            t0 = time.perf_counter()
+            n_items, run = case(scale, folder)
+            setup = time.perf_counter() - t0
+            best, times, peak_mb = measure(run, repeat, max_seconds, memory)
+        finally:
+            os.chdir(cwd)
+    return {
+        "benchmark": name,
+        "scale": scale,
+        "items": n_items,
+        "unit": unit,
+        "seconds": best,
+        "seconds_all": times,
+        "items_per_sec": n_items / best if best > 0 else None,
+        "peak_mb": peak_mb,
+        "setup_seconds": setup,
+    }
+
+
+def environment():
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    import scipy
+
+    return {
+        "commit": commit,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "scipy": scipy.__version__,
+    }
+
+
+def compare(results, baseline_file, threshold):
+    """Print time ratios against a previous results file; returns the regressions."""
+    with open(baseline_file) as f:
+        baseline = {(r["benchmark"], r["scale"]): r for r in json.load(f)["results"]}
+    regressions = []
+    print(f"\n Compared with {baseline_file}:")
+    for row in results:
+        old = baseline.get((row["benchmark"], row["scale"]))
+        if old is None:
+            continue
+        ratio = row["seconds"] / old["seconds"]
+        flag = " REGRESSION" if ratio > threshold else ""
+        print(f" {row['benchmark']:<24} {row['scale']:>7}x  {old['seconds']:>9.4f}s -> {row['seconds']:>9.4f}s  x{ratio:.2f}{flag}")
+        if flag:
+            regressions.append(row)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--scales", type=int, nargs="+", default=list(SCALES))
+    parser.add_argument("--only", nargs="+", choices=list(BENCHMARKS), help="run only these benchmarks")
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per case (best is reported)")
+    parser.add_argument("--max-seconds", type=float, default=20, help="stop repeating a case after this much time")
+    parser.add_argument("--no-memory", action="store_true", help="skip the tracemalloc run")
+    parser.add_argument("--json", help="write results to this file")
+    parser.add_argument("--compare", help="previous results file to compare against")
+    parser.add_argument("--threshold", type=float, default=1.25, help="slowdown ratio reported as a regression")
+    args = parser.parse_args()
+
+    results = []
+    print(f"{'benchmark':<24} {'scale':>7} {'items':>12} {'best s':>10} {'items/s':>12} {'peak MB':>9}")
+    for name in args.only or BENCHMARKS:
+        for scale in args.scales:
+            row = run_benchmark(name, scale, args.repeat, args.max_seconds, not args.no_memory)
+            results.append(row)
+            peak = f"{row['peak_mb']:>9.1f}" if row["peak_mb"] is not None else f"{'-':>9}"
+            print(
+                f"{name:<24} {scale:>6}x {row['items']:>12,} {row['seconds']:>10.4f} "
+                f"{row['items_per_sec'] or 0:>12,.0f} {peak}",
+                flush=True,
+            )
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"environment": environment(), "results": results}, f, indent=2)
+        print(f" Results saved to {args.json}")
+    if args.compare and compare(results, args.compare, args.threshold):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
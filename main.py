@@ -2,18 +2,8 @@
 import os
 import sys
 
-# --- Import all modules ---
-from modules.data_cleaner import clean_data
-from modules.data_cleaner.sample_messy_data import generate_messy_data
-from modules.dicom_metadata.dicom_extractor import extract_dicom_metadata
-from modules.dna_analyzer import analyze_dna
-from modules.sample_dna import generate_sample_dna
-from modules.dose_response.dose_response_fitter import fit_dose_response
-from modules.dose_response.sample_dose_response import generate_sample_dose_response
-from modules.ecg_analyzer import analyze_ecg
-from modules.ecg_generator import generate_ecg
-from modules.stat_analysis.stats_analyzer import analyze_clinical_data
-from modules.stat_analysis.sample_clinical import generate_sample_clinical_data
+# Tool modules (and pandas, scipy, matplotlib, Bio, pydicom behind them) are
+# imported inside each menu branch, so the menu appears without loading them.
 
 def print_menu():
     print("\n" + "="*60)
@@ -45,6 +35,8 @@ def main():
             
             elif choice == "1":
                 print("\n🧹 Running Biomedical Data Cleaner...\n")
+                from modules.data_cleaner.data_cleaner import clean_data
+                from modules.data_cleaner.sample_messy_data import generate_messy_data
                 generate_messy_data()
                 cleaned_df = clean_data()
                 if cleaned_df is not None:
@@ -52,11 +44,14 @@ def main():
             
             elif choice == "2":
                 print("\n🩻 Running DICOM Metadata Extractor...\n")
+                from modules.dicom_metadata.dicom_extractor import extract_dicom_metadata
                 metadata = extract_dicom_metadata()
                 print(metadata)
             
             elif choice == "3":
                 print("\n🧬 Running DNA Sequence Analyzer...\n")
+                from modules.dna_analyzer.dna_analyzer import analyze_dna
+                from modules.dna_analyzer.sample_dna import generate_sample_dna
                 dna_seq = generate_sample_dna(length=60)
                 print(f"Generated DNA Sequence:\n{dna_seq}\n")
                 results = analyze_dna(dna_seq)
@@ -65,6 +60,8 @@ def main():
             
             elif choice == "4":
                 print("\n💊 Running Dose-Response Curve Fitter...\n")
+                from modules.dose_response.dose_response_fitter import fit_dose_response
+                from modules.dose_response.sample_dose_response import generate_sample_dose_response
                 generate_sample_dose_response()
                 show_plot = ask_plot_option()
                 ec50, slope = fit_dose_response(plot=show_plot)
@@ -72,6 +69,8 @@ def main():
             
             elif choice == "5":
                 print("\n❤️ Running ECG Analyzer...\n")
+                from modules.ecg_simulator.ecg_analyzer import analyze_ecg
+                from modules.ecg_simulator.ecg_generator import generate_ecg
                 df, file_path = generate_ecg()
                 show_plot = ask_plot_option()
                 results = analyze_ecg(file_path, plot=show_plot)
@@ -81,6 +80,8 @@ def main():
             
             elif choice == "6":
                 print("\n📊 Running Clinical Data Statistical Analysis...\n")
+                from modules.stats_analysis.stats_analyzer import analyze_clinical_data
+                from modules.stats_analysis.sample_clinical import generate_sample_clinical_data
                 generate_sample_clinical_data()
                 summary, (t_stat, p_val) = analyze_clinical_data()
             
@@ -0,0 +1,163 @@
+
+# Analyses run by the API's job queue (modules/jobs.py) in worker processes.
+# Each task reads its input files and writes outputs only into its own job
+# folder, and returns a JSON-serializable result listing those outputs.
+# Plots are not rendered here: their data goes to the shared plot cache and
+# the image is drawn when /plot/<plot_id> is first requested.
+# With instrumentation enabled, results carry the job's stage timings
+# ("timings") for the API process to merge into its metrics, and a
+# "profile" param adds a cProfile report (profile.txt) to the outputs.
+import json
+import os
+from . import instrumentation
+from .plotting import PLOT_FOLDER
+
+# Records/curves returned inline; the full table is written to the job folder
+PREVIEW_ROWS = 100
+PROFILE_FILE = "profile.txt"
+
+
+def dose_response(params, inputs, folder):
+    from .dose_response.dose_response_fitter import fit_dose_response
+    from .tabular_io import read_table
+
+    results_file = os.path.join(folder, "fitted_results.csv")
+    fit_dose_response(
+        data_file=inputs[0],
+        results_file=results_file,
+        plot_cache=PLOT_FOLDER,
+        model=params.get("model", "hill"),
+        ci=params.get("ci"),
+        n_boot=params.get("n_boot", 1000),
+        seed=params.get("seed"),
+    )
+    result = read_table(results_file).iloc[0].to_dict()
+    return {**result, "plot_url": f"/plot/{result['plot_id']}", "files": ["fitted_results.csv"]}
+
+
+def ecg(params, inputs, folder):
+    from .ecg_simulator.ecg_analyzer import analyze_ecg
+
+    result = analyze_ecg(file_path=inputs[0], plot_cache=PLOT_FOLDER)
+    result["file_analyzed"] = os.path.basename(result["file_analyzed"])
+    return {**result, "plot_url": f"/plot/{result['plot_id']}", "files": []}
+
+
+def clinical_tests(params, inputs, folder):
+    """Welch t-test, permutation test and bootstrap Hedges' g CI of Treatment vs Control."""
+    from scipy import stats
+    from .stats_analysis.stats_resampling import bootstrap_effect_ci, permutation_test
+    from .tabular_io import read_table
+
+    df = read_table(inputs[0], columns=["Group", "Measurement"])
+    treatment = df.loc[df["Group"] == "Treatment", "Measurement"].to_numpy(dtype=float)
+    control = df.loc[df["Group"] == "Control", "Measurement"].to_numpy(dtype=float)
+    t_stat, p_val = stats.ttest_ind(treatment, control, equal_var=False)
+    seed = params.get("seed", 0)
+    with instrumentation.span("clinical.permutation"):
+        perm = permutation_test(treatment, control, "mean_diff", params.get("n_permutations", 10_000), seed=seed)
+    with instrumentation.span("clinical.bootstrap"):
+        boot = bootstrap_effect_ci(treatment, control, "hedges_g", params.get("n_boot", 10_000), seed=seed)
+    return {
+        "summary": df.groupby("Group", observed=True)["Measurement"].describe().to_dict(),
+        "t_statistic": t_stat,
+        "p_value": p_val,
+        "permutation": perm,
+        "bootstrap": boot,
+        "files": [],
+    }
+
+
+# --- Uploaded files (see modules/uploads.py) ---
+
+def dose_table(params, inputs, folder):
+    """Uploaded dose-response table: one curve, or one per compound for long-format plates."""
+    from .dose_response.dose_response_batch import fit_dose_response_batch
+    from .tabular_io import read_table
+
+    df = read_table(inputs[0])
+    if "Compound" not in df.columns:
+        return dose_response(params, inputs, folder)
+    fits = fit_dose_response_batch(
+        df,
+        workers=1,
+        results_file=os.path.join(folder, "fit_results.csv"),
+        model=params.get("model", "hill"),
+        ci=params.get("ci"),
+        n_boot=params.get("n_boot", 1000),
+        seed=params.get("seed"),
+    )
+    return {
+        "n_curves": len(fits),
+        "n_failed": int((~fits["success"]).sum()),
+        "curves": _preview(fits),
+        "files": ["fit_results.csv"],
+    }
+
+
+def fasta(params, inputs, folder):
+    """Per-record length, GC content and motif counts of an uploaded FASTA/FASTQ, streamed."""
+    import pandas as pd
+    from .dna_analyzer.dna_stream import analyze_dna_stream
+
+    motifs = params.get("motifs") or ("ATG",)
+    records = pd.DataFrame(analyze_dna_stream(inputs[0], motifs=motifs))
+    records.to_csv(os.path.join(folder, "records.csv"), index=False)
+    total = int(records["Length"].sum()) if len(records) else 0
+    gc = float((records["Length"] * records["GC Content (%)"]).sum() / total) if total else 0.0
+    return {
+        "n_records": len(records),
+        "total_length": total,
+        "gc_content": round(gc, 2),
+        "records": _preview(records),
+        "files": ["records.csv"],
+    }
+
+
+def ecg_stream(params, inputs, folder):
+    """Heart-rate analysis of an uploaded ECG record (CSV or .ecgb), chunk by chunk."""
+    from .ecg_simulator.ecg_stream import analyze_ecg_stream
+
+    result = analyze_ecg_stream(inputs[0])
+    result["file_analyzed"] = os.path.basename(result["file_analyzed"])
+    return {**result, "files": []}
+
+
+def dicom(params, inputs, folder):
+    """Clinical header fields of an uploaded DICOM file (pixel data is never read)."""
+    from .dicom_metadata.dicom_extractor import read_clinical_fields
+
+    fields = read_clinical_fields(inputs[0])
+    return {"metadata": {k: v if isinstance(v, str) else None for k, v in fields.items()}, "files": []}
+
+
+def _preview(df):
+    return df.head(PREVIEW_ROWS).astype(object).where(df.head(PREVIEW_ROWS).notna(), None).to_dict("records")
+
+
+TASKS = {
+    "dose_response": dose_response,
+    "ecg": ecg,
+    "clinical_tests": clinical_tests,
+    "dose_table": dose_table,
+    "fasta": fasta,
+    "ecg_stream": ecg_stream,
+    "dicom": dicom,
+}
+
+
+def run_task(task, params, inputs, folder):
+    """Entry point of the job queue's workers."""
+    if task not in TASKS:
+        raise ValueError(f"Unknown task {task!r}; expected one of {list(TASKS)}")
+    with instrumentation.trace() as timings, instrumentation.Profile(bool(params.get("profile"))) as profile:
+        with instrumentation.span(f"task.{task}"):
+            result = TASKS[task](params, inputs, folder)
+    if profile.text:
+        with open(os.path.join(folder, PROFILE_FILE), "w") as f:
+            f.write(profile.text)
+        result["files"] = result["files"] + [PROFILE_FILE]
+    if instrumentation.enabled():
+        result["timings"] = timings
+    # numpy scalars -> Python numbers
+    return json.loads(json.dumps(result, default=lambda value: value.item()))
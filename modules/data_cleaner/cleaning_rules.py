@@ -0,0 +1,279 @@
+
+import math
+import re
+import numpy as np
+import pandas as pd
+
+# Rule schema:
+#   placeholders: values treated as missing in every text column
+#   columns: {name: {
+#       "type": "numeric" | "string" | "category",
+#       "placeholders": extra missing markers for this column (e.g. [-999]),
+#       "min" / "max": valid range of a numeric column (outside -> missing),
+#       "pattern": regex a string value must match (otherwise -> missing),
+#       "split": names of numeric columns filled from the pattern's groups,
+#       "impute": "mean" | "median" | "mode" | {"value": constant},
+#   }}
+DEFAULT_RULES = {
+    "placeholders": ["??", "N/A", "missing", "high"],
+    "columns": {
+        "Age": {"type": "numeric", "impute": "mean"},
+        "Weight_kg": {"type": "numeric", "impute": "mean"},
+        "Height_cm": {"type": "numeric", "impute": "mean"},
+        "Blood_Pressure": {
+            "type": "string",
+            "pattern": r"^(\d+)/(\d+)$",
+            "split": ["Systolic_BP", "Diastolic_BP"],
+        },
+    },
+}
+
+COLUMN_TYPES = ("numeric", "string", "category")
+IMPUTE_STRATEGIES = ("mean", "median", "mode")
+# Strategies that can be computed exactly chunk by chunk
+STREAMABLE_STRATEGIES = ("mean", "mode", "value")
+
+
+def exact_partials(values, partials=()):
+    """
+    Non-overlapping float partials whose exact sum equals sum(values) + sum(partials).
+
+    Each math.fsum call returns the correctly rounded sum; subtracting it and
+    summing again recovers the rounding error, until nothing is left. This
+    lets chunk sums be combined without any rounding error.
+    """
+    values = list(partials) + (values.tolist() if isinstance(values, np.ndarray) else list(values))
+    result = []
+    while values:
+        total = math.fsum(values)
+        if total == 0 or not math.isfinite(total):
+            if total or not result:
+                result.append(total)
+            break
+        result.append(total)
+        values.append(-total)
+    return result
+
+
+def column_mean(values, count=None, partials=None):
+    """Correctly rounded mean of the non-missing values (NaN when there are none)."""
+    if partials is None:
+        values = values.dropna()
+        partials, count = exact_partials(values.to_numpy(dtype=float)), len(values)
+    return math.fsum(partials) / count if count else float("nan")
+
+
+def _to_float(series):
+    """
+    Float values of a Series, unparseable entries as NaN (like to_numeric(errors="coerce")).
+    Arrow-backed strings take pyarrow's vectorized cast when every value parses.
+    """
+    if series.dtype.kind in "ifb":
+        return series.to_numpy(dtype=float)
+    if isinstance(series.dtype, pd.StringDtype) and series.dtype.storage == "pyarrow":
+        import pyarrow as pa
+
+        try:
+            return pa.array(series).cast(pa.float64()).to_numpy(zero_copy_only=False)
+        except (pa.ArrowInvalid, pa.ArrowNotImplementedError):
+            pass
+    return pd.to_numeric(series, errors="coerce").to_numpy(dtype=float)
+
+
+def _mode(counts):
+    """Most frequent value (smallest on ties, like Series.mode()[0])."""
+    if counts.empty:
+        return float("nan")
+    return counts[counts == counts.max()].index.min()
+
+
+def _strategy(spec):
+    impute = spec.get("impute")
+    return "value" if isinstance(impute, dict) else impute
+
+
+class CompiledRules:
+    """
+    A cleaning schema compiled into a fixed plan of vectorized passes.
+
+    Columns are grouped by what is done to them, so each step is one
+    operation over a 2-D block no matter how many columns share it:
+    one placeholder mask over all text columns, one numeric conversion
+    (with range checks) over all numeric columns, one regex extraction per
+    distinct pattern (which also yields the split columns) and one fillna.
+    """
+
+    def __init__(self, rules=None):
+        rules = DEFAULT_RULES if rules is None else rules
+        self.placeholders = list(rules.get("placeholders", []))
+        self.columns = dict(rules.get("columns", {}))
+
+        self.numeric, self.categories, self.impute = [], [], {}
+        self.extra_placeholders = {}  # frozenset of markers -> columns
+        self.patterns = {}  # regex -> [(column, split names)]
+        for col, spec in self.columns.items():
+            kind = spec.get("type", "string")
+            if kind not in COLUMN_TYPES:
+                raise ValueError(f"Column {col!r}: unknown type {kind!r}")
+            if kind == "numeric":
+                self.numeric.append(col)
+            elif kind == "category":
+                self.categories.append(col)
+            if spec.get("placeholders"):
+                self.extra_placeholders.setdefault(frozenset(spec["placeholders"]), []).append(col)
+            if spec.get("pattern"):
+                pattern = re.compile(spec["pattern"])
+                split = list(spec.get("split", []))
+                if split and len(split) != pattern.groups:
+                    raise ValueError(f"Column {col!r}: {len(split)} split columns for {pattern.groups} regex groups")
+                self.patterns.setdefault(spec["pattern"], []).append((col, split))
+            strategy = _strategy(spec)
+            if strategy is not None:
+                if strategy != "value" and strategy not in IMPUTE_STRATEGIES:
+                    raise ValueError(f"Column {col!r}: unknown imputation {strategy!r}")
+                self.impute[col] = spec["impute"]["value"] if strategy == "value" else strategy
+
+        self.min = np.array([self.columns[c].get("min", -np.inf) for c in self.numeric], dtype=float)
+        self.max = np.array([self.columns[c].get("max", np.inf) for c in self.numeric], dtype=float)
+
+    def prepare(self, df):
+        """Apply placeholders, types, ranges and regex validation/splitting (no imputation)."""
+        df = df.copy()
+        text = [c for c in df.columns if df[c].dtype.kind not in "ifbmM"]
+        if text and self.placeholders:
+            block = df[text]
+            df[text] = block.mask(block.isin(self.placeholders))
+
+        for markers, cols in self.extra_placeholders.items():
+            cols = [c for c in cols if c in df.columns and c not in self.numeric]
+            if cols:
+                block = df[cols]
+                df[cols] = block.mask(block.isin(list(markers)))
+
+        numeric = [c for c in self.numeric if c in df.columns]
+        if numeric:
+            self._convert_numeric(df, numeric)
+
+        for pattern, targets in self.patterns.items():
+            targets = [(c, split) for c, split in targets if c in df.columns]
+            if targets:
+                df = self._apply_pattern(df, pattern, targets)
+        return df
+
+    def _convert_numeric(self, df, numeric):
+        """One flattened conversion of all text numeric columns, then range and marker masks."""
+        values = np.empty((len(df), len(numeric)))
+        direct = [i for i, c in enumerate(numeric) if df[c].dtype.kind in "ifb"]
+        text = [i for i, c in enumerate(numeric) if df[c].dtype.kind not in "ifb"]
+        if direct:
+            values[:, direct] = df[[numeric[i] for i in direct]].to_numpy(dtype=float)
+        if text:
+            flat = pd.concat([df[numeric[i]] for i in text], ignore_index=True)
+            values[:, text] = _to_float(flat).reshape(len(text), len(df)).T
+        index = [self.numeric.index(c) for c in numeric]
+        with np.errstate(invalid="ignore"):
+            values[(values < self.min[index]) | (values > self.max[index])] = np.nan
+        for markers, cols in self.extra_placeholders.items():
+            positions = [numeric.index(c) for c in cols if c in numeric]
+            if positions:
+                markers = pd.to_numeric(pd.Series(list(markers), dtype=object), errors="coerce").dropna()
+                sub = values[:, positions]
+                sub[np.isin(sub, markers.to_numpy(dtype=float))] = np.nan
+                values[:, positions] = sub
+        df[numeric] = values
+
+    @staticmethod
+    def _apply_pattern(df, pattern, targets):
+        """Validate all columns sharing a pattern with a single regex pass, filling split columns."""
+        cols = [c for c, _ in targets]
+        n = len(df)
+        flat = pd.Series(df[cols].to_numpy(dtype=object).ravel(order="F"), dtype=object)
+        present = flat.notna().to_numpy()
+        if re.compile(pattern).groups:
+            groups = flat.str.extract(pattern, expand=True)
+            matched = groups.notna().any(axis=1).to_numpy()
+        else:
+            groups = None
+            matched = flat.str.contains(pattern, na=False).to_numpy(dtype=bool)
+        flat[present & ~matched] = np.nan
+        validated = pd.DataFrame(flat.to_numpy(dtype=object).reshape(len(cols), n).T, index=df.index, columns=cols)
+        df[cols] = validated.astype(df[cols].dtypes.to_dict())
+
+        if groups is not None and any(split for _, split in targets):
+            numbers = pd.to_numeric(groups.to_numpy(dtype=object).ravel(), errors="coerce").astype(float)
+            numbers = numbers.reshape(len(cols), n, -1)
+            for i, (col, split) in enumerate(targets):
+                for j, name in enumerate(split):
+                    df.insert(df.columns.get_loc(col) + 1 + j, name, numbers[i, :, j])
+        return df
+
+    def fill_values(self, df):
+        """Imputation value of every imputed column computed on a prepared frame."""
+        values = {}
+        for col, strategy in self.impute.items():
+            if col not in df.columns:
+                continue
+            if strategy == "mean":
+                values[col] = column_mean(df[col])
+            elif strategy == "median":
+                values[col] = df[col].median()
+            elif strategy == "mode":
+                values[col] = _mode(df[col].value_counts())
+            else:
+                values[col] = strategy
+        return values
+
+    def check_streamable(self):
+        for col, spec in self.columns.items():
+            strategy = _strategy(spec)
+            if strategy is not None and strategy not in STREAMABLE_STRATEGIES:
+                raise ValueError(f"Column {col!r}: imputation {strategy!r} cannot be computed chunk by chunk")
+
+    def accumulate(self, state, df):
+        """Add a prepared chunk to running imputation statistics (see finalize)."""
+        for col, strategy in self.impute.items():
+            if col not in df.columns:
+                continue
+            if strategy == "mean":
+                values = df[col].dropna().to_numpy(dtype=float)
+                partials, count = state.get(col, ((), 0))
+                state[col] = (exact_partials(values, partials), count + len(values))
+            elif strategy == "mode":
+                counts = df[col].value_counts()
+                state[col] = counts if col not in state else state[col].add(counts, fill_value=0)
+            elif strategy != "median":
+                state[col] = strategy
+        return state
+
+    def finalize(self, state):
+        """Imputation values from accumulated statistics (equal to fill_values on the whole frame)."""
+        values = {}
+        for col, stat in state.items():
+            strategy = self.impute[col]
+            if strategy == "mean":
+                partials, count = stat
+                values[col] = column_mean(None, count, partials)
+            elif strategy == "mode":
+                values[col] = _mode(stat)
+            else:
+                values[col] = stat
+        return values
+
+    def fill(self, df, values):
+        """Impute missing values in one pass and apply categorical types."""
+        values = {c: v for c, v in values.items() if c in df.columns and not pd.isna(v)}
+        if values:
+            df = df.fillna(values)
+        categories = [c for c in self.categories if c in df.columns]
+        if categories:
+            df[categories] = df[categories].astype("category")
+        return df
+
+    def apply(self, df):
+        df = self.prepare(df)
+        return self.fill(df, self.fill_values(df))
+
+
+def compile_rules(rules=None):
+    """Compile a rule specification (DEFAULT_RULES when None) into a CompiledRules plan."""
+    return rules if isinstance(rules, CompiledRules) else CompiledRules(rules)
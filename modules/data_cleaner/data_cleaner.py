@@ -1,39 +1,84 @@
-import pandas as pd
+import os
+from ..instrumentation import count, span
+from ..tabular_io import iter_table_chunks, read_table
+from .cleaning_rules import compile_rules
 from .sample_messy_data import generate_messy_data
 
-def clean_data(df=None):
+# Rows per chunk for the out-of-core cleaner
+CHUNK_SIZE = 100_000
+
+
+def clean_data(df=None, rules=None):
     """
-    Clean messy biomedical data from a DataFrame.
+    Clean messy biomedical data from a DataFrame (or a CSV/Parquet/Feather path).
 
-    Steps:
+    Steps (see cleaning_rules.DEFAULT_RULES, or pass your own `rules`):
     - Generate messy data if no DataFrame is provided
     - Replace invalid placeholders with NaN
     - Convert numeric columns
-    - Validate Blood_Pressure format
+    - Validate Blood_Pressure format and split it into Systolic_BP/Diastolic_BP
     - Fill missing numeric values with column mean
     """
     # Generate sample messy data if none provided
     if df is None:
         df = generate_messy_data(save_csv=True)
+    elif isinstance(df, (str, os.PathLike)):
+        with span("clean_data.load"):
+            df = read_table(df)
+
+    count("clean_data_rows", len(df))
+    with span("clean_data.apply"):
+        return compile_rules(rules).apply(df)
+
+
+def _merge_kind(kind, other):
+    """Column type a whole-file read would infer from two chunks' types."""
+    if kind is None or kind == other:
+        return other
+    if {kind, other} <= {"i", "f"}:
+        return "f"
+    return "O"
 
-    # Replace common placeholders with NaN
-    df.replace(["??", "N/A", "missing", "high"], pd.NA, inplace=True)
 
-    # Convert numeric columns
-    for col in ["Age", "Weight_kg", "Height_cm"]:
-        if col in df.columns:
-            df[col] = pd.to_numeric(df[col], errors="coerce")
+def _kind(series):
+    return series.dtype.kind if series.dtype.kind in "ifb" else "O"
+
+
+def clean_data_chunked(input_file, output_file, chunk_size=CHUNK_SIZE, rules=None):
+    """
+    Out-of-core version of clean_data for tables larger than memory
+    (CSV, Parquet or Feather input; CSV output).
+
+    Pass 1 reads the file chunk by chunk and keeps, per column, the type a
+    whole-file read would infer and running imputation statistics (exact
+    sums/counts for means, value counts for modes). Pass 2 re-reads the
+    chunks with those types, applies the same rules, fills with the global
+    values and appends each chunk to output_file. Memory is bounded by
+    chunk_size and the output is identical to
+    clean_data(input_file, rules).
+    """
+    rules = compile_rules(rules)
+    rules.check_streamable()
+    raw_kinds, state = {}, {}
+    rows = chunks = 0
+    for chunk in iter_table_chunks(input_file, chunk_size):
+        for col in chunk.columns:
+            raw_kinds[col] = _merge_kind(raw_kinds.get(col), _kind(chunk[col]))
+        rules.accumulate(state, rules.prepare(chunk))
+        rows += len(chunk)
+        chunks += 1
 
-    # Validate Blood_Pressure format: should be "systolic/diastolic"
-    if "Blood_Pressure" in df.columns:
-        df.loc[~df["Blood_Pressure"].str.contains(r"^\d+/\d+$", na=True), "Blood_Pressure"] = pd.NA
+    fill_values = rules.finalize(state)
+    text_columns = {col: str for col, kind in raw_kinds.items() if kind == "O"}
+    float_columns = [col for col, kind in raw_kinds.items() if kind == "f" and col not in text_columns]
 
-    # Fill missing numeric values with mean
-    for col in ["Age", "Height_cm", "Weight_kg"]:
-        if col in df.columns:
-            df[col] = df[col].fillna(df[col].mean())
+    for i, chunk in enumerate(iter_table_chunks(input_file, chunk_size, dtype=text_columns)):
+        chunk[float_columns] = chunk[float_columns].astype(float)
+        chunk = rules.fill(rules.prepare(chunk), fill_values)
+        chunk.to_csv(output_file, mode="w" if i == 0 else "a", header=i == 0, index=False)
 
-    return df
+    print(f" Cleaned {rows} rows in {chunks} chunks, saved to {output_file}")
+    return {"rows": rows, "chunks": chunks, "fill_values": fill_values, "output_file": output_file}
 
 # Optional: run as script
 if __name__ == "__main__":
@@ -1,8 +1,13 @@
 
 import os
+import glob
 import json
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
 import pandas as pd
 import pydicom
+from ..instrumentation import count, span, timed
 from .sample_dicom import generate_sample_dicom  # relative import for deploy
 
 # Clinically relevant DICOM fields
@@ -26,6 +31,22 @@ CLINICAL_FIELDS = [
     "Columns",
 ]
 
+# Extra columns written by the batch extractor
+BATCH_FIELDS = ["SourceFile", "ReadError"]
+
+
+@timed("dicom.read")
+def read_clinical_fields(dicom_file):
+    """
+    Read only the clinically relevant header fields from a DICOM file.
+    Pixel data is never loaded.
+    """
+    ds = pydicom.dcmread(dicom_file, stop_before_pixels=True, specific_tags=CLINICAL_FIELDS)
+    return {
+        field: str(getattr(ds, field)) if hasattr(ds, field) else pd.NA
+        for field in CLINICAL_FIELDS
+    }
+
 def extract_dicom_metadata(
     dicom_file="sample.dcm",
     csv_file="dicom_metadata.csv",
@@ -40,25 +61,134 @@ def extract_dicom_metadata(
         print(" No DICOM file found, generating a sample one...")
         dicom_file = generate_sample_dicom()
 
-    # Read the DICOM file
-    ds = pydicom.dcmread(dicom_file)
+    # Read the DICOM header and extract metadata
+    metadata = read_clinical_fields(dicom_file)
 
-    # Extract metadata
-    metadata = {}
-    for field in CLINICAL_FIELDS:
-        metadata[field] = str(getattr(ds, field)) if hasattr(ds, field) else pd.NA
+    with span("dicom.write"):
+        # Save to CSV
+        pd.DataFrame([metadata]).to_csv(csv_file, index=False)
+        print(f" Clinically relevant metadata saved to {csv_file}")
 
-    # Save to CSV
-    pd.DataFrame([metadata]).to_csv(csv_file, index=False)
-    print(f" Clinically relevant metadata saved to {csv_file}")
-
-    # Save to JSON
-    with open(json_file, "w") as f:
-        json.dump(metadata, f, indent=4)
+        # Save to JSON (missing fields as null)
+        with open(json_file, "w") as f:
+            json.dump({k: None if v is pd.NA else v for k, v in metadata.items()}, f, indent=4)
     print(f" Clinically relevant metadata saved to {json_file}")
 
     return metadata
 
+def iter_dicom_files(root=".", pattern="**/*.dcm"):
+    """
+    Yield DICOM file paths under `root` matching a glob pattern.
+    Use pattern="**/*" for archives whose files have no extension.
+    """
+    if os.path.isfile(root):
+        yield root
+        return
+    for path in glob.iglob(os.path.join(root, pattern), recursive=True):
+        if os.path.isfile(path):
+            yield path
+
+
+def _read_header_batch(paths):
+    """Read one batch of files in a worker; unreadable files become error rows."""
+    rows = []
+    for path in paths:
+        try:
+            row = read_clinical_fields(path)
+            row["ReadError"] = pd.NA
+        except Exception as e:
+            row = dict.fromkeys(CLINICAL_FIELDS, pd.NA)
+            row["ReadError"] = f"{type(e).__name__}: {e}"
+        row["SourceFile"] = path
+        rows.append(row)
+    return rows
+
+
+def map_batches(func, batches, workers=None):
+    """
+    Apply `func` to each batch across a process pool, yielding results in order.
+    Only a bounded window of batches is in flight so memory stays flat;
+    `workers=1` runs in-process.
+    """
+    if workers == 1:
+        for batch in batches:
+            yield func(batch)
+        return
+
+    workers = workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        max_pending = 2 * workers
+        pending = deque()
+        for batch in batches:
+            pending.append(pool.submit(func, batch))
+            if len(pending) >= max_pending:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def _open_batch_writer(output_file):
+    """Return (write, close) callables appending row batches to a CSV or Parquet file."""
+    columns = BATCH_FIELDS + CLINICAL_FIELDS
+    if output_file.endswith((".parquet", ".pq")):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        schema = pa.schema([(col, pa.string()) for col in columns])
+        writer = pq.ParquetWriter(output_file, schema)
+
+        def write(rows):
+            df = pd.DataFrame(rows, columns=columns)
+            writer.write_table(pa.Table.from_pandas(df, schema=schema, preserve_index=False))
+
+        return write, writer.close
+
+    pd.DataFrame(columns=columns).to_csv(output_file, index=False)
+
+    def write(rows):
+        pd.DataFrame(rows, columns=columns).to_csv(output_file, mode="a", header=False, index=False)
+
+    return write, lambda: None
+
+
+def extract_dicom_metadata_batch(
+    root=".",
+    output_file="dicom_metadata.csv",
+    pattern="**/*.dcm",
+    workers=None,
+    batch_size=256,
+):
+    """
+    Extract clinically relevant metadata from every DICOM file under `root`.
+
+    Headers are read in parallel across a process pool (`workers=1` reads
+    in-process) and streamed into a single CSV or Parquet file, one row per
+    file. Files that cannot be parsed are kept with their `ReadError`.
+    Returns a summary dict.
+    """
+    paths = iter_dicom_files(root, pattern)
+    batches = iter(lambda: list(islice(paths, batch_size)), [])
+    write, close = _open_batch_writer(output_file)
+
+    n_files = n_failed = 0
+
+    def consume(rows):
+        nonlocal n_files, n_failed
+        with span("dicom.write"):
+            write(rows)
+        count("dicom_files", len(rows))
+        n_files += len(rows)
+        n_failed += sum(not pd.isna(row["ReadError"]) for row in rows)
+
+    try:
+        for rows in map_batches(_read_header_batch, batches, workers):
+            consume(rows)
+    finally:
+        close()
+
+    print(f" Metadata for {n_files} DICOM files saved to {output_file} ({n_failed} unreadable)")
+    return {"files_scanned": n_files, "files_failed": n_failed, "output_file": output_file}
+
 def main():
     """Entry point for DICOM metadata extraction."""
     print("\n🩺 Extracting DICOM metadata...\n")
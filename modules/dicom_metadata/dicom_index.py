@@ -0,0 +1,177 @@
+# modules/dicom_metadata/dicom_index.py
+import os
+import sqlite3
+import time
+from itertools import islice
+import pydicom
+from .dicom_extractor import CLINICAL_FIELDS, iter_dicom_files, map_batches
+
+# Default location of the persistent metadata index
+INDEX_FILE = "dicom_index.sqlite"
+
+# Columns that can be filtered in query_dicom_index (all have a SQL index)
+QUERY_FIELDS = ["Modality", "StudyDate", "PatientID", "SOPInstanceUID"]
+
+_SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS dicom_index (
+    path TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    SOPInstanceUID TEXT,
+    {", ".join(f"{field} TEXT" for field in CLINICAL_FIELDS)},
+    ReadError TEXT,
+    indexed_at REAL NOT NULL
+);
+""" + "".join(
+    f"CREATE INDEX IF NOT EXISTS idx_{field.lower()} ON dicom_index ({field});\n"
+    for field in QUERY_FIELDS
+)
+
+_COLUMNS = ["path", "size", "mtime_ns", "SOPInstanceUID", *CLINICAL_FIELDS, "ReadError", "indexed_at"]
+
+
+def _connect(db_file):
+    conn = sqlite3.connect(db_file)
+    conn.row_factory = sqlite3.Row
+    conn.executescript(_SCHEMA)
+    return conn
+
+
+def _read_index_batch(entries):
+    """Parse the headers of (path, size, mtime_ns) entries in a worker."""
+    rows = []
+    for path, size, mtime_ns in entries:
+        row = dict.fromkeys(_COLUMNS)
+        row.update(path=path, size=size, mtime_ns=mtime_ns, indexed_at=time.time())
+        try:
+            ds = pydicom.dcmread(
+                path, stop_before_pixels=True, specific_tags=CLINICAL_FIELDS + ["SOPInstanceUID"]
+            )
+            for field in CLINICAL_FIELDS:
+                row[field] = str(getattr(ds, field)) if hasattr(ds, field) else None
+            # Fall back to the file meta header when the dataset lacks the UID
+            uid = getattr(ds, "SOPInstanceUID", None) or getattr(
+                ds.file_meta, "MediaStorageSOPInstanceUID", None
+            )
+            row["SOPInstanceUID"] = str(uid) if uid else None
+            row["ReadError"] = None
+        except Exception as e:
+            row["ReadError"] = f"{type(e).__name__}: {e}"
+        rows.append(row)
+    return rows
+
+
+def update_dicom_index(
+    root=".",
+    db_file=INDEX_FILE,
+    pattern="**/*.dcm",
+    workers=None,
+    batch_size=256,
+    prune=True,
+):
+    """
+    Bring the persistent SQLite metadata index up to date with `root`.
+
+    Files are keyed by path, size and mtime; only new or modified files are
+    parsed (in parallel, headers only). With `prune`, entries for files that
+    disappeared from `root` are removed. Returns a summary dict.
+    """
+    root_abs = os.path.abspath(root)
+    conn = _connect(db_file)
+    try:
+        known = {
+            row["path"]: (row["size"], row["mtime_ns"])
+            for row in conn.execute("SELECT path, size, mtime_ns FROM dicom_index")
+        }
+        seen = set()
+        n_unchanged = 0
+
+        def changed_files():
+            nonlocal n_unchanged
+            for path in iter_dicom_files(root_abs, pattern):
+                st = os.stat(path)
+                seen.add(path)
+                if known.get(path) == (st.st_size, st.st_mtime_ns):
+                    n_unchanged += 1
+                    continue
+                yield path, st.st_size, st.st_mtime_ns
+
+        entries = changed_files()
+        batches = iter(lambda: list(islice(entries, batch_size)), [])
+
+        insert = (
+            f"INSERT OR REPLACE INTO dicom_index ({', '.join(_COLUMNS)}) "
+            f"VALUES ({', '.join(':' + col for col in _COLUMNS)})"
+        )
+        n_indexed = n_failed = 0
+        for rows in map_batches(_read_index_batch, batches, workers):
+            with conn:
+                conn.executemany(insert, rows)
+            n_indexed += len(rows)
+            n_failed += sum(row["ReadError"] is not None for row in rows)
+
+        n_removed = 0
+        if prune:
+            prefix = os.path.join(root_abs, "")
+            stale = [(path,) for path in known if path.startswith(prefix) and path not in seen]
+            with conn:
+                conn.executemany("DELETE FROM dicom_index WHERE path = ?", stale)
+            n_removed = len(stale)
+    finally:
+        conn.close()
+
+    print(
+        f" DICOM index {db_file}: {n_indexed} parsed ({n_failed} unreadable), "
+        f"{n_unchanged} unchanged, {n_removed} removed"
+    )
+    return {
+        "files_indexed": n_indexed,
+        "files_failed": n_failed,
+        "files_unchanged": n_unchanged,
+        "files_removed": n_removed,
+    }
+
+
+def query_dicom_index(db_file=INDEX_FILE, include_errors=False, limit=None, **filters):
+    """
+    Query the metadata index by any of QUERY_FIELDS, e.g.
+    query_dicom_index(Modality="CT", StudyDate=("20240101", "20241231")).
+
+    A (start, end) tuple filters an inclusive range. Returns a list of dicts.
+    """
+    clauses, params = [], []
+    for field, value in filters.items():
+        if field not in QUERY_FIELDS:
+            raise ValueError(f"Cannot query by {field!r}; choose from {QUERY_FIELDS}")
+        if value is None:
+            continue
+        if isinstance(value, (tuple, list)):
+            clauses.append(f"{field} BETWEEN ? AND ?")
+            params.extend(value)
+        else:
+            clauses.append(f"{field} = ?")
+            params.append(value)
+    if not include_errors:
+        clauses.append("ReadError IS NULL")
+
+    sql = "SELECT * FROM dicom_index"
+    if clauses:
+        sql += " WHERE " + " AND ".join(clauses)
+    sql += " ORDER BY path"
+    if limit is not None:
+        if int(limit) < 0:
+            raise ValueError(f"limit must be non-negative, got {limit}")
+        sql += " LIMIT ?"
+        params.append(int(limit))
+
+    conn = _connect(db_file)
+    try:
+        return [dict(row) for row in conn.execute(sql, params)]
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    update_dicom_index()
+    for record in query_dicom_index(limit=5):
+        print(record)
@@ -1,23 +1,35 @@
 
-from modules.sample_dna import generate_sample_dna
+from .sample_dna import generate_sample_dna
+from .dna_orfs import find_orfs
 from Bio.Seq import Seq
+from ..instrumentation import count, span
 
-def analyze_dna(sequence: str) -> dict:
+def analyze_dna(sequence: str, min_orf_length: int = None) -> dict:
     """
     Analyze a DNA sequence and return key biological properties.
+    With min_orf_length, a six-frame ORF search is added (see dna_orfs.find_orfs).
     """
     seq = Seq(sequence.upper())
-
-    analysis = {
-        "Sequence": str(seq),
-        "Length": len(seq),
-        "GC Content (%)": round(
-            100 * (seq.count("G") + seq.count("C")) / len(seq), 2
-        ) if len(seq) > 0 else 0,
-        "RNA Transcription": str(seq.transcribe()),
-        "Protein Translation": str(seq.translate(to_stop=True)),
-        "Motif ATG Count": seq.count("ATG"),
-    }
+    count("dna_bases", len(seq))
+
+    with span("dna.analyze"):
+        analysis = {
+            "Sequence": str(seq),
+            "Length": len(seq),
+            "GC Content (%)": round(
+                100 * (seq.count("G") + seq.count("C")) / len(seq), 2
+            ) if len(seq) > 0 else 0,
+            "RNA Transcription": str(seq.transcribe()),
+            "Protein Translation": str(seq.translate(to_stop=True)),
+            "Motif ATG Count": seq.count("ATG"),
+        }
+
+    if min_orf_length is not None:
+        with span("dna.orfs"):
+            orfs = find_orfs(str(seq), min_length=min_orf_length, include_protein=True)
+        longest = orfs.loc[orfs["Length_aa"].idxmax()] if len(orfs) else None
+        analysis["ORF Count"] = len(orfs)
+        analysis["Longest ORF Protein"] = longest["Protein"] if longest is not None else ""
 
     return analysis
 
@@ -0,0 +1,175 @@
+
+import numpy as np
+import pandas as pd
+from .dna_stream import CHUNK_SIZE, iter_sequence_chunks
+
+# 2-bit nucleotide codes; anything else (N, gaps, IUPAC) encodes as INVALID
+NUCLEOTIDES = "ACGT"
+INVALID = 4
+ENCODING_TABLE = np.full(256, INVALID, dtype=np.uint8)
+for _code, _bases in enumerate(["Aa", "Cc", "Gg", "TtUu"]):
+    for _base in _bases:
+        ENCODING_TABLE[ord(_base)] = _code
+
+# Dense k-mer spectra hold 4**k counters
+MAX_SPECTRUM_K = 12
+
+
+def encode_sequence(sequence):
+    """Encode a str/bytes/Bio.Seq/PackedDNA sequence as a uint8 array of 2-bit codes (4 = invalid)."""
+    if isinstance(sequence, np.ndarray):
+        return sequence
+    if hasattr(sequence, "n_positions"):  # PackedDNA
+        return sequence.codes()
+    if not isinstance(sequence, (bytes, bytearray)):
+        sequence = str(sequence).encode("ascii", errors="replace")
+    return ENCODING_TABLE[np.frombuffer(sequence, dtype=np.uint8)]
+
+
+def kmer_hashes(codes, k):
+    """
+    Rolling 2-bit hashes of every overlapping k-mer of an encoded sequence.
+
+    The hash of a k-mer is its base-4 number (A=0 ... T=3), built with k
+    vectorized shift/or passes. Returns (hashes, valid) where `valid` is
+    False for windows containing an invalid base.
+    """
+    if not 1 <= k <= 32:
+        raise ValueError("k must be between 1 and 32")
+    n = len(codes) - k + 1
+    if n <= 0:
+        return np.empty(0, dtype=np.uint64), np.empty(0, dtype=bool)
+    dtype = np.uint32 if k <= 16 else np.uint64
+    invalid = codes == INVALID
+    clean = np.where(invalid, 0, codes).astype(dtype)
+
+    hashes = np.zeros(n, dtype=dtype)
+    for j in range(k):
+        hashes <<= dtype(2)
+        hashes |= clean[j : j + n]
+
+    bad = np.concatenate([[0], np.cumsum(invalid, dtype=np.int64)])
+    valid = bad[k:] == bad[:-k]
+    return hashes, valid
+
+
+def _as_collection(sequences):
+    """Wrap a single sequence (str/bytes/codes/Bio.Seq/PackedDNA) in a list."""
+    if isinstance(sequences, (str, bytes, np.ndarray)) or hasattr(sequences, "translate") or hasattr(sequences, "n_positions"):
+        return [sequences]
+    return sequences
+
+
+def reverse_complement_codes(codes):
+    """Reverse complement of an encoded sequence (invalid bases stay invalid)."""
+    codes = codes[::-1]
+    return np.where(codes == INVALID, INVALID, 3 - codes).astype(np.uint8)
+
+
+def _canonical(hashes, rc_hashes):
+    return np.minimum(hashes, rc_hashes[::-1])
+
+
+def kmer_spectrum(sequences, k, canonical=False):
+    """
+    Overlapping k-mer histogram over a collection of sequences.
+
+    Returns an int64 array of length 4**k indexed by k-mer hash (see
+    decode_kmer). With `canonical`, each k-mer is counted under the smaller
+    of itself and its reverse complement.
+    """
+    if k > MAX_SPECTRUM_K:
+        raise ValueError(f"Dense spectra are limited to k <= {MAX_SPECTRUM_K}")
+    sequences = _as_collection(sequences)
+    spectrum = np.zeros(4**k, dtype=np.int64)
+    for sequence in sequences:
+        spectrum += _spectrum_of(encode_sequence(sequence), k, canonical)
+    return spectrum
+
+
+def _spectrum_of(codes, k, canonical):
+    hashes, valid = kmer_hashes(codes, k)
+    if canonical:
+        rc_hashes, _ = kmer_hashes(reverse_complement_codes(codes), k)
+        hashes = _canonical(hashes, rc_hashes)
+    return np.bincount(hashes[valid], minlength=4**k)
+
+
+def kmer_spectrum_file(source, k, canonical=False, chunk_size=CHUNK_SIZE):
+    """
+    k-mer spectrum of every record of a FASTA/FASTQ file, streamed in chunks.
+    k-1 bases are carried across chunk boundaries so no k-mer is lost.
+    """
+    if k > MAX_SPECTRUM_K:
+        raise ValueError(f"Dense spectra are limited to k <= {MAX_SPECTRUM_K}")
+    spectrum = np.zeros(4**k, dtype=np.int64)
+    current, carry = None, np.empty(0, dtype=np.uint8)
+    for index, _, chunk in iter_sequence_chunks(source, chunk_size):
+        if index != current:
+            current, carry = index, np.empty(0, dtype=np.uint8)
+        if not chunk:
+            continue
+        codes = np.concatenate([carry, encode_sequence(chunk)])
+        spectrum += _spectrum_of(codes, k, canonical)
+        carry = codes[-(k - 1):] if k > 1 else codes[:0]
+    return spectrum
+
+
+def encode_kmer(kmer):
+    """Hash of a single k-mer string (raises on non-ACGT characters)."""
+    codes = encode_sequence(kmer.upper())
+    if np.any(codes == INVALID):
+        raise ValueError(f"Motif {kmer!r} contains non-ACGT characters")
+    value = 0
+    for code in codes:
+        value = (value << 2) | int(code)
+    return value
+
+
+def decode_kmer(value, k):
+    """k-mer string of a hash produced by kmer_hashes."""
+    return "".join(NUCLEOTIDES[(int(value) >> (2 * (k - 1 - i))) & 3] for i in range(k))
+
+
+def count_motifs(sequences, motifs):
+    """
+    Overlapping occurrence counts of many motifs at once.
+
+    Motifs are grouped by length; each length needs one rolling-hash pass
+    per sequence, and all motifs of that length are matched together with a
+    sorted lookup. Unlike Seq.count, overlapping hits are all counted
+    (e.g. "AA" occurs twice in "AAA"). Returns {motif: count}.
+    """
+    sequences = _as_collection(sequences)
+    encoded = [encode_sequence(s) for s in sequences]
+
+    counts = {}
+    by_length = {}
+    for motif in motifs:
+        by_length.setdefault(len(motif), []).append(motif)
+    for k, group in by_length.items():
+        targets = np.array([encode_kmer(m) for m in group], dtype=np.uint64)
+        order = np.argsort(targets)
+        sorted_targets = targets[order]
+        totals = np.zeros(len(group), dtype=np.int64)
+        for codes in encoded:
+            hashes, valid = kmer_hashes(codes, k)
+            hashes = hashes[valid].astype(np.uint64)
+            pos = np.searchsorted(sorted_targets, hashes)
+            pos[pos == len(sorted_targets)] = 0
+            hit = sorted_targets[pos] == hashes
+            totals[order] += np.bincount(pos[hit], minlength=len(group))
+        counts.update(zip(group, totals.tolist()))
+    return {motif: counts[motif] for motif in motifs}
+
+
+def kmer_table(spectrum, k, top=None):
+    """DataFrame of (kmer, count) for the non-zero entries of a spectrum, most frequent first."""
+    nonzero = np.flatnonzero(spectrum)
+    order = nonzero[np.argsort(spectrum[nonzero], kind="stable")[::-1]]
+    if top is not None:
+        order = order[:top]
+    return pd.DataFrame({
+        "kmer": [decode_kmer(v, k) for v in order],
+        "count": spectrum[order],
+    })
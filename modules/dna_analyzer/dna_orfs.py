@@ -0,0 +1,132 @@
+
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+from Bio.Data.CodonTable import unambiguous_dna_by_id
+from .dna_kmers import INVALID, NUCLEOTIDES, encode_sequence, reverse_complement_codes
+
+ORF_COLUMNS = ["Record", "Strand", "Frame", "Start", "End", "Length_aa"]
+
+# Codon index = 16*b1 + 4*b2 + b3 (A=0 C=1 G=2 T=3); index 64 = codon with an invalid base
+NO_CODON = 64
+
+
+def codon_lookup_table(table_id=1):
+    """Amino-acid byte per codon index for an NCBI translation table ('*' = stop, 'X' = unknown)."""
+    table = unambiguous_dna_by_id[table_id]
+    lookup = np.full(NO_CODON + 1, ord("X"), dtype=np.uint8)
+    for index in range(NO_CODON):
+        codon = NUCLEOTIDES[index >> 4] + NUCLEOTIDES[(index >> 2) & 3] + NUCLEOTIDES[index & 3]
+        if codon in table.stop_codons:
+            lookup[index] = ord("*")
+        else:
+            lookup[index] = ord(table.forward_table[codon])
+    return lookup
+
+
+CODON_TABLE = codon_lookup_table()
+
+
+def codon_indices(codes, frame=0):
+    """Vectorized codon indices (0-64) of an encoded sequence read in the given frame."""
+    n_codons = max(len(codes) - frame, 0) // 3
+    codons = codes[frame : frame + 3 * n_codons].reshape(-1, 3).astype(np.int16)
+    index = codons[:, 0] * 16 + codons[:, 1] * 4 + codons[:, 2]
+    index[(codons == INVALID).any(axis=1)] = NO_CODON
+    return index
+
+
+def translate_frame(codes, frame=0, lookup=CODON_TABLE):
+    """Translate one frame of an encoded sequence into an array of amino-acid bytes."""
+    return lookup[codon_indices(codes, frame)]
+
+
+def _frame_orfs(protein, min_length, require_start):
+    """
+    (start, stop) codon positions of ORFs in one translated frame.
+    Each ORF runs from the first M (or the codon after the previous stop)
+    up to and including a stop codon.
+    """
+    stops = np.flatnonzero(protein == ord("*"))
+    seg_start = np.concatenate([[0], stops[:-1] + 1])
+    if require_start:
+        starts = np.flatnonzero(protein == ord("M"))
+        first = np.searchsorted(starts, seg_start)
+        has_start = first < len(starts)
+        seg_start = np.append(starts, 0)[first]
+        keep = has_start & (seg_start < stops)
+    else:
+        keep = np.ones(len(stops), dtype=bool)
+    keep &= stops - seg_start >= min_length
+    return seg_start[keep], stops[keep]
+
+
+def find_orfs(sequence, min_length=30, require_start=True, table_id=1, include_protein=False, record=None):
+    """
+    Open reading frames in all six frames of a sequence.
+
+    A frame is translated in one vectorized lookup of its codon indices; ORFs
+    are the stretches from a start codon (ATG, or any codon after a stop when
+    `require_start=False`) to the next stop codon, with at least `min_length`
+    amino acids. Coordinates are 0-based, half-open on the forward strand
+    and include the stop codon. Returns a DataFrame (ORF_COLUMNS, plus
+    Protein when include_protein=True).
+    """
+    lookup = CODON_TABLE if table_id == 1 else codon_lookup_table(table_id)
+    codes = encode_sequence(sequence)
+    n = len(codes)
+    parts = []
+    for strand, strand_codes in ((1, codes), (-1, reverse_complement_codes(codes))):
+        for frame in range(3):
+            protein = translate_frame(strand_codes, frame, lookup)
+            starts, stops = _frame_orfs(protein, min_length, require_start)
+            nt_start = frame + 3 * starts
+            nt_end = frame + 3 * (stops + 1)
+            if strand == -1:
+                nt_start, nt_end = n - nt_end, n - nt_start
+            part = {
+                "Strand": np.full(len(starts), strand, dtype=np.int8),
+                "Frame": np.full(len(starts), frame, dtype=np.int8),
+                "Start": nt_start.astype(np.int64),
+                "End": nt_end.astype(np.int64),
+                "Length_aa": (stops - starts).astype(np.int32),
+            }
+            if include_protein:
+                part["Protein"] = [protein[a:b].tobytes().decode("ascii") for a, b in zip(starts, stops)]
+            parts.append(pd.DataFrame(part))
+    orfs = pd.concat(parts, ignore_index=True)
+    orfs.insert(0, "Record", record)
+    return orfs.sort_values(["Start", "Strand"], ignore_index=True)
+
+
+def _find_orfs_batch(records, kwargs):
+    return pd.concat([find_orfs(seq, record=rid, **kwargs) for rid, seq in records], ignore_index=True)
+
+
+def find_orfs_batch(sequences, min_length=30, workers=None, batch_size=256, results_file=None, **kwargs):
+    """
+    Six-frame ORF search over many sequences across a process pool.
+
+    `sequences` is a dict {record_id: sequence} or an iterable of sequences
+    (records are then numbered). `workers=1` runs in-process. Returns one
+    table of ORFs with a categorical Record column and optionally saves it
+    to CSV.
+    """
+    records = list(sequences.items()) if isinstance(sequences, dict) else list(enumerate(sequences))
+    batches = [records[i : i + batch_size] for i in range(0, len(records), batch_size)]
+    kwargs.update(min_length=min_length)
+
+    if workers == 1 or len(batches) <= 1:
+        per_batch = [_find_orfs_batch(batch, kwargs) for batch in batches]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            per_batch = list(pool.map(_find_orfs_batch, batches, [kwargs] * len(batches)))
+
+    orfs = pd.concat(per_batch, ignore_index=True) if per_batch else pd.DataFrame(columns=ORF_COLUMNS)
+    orfs["Record"] = orfs["Record"].astype("category")
+    print(f" Found {len(orfs)} ORFs in {len(records)} sequences")
+
+    if results_file:
+        orfs.to_csv(results_file, index=False)
+        print(f" ORF table saved to {results_file}")
+    return orfs
@@ -0,0 +1,131 @@
+
+import numpy as np
+from Bio.Seq import Seq
+from .dna_kmers import INVALID, NUCLEOTIDES, encode_sequence
+
+BASES_PER_BYTE = 4
+_SHIFTS = np.array([6, 4, 2, 0], dtype=np.uint8)
+_ALPHABET = np.frombuffer((NUCLEOTIDES + "N").encode("ascii"), dtype=np.uint8)
+# Number of G/C bases packed in each possible byte (C=1, G=2)
+_BYTE_CODES = (np.arange(256, dtype=np.uint8)[:, None] >> _SHIFTS) & 3
+_GC_PER_BYTE = ((_BYTE_CODES == 1) | (_BYTE_CODES == 2)).sum(axis=1)
+
+
+def pack_codes(codes):
+    """Pack 2-bit codes (0-3, anything else stored as A) four per byte, first base in the high bits."""
+    codes = np.asarray(codes, dtype=np.uint8)
+    padded = np.zeros(-(-len(codes) // BASES_PER_BYTE) * BASES_PER_BYTE, dtype=np.uint8)
+    padded[: len(codes)] = codes
+    padded[padded == INVALID] = 0
+    quads = padded.reshape(-1, BASES_PER_BYTE)
+    return (quads[:, 0] << 6) | (quads[:, 1] << 4) | (quads[:, 2] << 2) | (quads[:, 3] & 3)
+
+
+def unpack_bytes(data, start, stop):
+    """2-bit codes of bases [start, stop) of a packed buffer."""
+    first, last = start // BASES_PER_BYTE, -(-stop // BASES_PER_BYTE)
+    codes = ((data[first:last, None] >> _SHIFTS) & 3).reshape(-1)
+    offset = first * BASES_PER_BYTE
+    return codes[start - offset : stop - offset]
+
+
+class PackedDNA:
+    """
+    DNA sequence stored at 2 bits per base plus a sparse N-mask.
+
+    Ambiguous bases are stored as A in the packed buffer and their
+    positions kept in a sorted index array. Contiguous slices are views
+    sharing the buffer and mask (no copy); reverse complement, strided
+    slices and concatenation produce new sequences.
+    """
+
+    __slots__ = ("_data", "_n_positions", "_start", "_length")
+
+    def __init__(self, data, n_positions, start, length):
+        self._data = data
+        self._n_positions = n_positions  # absolute positions in _data
+        self._start = start
+        self._length = length
+
+    @classmethod
+    def from_codes(cls, codes):
+        """Build from 2-bit codes as produced by dna_kmers.encode_sequence (4 = N)."""
+        codes = np.asarray(codes, dtype=np.uint8)
+        return cls(pack_codes(codes), np.flatnonzero(codes == INVALID), 0, len(codes))
+
+    @classmethod
+    def from_str(cls, sequence):
+        """Build from a str, bytes or Bio.Seq sequence."""
+        return cls.from_codes(encode_sequence(sequence))
+
+    def __len__(self):
+        return self._length
+
+    @property
+    def nbytes(self):
+        """Bytes held by this sequence (shared with any views)."""
+        return self._data.nbytes + self._n_positions.nbytes
+
+    def n_positions(self):
+        """Positions of N (ambiguous) bases within this sequence."""
+        lo, hi = np.searchsorted(self._n_positions, [self._start, self._start + self._length])
+        return self._n_positions[lo:hi] - self._start
+
+    def codes(self):
+        """2-bit codes (uint8, 4 = N) of the sequence, as used by dna_kmers."""
+        codes = unpack_bytes(self._data, self._start, self._start + self._length)
+        codes[self.n_positions()] = INVALID
+        return codes
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            start, stop, step = key.indices(self._length)
+            if step == 1:
+                return PackedDNA(self._data, self._n_positions, self._start + start, max(stop - start, 0))
+            return PackedDNA.from_codes(self.codes()[key])
+        if key < 0:
+            key += self._length
+        if not 0 <= key < self._length:
+            raise IndexError("PackedDNA index out of range")
+        return str(self[key : key + 1])
+
+    def __str__(self):
+        return _ALPHABET[self.codes()].tobytes().decode("ascii")
+
+    def __repr__(self):
+        text = str(self[:40]) + ("..." if self._length > 40 else "")
+        return f"PackedDNA('{text}', length={self._length})"
+
+    def __eq__(self, other):
+        if not isinstance(other, PackedDNA):
+            return NotImplemented
+        return self._length == other._length and np.array_equal(self.codes(), other.codes())
+
+    def to_seq(self):
+        return Seq(str(self))
+
+    def reverse_complement(self):
+        codes = self.codes()[::-1]
+        return PackedDNA.from_codes(np.where(codes == INVALID, INVALID, 3 - codes))
+
+    def __add__(self, other):
+        return PackedDNA.from_codes(np.concatenate([self.codes(), other.codes()]))
+
+    def gc_count(self):
+        """Number of G/C bases, counted per packed byte with a lookup table."""
+        start, stop = self._start, self._start + self._length
+        first, last = -(-start // BASES_PER_BYTE), stop // BASES_PER_BYTE
+        if first >= last:
+            codes = self.codes()
+            return int(np.count_nonzero((codes == 1) | (codes == 2)))
+        # Whole bytes via the table, partial edge bytes base by base (N is stored as A)
+        gc = int(_GC_PER_BYTE[self._data[first:last]].sum())
+        edges = np.concatenate([
+            unpack_bytes(self._data, start, first * BASES_PER_BYTE),
+            unpack_bytes(self._data, last * BASES_PER_BYTE, stop),
+        ])
+        return gc + int(np.count_nonzero((edges == 1) | (edges == 2)))
+
+    def gc_content(self):
+        """GC content (%) over all bases, matching analyze_dna."""
+        return round(100 * self.gc_count() / self._length, 2) if self._length else 0
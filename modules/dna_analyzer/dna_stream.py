@@ -0,0 +1,222 @@
+
+import gzip
+import io
+from Bio.Seq import Seq
+
+# Characters read per chunk (sequence data is yielded in pieces of about this size)
+CHUNK_SIZE = 1 << 20
+
+
+def _open_text(source):
+    """Open a path (optionally .gz) as text, or pass a text/binary handle through."""
+    if hasattr(source, "read"):
+        if isinstance(source, io.TextIOBase):
+            return source
+        return io.TextIOWrapper(source, encoding="ascii", errors="replace")
+    if str(source).endswith(".gz"):
+        return gzip.open(source, "rt")
+    return open(source)
+
+
+def _iter_fasta(handle, chunk_size):
+    """Block-wise FASTA parser yielding (index, record_id, sequence_chunk)."""
+    index = -1
+    record_id = None
+    header = None  # partial header line while it spans blocks
+    while True:
+        block = handle.read(chunk_size)
+        if not block:
+            break
+        pos = 0
+        while pos < len(block):
+            if header is not None:
+                nl = block.find("\n", pos)
+                if nl == -1:
+                    header += block[pos:]
+                    break
+                header += block[pos:nl]
+                fields = header.split()
+                record_id = fields[0] if fields else ""
+                index += 1
+                header = None
+                pos = nl + 1
+                # Announce the record even if its sequence turns out empty
+                yield index, record_id, ""
+                continue
+            gt = block.find(">", pos)
+            end = len(block) if gt == -1 else gt
+            seq = block[pos:end].replace("\n", "").replace("\r", "")
+            if seq and index >= 0:
+                yield index, record_id, seq
+            if gt == -1:
+                break
+            header = ""
+            pos = gt + 1
+
+
+def _iter_fastq(handle, chunk_size):
+    """Four-line FASTQ parser; long sequence lines are read in chunk_size pieces."""
+    index = -1
+    while True:
+        header = handle.readline()
+        if not header:
+            break
+        if not header.strip():
+            continue
+        if not header.startswith("@"):
+            raise ValueError(f"Malformed FASTQ record header: {header[:50]!r}")
+        index += 1
+        fields = header[1:].split()
+        record_id = fields[0] if fields else ""
+        yield index, record_id, ""
+
+        # Sequence line, possibly far longer than chunk_size
+        while True:
+            piece = handle.readline(chunk_size)
+            seq = piece.rstrip("\r\n")
+            if seq:
+                yield index, record_id, seq
+            if not piece or piece.endswith("\n"):
+                break
+        handle.readline()  # '+' separator
+        # Quality line, skipped without holding it in memory
+        while True:
+            piece = handle.readline(chunk_size)
+            if not piece or piece.endswith("\n"):
+                break
+
+
+class _Prepend:
+    """Text handle with already-consumed characters pushed back in front."""
+
+    def __init__(self, prefix, handle):
+        self.prefix = prefix
+        self.handle = handle
+
+    def read(self, size=-1):
+        data, self.prefix = self.prefix, ""
+        return data + self.handle.read(size - len(data) if size >= 0 else -1)
+
+    def readline(self, size=-1):
+        data, self.prefix = self.prefix, ""
+        if data.endswith("\n"):
+            return data
+        return data + self.handle.readline(size - len(data) if size >= 0 else -1)
+
+    def close(self):
+        self.handle.close()
+
+
+def iter_sequence_chunks(source, chunk_size=CHUNK_SIZE, fmt=None):
+    """
+    Stream a FASTA or FASTQ file (path, .gz path or open handle) record by
+    record, and in chunks within long records.
+
+    Yields (record_index, record_id, chunk). Every record starts with an
+    empty chunk so records without sequence are still reported. The format
+    is taken from `fmt` ("fasta"/"fastq"), the file extension, or the first
+    character of the data.
+    """
+    handle = _open_text(source)
+    try:
+        if fmt is None:
+            name = str(getattr(source, "name", source)).lower().removesuffix(".gz")
+            if name.endswith((".fastq", ".fq")):
+                fmt = "fastq"
+            elif name.endswith((".fasta", ".fa", ".fna", ".faa")):
+                fmt = "fasta"
+            else:
+                first = handle.read(1)
+                fmt = "fastq" if first == "@" else "fasta"
+                handle = _Prepend(first, handle)
+        parser = _iter_fastq if fmt == "fastq" else _iter_fasta
+        yield from parser(handle, chunk_size)
+    finally:
+        if not hasattr(source, "read"):
+            handle.close()
+
+
+class MotifCounter:
+    """
+    Non-overlapping motif count over a sequence fed in chunks, identical to
+    Seq.count / str.count on the whole sequence.
+    """
+
+    def __init__(self, motif):
+        self.motif = motif.upper()
+        m = len(self.motif)
+        # Only self-overlapping motifs (e.g. "AA", "ATA") need the greedy scan
+        self.self_overlapping = any(self.motif[i:] == self.motif[: m - i] for i in range(1, m))
+        self.carry = ""
+        self.count = 0
+
+    def feed(self, chunk):
+        buf = self.carry + chunk
+        m = len(self.motif)
+        if not self.self_overlapping:
+            self.count += buf.count(self.motif)
+            self.carry = buf[len(buf) - (m - 1):] if m > 1 else ""
+            return
+        pos = 0
+        while True:
+            i = buf.find(self.motif, pos)
+            if i == -1:
+                break
+            self.count += 1
+            pos = i + m
+        self.carry = buf[max(pos, len(buf) - (m - 1)):]
+
+
+def analyze_dna_stream(source, motifs=("ATG",), chunk_size=CHUNK_SIZE, include_sequences=False, fmt=None):
+    """
+    Analyze every record of a FASTA/FASTQ file with bounded memory.
+
+    Yields one dict per record with the same keys as analyze_dna (plus
+    "Record ID" and one "Motif X Count" per motif). Length, GC content and
+    motif counts are accumulated chunk by chunk; the full sequence, RNA and
+    protein strings are only built when `include_sequences` is True.
+    """
+    def finish(state):
+        record_id, length, gc, counters, pieces = state
+        result = {
+            "Record ID": record_id,
+            "Length": length,
+            "GC Content (%)": round(100 * gc / length, 2) if length > 0 else 0,
+        }
+        if include_sequences:
+            seq = "".join(pieces["seq"])
+            result["Sequence"] = seq
+            result["RNA Transcription"] = seq.replace("T", "U")
+            result["Protein Translation"] = "".join(pieces["protein"])
+        for counter in counters:
+            result[f"Motif {counter.motif} Count"] = counter.count
+        return result
+
+    state = None
+    current = None
+    for index, record_id, chunk in iter_sequence_chunks(source, chunk_size, fmt):
+        if index != current:
+            if state is not None:
+                yield finish(state)
+            current = index
+            pieces = {"seq": [], "protein": [], "codon_carry": "", "stopped": False}
+            state = [record_id, 0, 0, [MotifCounter(m) for m in motifs], pieces]
+        if not chunk:
+            continue
+        chunk = chunk.upper()
+        state[1] += len(chunk)
+        state[2] += chunk.count("G") + chunk.count("C")
+        for counter in state[3]:
+            counter.feed(chunk)
+        if include_sequences:
+            pieces["seq"].append(chunk)
+            if not pieces["stopped"]:
+                # Frame-1 translation up to the first stop, codon-aligned across chunks
+                coding = pieces["codon_carry"] + chunk
+                usable = len(coding) - len(coding) % 3
+                protein = str(Seq(coding[:usable]).translate(to_stop=True))
+                pieces["protein"].append(protein)
+                pieces["stopped"] = len(protein) < usable // 3
+                pieces["codon_carry"] = coding[usable:]
+    if state is not None:
+        yield finish(state)
@@ -1,10 +1,41 @@
 
 import random
+import numpy as np
 
 def generate_sample_dna(length=60):
     """Generate a random DNA sequence of a given length."""
     nucleotides = ["A", "T", "G", "C"]
     return "".join(random.choice(nucleotides) for _ in range(length))
 
+def generate_sample_dna_bulk(n_sequences=1000, length=1000, gc_content=0.5, n_fraction=0.0, seed=None, packed=False):
+    """
+    Generate many random DNA sequences at once for load testing.
+
+    Bases are drawn as 2-bit codes in one vectorized call (GC-biased when
+    gc_content != 0.5, with an optional fraction of N). Returns a list of
+    str, or of PackedDNA views over one shared buffer when packed=True.
+    """
+    from .dna_packed import PackedDNA
+
+    rng = np.random.default_rng(seed)
+    total = n_sequences * length
+    if gc_content == 0.5 and n_fraction == 0 and packed and length % 4 == 0:
+        # Uniform bases: every random byte is already 4 packed bases
+        data = rng.integers(0, 256, total // 4, dtype=np.uint8)
+        genome = PackedDNA(data, np.empty(0, dtype=np.int64), 0, total)
+    else:
+        at, gc = (1 - gc_content) / 2, gc_content / 2
+        draws = rng.random(total)
+        codes = (draws >= at).astype(np.uint8)
+        codes += draws >= at + gc
+        codes += draws >= at + 2 * gc
+        if n_fraction:
+            codes[rng.random(total) < n_fraction] = 4
+        if not packed:
+            text = np.frombuffer(b"ACGTN", dtype=np.uint8)[codes].tobytes().decode("ascii")
+            return [text[i : i + length] for i in range(0, total, length)]
+        genome = PackedDNA.from_codes(codes)
+    return [genome[i : i + length] for i in range(0, total, length)]
+
 if __name__ == "__main__":
     print(f"Sample DNA Sequence: {generate_sample_dna()}")
@@ -0,0 +1,183 @@
+
+import os
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+from scipy.optimize import OptimizeWarning, curve_fit
+from .dose_response_ci import bootstrap_ci, covariance_ci
+from .dose_response_fitter import MODELS, check_ci, default_bounds, estimate_initial_params
+from ..tabular_io import write_table
+
+# Diagnostic columns of the batch results table (after the model parameters)
+DIAGNOSTIC_COLUMNS = [
+    "EC50_SE",
+    "Hill_Slope_SE",
+    "R_squared",
+    "RMSE",
+    "n_points",
+    "nfev",
+    "success",
+    "message",
+]
+
+
+# Confidence-interval columns added when a CI mode is requested
+CI_COLUMNS = ["EC50_uM_CI_low", "EC50_uM_CI_high", "Hill_Slope_CI_low", "Hill_Slope_CI_high"]
+
+
+def result_columns(model="hill", ci=None):
+    """Columns of the batch results table for a model"""
+    ci_columns = CI_COLUMNS if ci else []
+    if ci == "bootstrap":
+        ci_columns = ci_columns + ["n_boot_used"]
+    return ["Compound"] + MODELS[model][2] + ci_columns + DIAGNOSTIC_COLUMNS
+
+
+def fit_quality(dose, popt, pcov, ier, mesg, bounds, param_names):
+    """
+    (success, message) of a finished curve_fit: the optimizer must report
+    convergence (ier 1-4), no parameter may sit on its bound, the standard
+    errors must be finite and the EC50 must lie within the tested doses
+    (noise-only curves otherwise "converge" to an extrapolated EC50).
+    """
+    if ier not in (1, 2, 3, 4):
+        return False, f"Not converged: {mesg}"
+    lower, upper = np.asarray(bounds[0], dtype=float), np.asarray(bounds[1], dtype=float)
+    at_bound = np.isclose(popt, lower) | np.isclose(popt, upper)
+    if at_bound.any():
+        return False, "Parameter at bound: " + ", ".join(np.asarray(param_names)[at_bound])
+    if not np.all(np.isfinite(popt)) or not np.all(np.isfinite(np.diag(pcov))):
+        return False, "Parameters not identifiable (non-finite standard errors)"
+    ec50 = popt[param_names.index("EC50_uM")]
+    if not dose.min() <= ec50 <= dose.max():
+        return False, "EC50 outside the tested dose range"
+    return True, mesg
+
+
+def fit_curve(dose, response, model="hill", p0=None, maxfev=2000, ci=None, n_boot=1000, seed=None):
+    """
+    Fit one curve with the model's analytic Jacobian, starting from
+    data-driven estimates unless `p0` is given.
+    ci="covariance" or ci="bootstrap" adds 95% intervals for EC50 and slope.
+    Non-finite points are dropped. Fit failures never raise: they are
+    reported through `success` and `message` (see fit_quality; an unknown
+    `ci` method does raise ValueError).
+    """
+    check_ci(ci)
+    func, jac, param_names = MODELS[model]
+    dose = np.asarray(dose, dtype=float)
+    response = np.asarray(response, dtype=float)
+    finite = np.isfinite(dose) & np.isfinite(response) & (dose > 0)
+    dose, response = dose[finite], response[finite]
+    result = {"n_points": len(dose), "nfev": 0, "success": False}
+    if len(dose) <= len(param_names):
+        result["message"] = "Not enough finite data points"
+        return result
+    try:
+        # Divergent trial steps overflow harmlessly; keep worker logs quiet
+        with warnings.catch_warnings(), np.errstate(all="ignore"):
+            warnings.simplefilter("ignore", OptimizeWarning)
+            warnings.simplefilter("ignore", RuntimeWarning)
+            if p0 is None:
+                p0 = estimate_initial_params(dose, response, model)
+            # curve_fit rejects a start outside the bounds (e.g. a steep estimated slope)
+            bounds = default_bounds(dose, response, model)
+            popt, pcov, info, mesg, ier = curve_fit(
+                func, dose, response, p0=np.clip(p0, *bounds), jac=jac,
+                bounds=bounds, maxfev=maxfev, full_output=True,
+            )
+    except (RuntimeError, ValueError, np.linalg.LinAlgError) as e:
+        result["message"] = str(e)
+        return result
+
+    residuals = response - func(dose, *popt)
+    ss_res = np.sum(residuals**2)
+    ss_tot = np.sum((response - response.mean()) ** 2)
+    se = dict(zip(param_names, np.sqrt(np.diag(pcov))))
+    success, message = fit_quality(dose, popt, pcov, ier, mesg, bounds, param_names)
+    result.update(zip(param_names, popt))
+    result.update({
+        "EC50_SE": se["EC50_uM"],
+        "Hill_Slope_SE": se["Hill_Slope"],
+        "R_squared": 1 - ss_res / ss_tot if ss_tot > 0 else np.nan,
+        "RMSE": np.sqrt(ss_res / len(dose)),
+        "nfev": info["nfev"],
+        "success": success,
+        "message": message,
+    })
+
+    if ci and result["success"]:
+        with np.errstate(all="ignore"):
+            if ci == "bootstrap":
+                intervals, result["n_boot_used"] = bootstrap_ci(dose, response, model, n_boot=n_boot, seed=seed, p0=popt)
+            else:
+                intervals = covariance_ci(popt, pcov, len(dose), model)
+        for name in ("EC50_uM", "Hill_Slope"):
+            result[f"{name}_CI_low"], result[f"{name}_CI_high"] = intervals[name]
+    return result
+
+
+def _fit_curves(curves, kwargs):
+    """Fit a batch of (compound, dose, response) curves in a worker."""
+    kwargs = dict(kwargs)
+    base_seed = kwargs.pop("seed", None)
+    rows = []
+    for index, compound, dose, response in curves:
+        # Per-curve seed derived from the curve position: reproducible for any batching
+        seed = np.random.SeedSequence([base_seed, index]) if base_seed is not None else None
+        row = fit_curve(dose, response, seed=seed, **kwargs)
+        row["Compound"] = compound
+        rows.append(row)
+    return rows
+
+
+def fit_dose_response_batch(
+    df,
+    compound_col="Compound",
+    dose_col="Dose_uM",
+    response_col="Response_percent",
+    workers=None,
+    batch_size=64,
+    results_file=None,
+    model="hill",
+    ci=None,
+    **fit_kwargs,
+):
+    """
+    Fit one Hill curve per compound of a long-format (compound, dose, response)
+    DataFrame, e.g. a whole 384/1536-well screening plate.
+
+    Curves ("hill", "4pl" or "5pl" model) are fitted from data-driven initial
+    estimates with the analytic Jacobian in batches across a process
+    pool (`workers=1` fits in-process). A curve that fails to converge only
+    marks its own row (`success=False`) and never aborts the plate.
+    ci="covariance" or ci="bootstrap" (pass n_boot/seed) adds EC50 and
+    slope confidence intervals; bootstrap seeds are derived per curve.
+    Returns one results row per compound and optionally saves it (CSV,
+    Parquet or Feather, by the extension of results_file).
+    """
+    check_ci(ci)
+    df = df[[compound_col, dose_col, response_col]]
+    curves = [
+        (index, compound, group[dose_col].to_numpy(), group[response_col].to_numpy())
+        for index, (compound, group) in enumerate(df.groupby(compound_col, sort=False))
+    ]
+    batches = [curves[i : i + batch_size] for i in range(0, len(curves), batch_size)]
+    fit_kwargs.update(model=model, ci=ci)
+
+    if workers == 1 or len(batches) <= 1:
+        per_batch = [_fit_curves(batch, fit_kwargs) for batch in batches]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            per_batch = list(pool.map(_fit_curves, batches, [fit_kwargs] * len(batches)))
+
+    results = pd.DataFrame([row for rows in per_batch for row in rows], columns=result_columns(model, ci))
+    results = results.rename(columns={"Compound": compound_col})
+    n_failed = int((~results["success"]).sum())
+    print(f" Fitted {len(results)} dose-response curves ({n_failed} failed)")
+
+    if results_file:
+        write_table(results, results_file)
+        print(f" Batch fit results saved to {results_file}")
+    return results
@@ -0,0 +1,186 @@
+
+import os
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from scipy import stats
+from scipy.optimize import curve_fit
+from .dose_response_fitter import MODELS, default_bounds, estimate_initial_params
+
+
+def covariance_ci(popt, pcov, n_points, model="hill", confidence=0.95):
+    """
+    Fast CI from the curve_fit covariance (t-distribution, n - p dof).
+
+    The EC50 interval is built on log(EC50) via the delta method so it stays
+    positive; other parameters use a symmetric Wald interval.
+    Returns {param: (low, high)}.
+    """
+    param_names = MODELS[model][2]
+    dof = max(n_points - len(popt), 1)
+    t_crit = stats.t.ppf(0.5 + confidence / 2, dof)
+    se = np.sqrt(np.diag(pcov))
+    ci = {}
+    for name, value, err in zip(param_names, popt, se):
+        if name == "EC50_uM" and value > 0:
+            half = t_crit * err / value
+            ci[name] = (value * np.exp(-half), value * np.exp(half))
+        else:
+            ci[name] = (value - t_crit * err, value + t_crit * err)
+    return ci
+
+
+def fit_curves_vectorized(dose, response, model="hill", p0=None, bounds=None, max_iter=200, tol=1e-8):
+    """
+    Fit many curves at once with a batched Levenberg-Marquardt solver.
+
+    `dose` and `response` have shape (n_curves, n_points); `p0` is
+    (n_curves, n_params) and `bounds` a (lower, upper) pair shared by all
+    curves. Every iteration is a handful of NumPy operations over all curves
+    (batched normal equations and solves), with a damping factor per curve.
+    EC50 is optimized as log(EC50), which keeps it positive and makes the
+    problem far better conditioned. Returns (params, converged) arrays.
+    """
+    func, jac, param_names = MODELS[model]
+    dose = np.asarray(dose, dtype=float)
+    response = np.asarray(response, dtype=float)
+    n_curves, n_params = dose.shape[0], len(param_names)
+    k_ec50 = param_names.index("EC50_uM")
+
+    lower, upper = np.full(n_params, -np.inf), np.full(n_params, np.inf)
+    if bounds is not None:
+        lower, upper = np.array(bounds[0], dtype=float), np.array(bounds[1], dtype=float)
+    with np.errstate(divide="ignore"):
+        lower[k_ec50], upper[k_ec50] = np.log(max(lower[k_ec50], 0)), np.log(upper[k_ec50])
+
+    def natural(theta):
+        p = theta.copy()
+        p[:, k_ec50] = np.exp(p[:, k_ec50])
+        return [p[:, k, None] for k in range(n_params)]
+
+    def cost_of(theta):
+        r = response - func(dose, *natural(theta))
+        return r, np.sum(r**2, axis=1)
+
+    theta = np.array(p0, dtype=float).reshape(n_curves, n_params)
+    theta[:, k_ec50] = np.log(theta[:, k_ec50])
+    theta = np.clip(theta, lower, upper)
+
+    damping = np.full(n_curves, 1e-3)
+    converged = np.zeros(n_curves, dtype=bool)
+    eye = np.eye(n_params)
+    with np.errstate(all="ignore"):
+        residuals, cost = cost_of(theta)
+        for _ in range(max_iter):
+            active = ~converged & np.isfinite(cost)
+            if not active.any():
+                break
+            params = natural(theta)
+            J = jac(dose, *params)
+            J[:, :, k_ec50] *= params[k_ec50]  # chain rule for log(EC50)
+            A = np.einsum("bni,bnj->bij", J, J)
+            g = np.einsum("bni,bn->bi", J, residuals)
+            diag = np.einsum("bii->bi", A)
+            A_damped = A + (damping[:, None] * np.maximum(diag, 1e-12))[:, :, None] * eye
+            ok = active & np.all(np.isfinite(A_damped), axis=(1, 2)) & np.all(np.isfinite(g), axis=1)
+            A_damped[~ok] = eye
+            g[~ok] = 0
+            try:
+                step = np.linalg.solve(A_damped, g[:, :, None])[:, :, 0]
+            except np.linalg.LinAlgError:
+                # A singular system (flat curve) must not abort the whole batch
+                step = (np.linalg.pinv(A_damped) @ g[:, :, None])[:, :, 0]
+
+            trial = np.clip(theta + step, lower, upper)
+            trial_residuals, trial_cost = cost_of(trial)
+            improved = ok & np.isfinite(trial_cost) & (trial_cost < cost)
+
+            # Converged once an accepted step no longer moves the parameters
+            # or no longer reduces the cost (like curve_fit's xtol/ftol)
+            small_step = np.all(np.abs(trial - theta) <= tol * (np.abs(theta) + tol), axis=1)
+            small_gain = cost - trial_cost <= tol * cost
+            converged |= improved & (small_step | small_gain)
+            converged |= ok & (damping > 1e10)  # no downhill step left: at a minimum
+
+            theta[improved] = trial[improved]
+            residuals[improved] = trial_residuals[improved]
+            cost[improved] = trial_cost[improved]
+            damping = np.where(improved, damping / 10, damping * 10)
+
+    params = np.column_stack(natural(theta))
+    params[~np.isfinite(cost)] = np.nan
+    return params, converged
+
+
+def _bootstrap_replicates(dose, response, indices, model, p0, bounds):
+    """
+    Fit one block of bootstrap resamples (rows of `indices`) in a worker.
+
+    Replicates the batched solver did not converge on, or left at a
+    parameter bound, are re-fitted with curve_fit from `p0`; those that
+    still fail are returned as NaN rows.
+    """
+    params, converged = fit_curves_vectorized(dose[indices], response[indices], model, np.tile(p0, (len(indices), 1)), bounds)
+    lower, upper = np.asarray(bounds[0], dtype=float), np.asarray(bounds[1], dtype=float)
+    at_bound = np.any(np.isclose(params, lower) | np.isclose(params, upper), axis=1)
+    func, jac, _ = MODELS[model]
+    with warnings.catch_warnings(), np.errstate(all="ignore"):
+        warnings.simplefilter("ignore")
+        for i in np.flatnonzero(~converged | at_bound | ~np.all(np.isfinite(params), axis=1)):
+            rows = indices[i]
+            try:
+                params[i] = curve_fit(func, dose[rows], response[rows], p0=p0, jac=jac, bounds=bounds)[0]
+            except (RuntimeError, ValueError, np.linalg.LinAlgError):
+                params[i] = np.nan
+    return params
+
+
+def bootstrap_ci(
+    dose,
+    response,
+    model="hill",
+    n_boot=1000,
+    confidence=0.95,
+    seed=None,
+    workers=1,
+    block_size=500,
+    p0=None,
+):
+    """
+    Percentile bootstrap CI for every model parameter of one curve.
+
+    (dose, response) pairs are resampled with replacement; all replicates
+    are fitted together by fit_curves_vectorized, in blocks that can be
+    spread across a process pool. The resample indices are drawn up front
+    from `seed`, so results do not depend on `workers` or `block_size`.
+    Replicates that do not converge or end at a parameter bound are
+    re-fitted with curve_fit; replicates that fail entirely are left out.
+    Returns ({param: (low, high)}, number of replicates used).
+    """
+    dose = np.asarray(dose, dtype=float)
+    response = np.asarray(response, dtype=float)
+    if p0 is None:
+        p0 = estimate_initial_params(dose, response, model)
+    bounds = default_bounds(dose, response, model)
+
+    # Blocks are drawn in order from one stream (same indices as a single
+    # draw); in-process, only one block of indices exists at a time
+    rng = np.random.default_rng(seed)
+    sizes = [min(block_size, n_boot - i) for i in range(0, n_boot, block_size)]
+    blocks = (rng.integers(0, len(dose), size=(size, len(dose))) for size in sizes)
+    args = ((dose, response, block, model, p0, bounds) for block in blocks)
+
+    if workers == 1 or len(sizes) == 1:
+        params = [_bootstrap_replicates(*a) for a in args]
+    else:
+        with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+            params = list(pool.map(_bootstrap_replicates, *zip(*args)))
+    params = np.concatenate(params)
+    params = params[np.all(np.isfinite(params), axis=1)]
+
+    alpha = (1 - confidence) / 2
+    ci = {}
+    for name, column in zip(MODELS[model][2], params.T):
+        low, high = np.quantile(column, [alpha, 1 - alpha]) if len(column) else (np.nan, np.nan)
+        ci[name] = (low, high)
+    return ci, len(params)
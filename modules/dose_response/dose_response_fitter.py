@@ -1,60 +1,218 @@
 
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
 from scipy.optimize import curve_fit
-from sample_dose_response import generate_sample_dose_response
+from ..instrumentation import count, span
+from ..plotting import save_plot, show_plot, store_plot
+from ..tabular_io import read_table, write_table
+from .sample_dose_response import generate_sample_dose_response
 
 def hill_equation(dose, ec50, slope):
     """Sigmoidal dose-response function"""
     return 100 / (1 + (ec50 / dose) ** slope)
 
-def fit_dose_response(data_file="sample_dose_response.csv", results_file="fitted_results.csv", save_path=None):
+def hill_jacobian(dose, ec50, slope):
+    """Analytic partial derivatives of hill_equation w.r.t. (ec50, slope)"""
+    u = (ec50 / dose) ** slope
+    dy_du = -100 / (1 + u) ** 2
+    return np.stack([dy_du * slope * u / ec50, dy_du * u * np.log(ec50 / dose)], axis=-1)
+
+def hill_4pl(dose, bottom, top, ec50, slope):
+    """Four-parameter logistic (free bottom and top plateaus)"""
+    return bottom + (top - bottom) / (1 + (ec50 / dose) ** slope)
+
+def hill_4pl_jacobian(dose, bottom, top, ec50, slope):
+    """Analytic partial derivatives of hill_4pl w.r.t. (bottom, top, ec50, slope)"""
+    u = (ec50 / dose) ** slope
+    frac = 1 / (1 + u)
+    dy_du = -(top - bottom) * frac**2
+    return np.stack([1 - frac, frac, dy_du * slope * u / ec50, dy_du * u * np.log(ec50 / dose)], axis=-1)
+
+def hill_5pl(dose, bottom, top, ec50, slope, asymmetry):
+    """Five-parameter logistic (4PL plus an asymmetry exponent)"""
+    return bottom + (top - bottom) / (1 + (ec50 / dose) ** slope) ** asymmetry
+
+def hill_5pl_jacobian(dose, bottom, top, ec50, slope, asymmetry):
+    """Analytic partial derivatives of hill_5pl w.r.t. its five parameters"""
+    u = (ec50 / dose) ** slope
+    frac = (1 + u) ** -asymmetry
+    dy_du = -(top - bottom) * asymmetry * frac / (1 + u)
+    return np.stack([
+        1 - frac,
+        frac,
+        dy_du * slope * u / ec50,
+        dy_du * u * np.log(ec50 / dose),
+        -(top - bottom) * frac * np.log1p(u),
+    ], axis=-1)
+
+# Supported models: function, analytic Jacobian and output column per parameter
+MODELS = {
+    "hill": (hill_equation, hill_jacobian, ["EC50_uM", "Hill_Slope"]),
+    "4pl": (hill_4pl, hill_4pl_jacobian, ["Bottom", "Top", "EC50_uM", "Hill_Slope"]),
+    "5pl": (hill_5pl, hill_5pl_jacobian, ["Bottom", "Top", "EC50_uM", "Hill_Slope", "Asymmetry"]),
+}
+
+# Confidence-interval methods (None: no intervals)
+CI_METHODS = (None, "covariance", "bootstrap")
+
+def check_ci(ci):
+    """Validate a CI method name; returns it unchanged"""
+    if ci not in CI_METHODS:
+        raise ValueError(f"Unknown CI method {ci!r}; expected one of {list(CI_METHODS)}")
+    return ci
+
+def estimate_initial_params(dose, response, model="hill"):
+    """
+    Data-driven starting point for the fit.
+
+    Plateaus come from the response extremes (fixed 0/100 for "hill"). The
+    EC50 is the log-interpolated dose where the response crosses the
+    midpoint, and the slope comes from a log-linear regression of the
+    logit-transformed responses on log dose.
     """
-    Fits a dose-response curve (Hill equation) to experimental data.
-    Saves fitted EC50 and slope to CSV.
-    Optionally saves the plot to `save_path`.
+    dose = np.asarray(dose, dtype=float)
+    response = np.asarray(response, dtype=float)
+    order = np.argsort(dose)
+    log_dose, response = np.log(dose[order]), response[order]
+
+    if model == "hill":
+        bottom, top = 0.0, 100.0
+    else:
+        bottom, top = response.min(), response.max()
+    resp_range = top - bottom if top > bottom else 1.0
+
+    # Midpoint crossing (first sign change), else the geometric mean dose
+    above = response - (bottom + top) / 2 > 0
+    crossing = np.flatnonzero(above[1:] != above[:-1])
+    if len(crossing):
+        i = crossing[0]
+        y0, y1 = response[i], response[i + 1]
+        w = ((bottom + top) / 2 - y0) / (y1 - y0)
+        log_ec50 = log_dose[i] + w * (log_dose[i + 1] - log_dose[i])
+    else:
+        log_ec50 = log_dose.mean()
+
+    # Logit regression on points strictly inside the plateaus
+    frac = (response - bottom) / resp_range
+    inside = (frac > 0.05) & (frac < 0.95)
+    slope = 1.0
+    if inside.sum() >= 2 and np.ptp(log_dose[inside]) > 0:
+        logit = np.log(frac[inside] / (1 - frac[inside]))
+        slope = np.polyfit(log_dose[inside], logit, 1)[0]
+        if not np.isfinite(slope) or slope == 0:
+            slope = 1.0
+    elif response[-1] < response[0]:
+        slope = -1.0
+
+    ec50 = float(np.exp(log_ec50))
+    p0 = {"hill": [ec50, slope], "4pl": [bottom, top, ec50, slope], "5pl": [bottom, top, ec50, slope, 1.0]}
+    return p0[model]
+
+def default_bounds(dose, response, model="hill"):
+    """Parameter bounds scaled to the data (EC50 stays positive)"""
+    dose = np.asarray(dose, dtype=float)
+    response = np.asarray(response, dtype=float)
+    lo_dose, hi_dose = dose.min() / 1e3, dose.max() * 1e3
+    lo_resp, hi_resp = response.min(), response.max()
+    resp_range = max(hi_resp - lo_resp, 1.0)
+    bounds = {
+        "hill": ([lo_dose, -20], [hi_dose, 20]),
+        "4pl": ([lo_resp - resp_range, lo_resp, lo_dose, -20], [hi_resp, hi_resp + resp_range, hi_dose, 20]),
+        "5pl": ([lo_resp - resp_range, lo_resp, lo_dose, -20, 0.1], [hi_resp, hi_resp + resp_range, hi_dose, 20, 10]),
+    }
+    return bounds[model]
+
+def fit_dose_response(
+    data_file="sample_dose_response.csv",
+    results_file="fitted_results.csv",
+    save_path=None,
+    plot=False,
+    plot_cache=None,
+    model="hill",
+    p0=None,
+    ci=None,
+    n_boot=1000,
+    seed=None,
+):
+    """
+    Fits a dose-response curve (Hill equation, or "4pl"/"5pl" logistic
+    models) to experimental data, starting from data-driven estimates
+    unless `p0` is given.
+    With ci="covariance" (fast) or ci="bootstrap" (n_boot resamples,
+    reproducible with `seed`) 95% confidence intervals are added.
+    Reads data_file and writes results_file as CSV, Parquet or Feather.
+    Saves fitted parameters and the solver's function-evaluation count.
+    Plotting is a separate, optional stage: save_path renders the figure to
+    a file, plot=True displays it, and plot_cache stores the plot data in
+    that folder for later rendering (its id goes to the plot_id column).
     Returns fitted EC50 and slope.
     """
+    check_ci(ci)
+
     # Load data
-    try:
-        df = pd.read_csv(data_file)
-    except FileNotFoundError:
-        print(" No dataset found, generating a new one...")
-        df = generate_sample_dose_response(data_file)
+    with span("dose_response.load"):
+        try:
+            df = read_table(data_file, columns=["Dose_uM", "Response_percent"])
+        except FileNotFoundError:
+            print(" No dataset found, generating a new one...")
+            df = generate_sample_dose_response(data_file)
 
-    x = df["Dose_uM"].values
-    y = df["Response_percent"].values
+        x = df["Dose_uM"].values
+        y = df["Response_percent"].values
 
     # Curve fitting
-    popt, _ = curve_fit(hill_equation, x, y, p0=[10, 1])  # initial guess
-    ec50, slope = popt
+    func, jac, param_names = MODELS[model]
+    with span("dose_response.fit"):
+        if p0 is None:
+            p0 = estimate_initial_params(x, y, model)
+        # curve_fit rejects a start outside the bounds (e.g. a steep estimated slope)
+        bounds = default_bounds(x, y, model)
+        popt, pcov, info, _, _ = curve_fit(
+            func, x, y, p0=np.clip(p0, *bounds), jac=jac, bounds=bounds, full_output=True
+        )
+    count("dose_response_fits")
+    params = dict(zip(param_names, popt))
+    ec50, slope = params["EC50_uM"], params["Hill_Slope"]
 
     print(f" Fitted EC50: {ec50:.2f} µM")
     print(f" Fitted Hill Slope: {slope:.2f}")
+    print(f" Function evaluations: {info['nfev']}")
+
+    results = {**params, "nfev": info["nfev"]}
+    if ci:
+        from .dose_response_ci import bootstrap_ci, covariance_ci
+
+        if ci == "bootstrap":
+            with span("dose_response.ci_bootstrap"):
+                intervals, n_used = bootstrap_ci(x, y, model, n_boot=n_boot, seed=seed, p0=popt)
+        else:
+            with span("dose_response.ci_covariance"):
+                intervals = covariance_ci(popt, pcov, len(x), model)
+        for name in ("EC50_uM", "Hill_Slope"):
+            low, high = intervals[name]
+            results[f"{name}_CI_low"], results[f"{name}_CI_high"] = low, high
+            print(f" 95% CI ({ci}) {name}: [{low:.2f}, {high:.2f}]")
+        if ci == "bootstrap":
+            results["n_boot_used"] = n_used
+            print(f" Bootstrap replicates used: {n_used} of {n_boot}")
+
+    # Plot data: experimental data + fitted curve
+    if plot or save_path or plot_cache:
+        with span("dose_response.plot_data"):
+            x_fit = np.logspace(np.log10(min(x)), np.log10(max(x)), 100)
+            data = {"dose": x, "response": y, "dose_fit": x_fit, "response_fit": func(x_fit, *popt)}
+            if plot_cache:
+                results["plot_id"] = store_plot("dose_response", data, plot_cache)
 
     # Save fitted parameters
-    pd.DataFrame({"EC50_uM": [ec50], "Hill_Slope": [slope]}).to_csv(results_file, index=False)
+    with span("dose_response.write"):
+        write_table(pd.DataFrame({k: [v] for k, v in results.items()}), results_file)
     print(f" Fitted results saved to {results_file}")
 
-    # Plot experimental data + fitted curve
-    plt.figure(figsize=(8, 5))
-    plt.scatter(x, y, label="Experimental Data", color="blue")
-    x_fit = np.logspace(np.log10(min(x)), np.log10(max(x)), 100)
-    y_fit = hill_equation(x_fit, ec50, slope)
-    plt.plot(x_fit, y_fit, label="Fitted Curve", color="red")
-    plt.xscale("log")
-    plt.xlabel("Dose (µM)")
-    plt.ylabel("Response (%)")
-    plt.title("Dose-Response Curve Fit")
-    plt.legend()
-    plt.tight_layout()
-
     if save_path:
-        plt.savefig(save_path)
-        plt.close()
+        save_plot("dose_response", data, save_path)
         print(f" Plot saved to {save_path}")
-    else:
-        plt.show()
+    elif plot:
+        show_plot("dose_response", data)
 
     return ec50, slope
@@ -2,10 +2,12 @@
 import numpy as np
 import pandas as pd
 import random
+from ..tabular_io import write_table
 
 def generate_sample_dose_response(file_path="sample_dose_response.csv"):
     """
-    Generates a randomized sample dose-response dataset and saves as CSV.
+    Generates a randomized sample dose-response dataset and saves as CSV
+    (or Parquet/Feather, by extension).
     Columns: Dose (µM), Response (% of max effect)
     """
     np.random.seed()  # ensures different results each run
@@ -31,10 +33,38 @@ def generate_sample_dose_response(file_path="sample_dose_response.csv"):
         "Response_percent": noisy_responses
     })
 
-    df.to_csv(file_path, index=False)
+    write_table(df, file_path)
     print(f" Sample dose-response data saved to {file_path}")
     return df
 
+def generate_sample_plate(n_compounds=384, file_path="sample_plate.csv", n_doses=10, inactive_fraction=0.05):
+    """
+    Generates a long-format screening plate (Compound, Dose_uM, Response_percent)
+    with one randomized dose-response curve per compound. A fraction of the
+    compounds are inactive (pure noise) so failed fits can be exercised.
+    Saves to CSV/Parquet/Feather when file_path is given.
+    """
+    rng = np.random.default_rng()
+    doses = np.logspace(-2, 2, num=n_doses)
+
+    true_ec50 = rng.uniform(0.1, 50, size=(n_compounds, 1))
+    hill_slope = rng.uniform(0.5, 2.5, size=(n_compounds, 1))
+    responses = 100 / (1 + (true_ec50 / doses) ** hill_slope)
+    inactive = rng.random(n_compounds) < inactive_fraction
+    responses[inactive] = 0
+    responses = responses + rng.normal(0, 5, responses.shape)
+
+    df = pd.DataFrame({
+        "Compound": np.repeat([f"C{str(i).zfill(5)}" for i in range(1, n_compounds + 1)], n_doses),
+        "Dose_uM": np.tile(doses, n_compounds),
+        "Response_percent": responses.ravel(),
+    })
+
+    if file_path:
+        write_table(df, file_path)
+        print(f" Sample plate with {n_compounds} compounds saved to {file_path}")
+    return df
+
 if __name__ == "__main__":
     df = generate_sample_dose_response()
     print(df.head())
@@ -1,54 +1,74 @@
 
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
 import os
 from scipy.signal import find_peaks
 from .ecg_generator import generate_ecg, SAMPLE_FOLDER
+from ..instrumentation import count, span
+from ..plotting import ecg_plot_data, save_plot, show_plot, store_plot
+from ..tabular_io import read_table
+from .ecg_binary import ECG_BINARY_EXT, ecg_time, ecg_window, read_ecg_binary
 
-def analyze_ecg(file_path=None, save_path=None):
+# R-peak detection parameters (samples, normalized amplitude)
+PEAK_DISTANCE = 50
+PEAK_HEIGHT = 0.5
+
+
+def summarize_beats(file_path, num_beats, avg_rr):
+    """Build the heart-rate results dict from a beat count and mean RR interval."""
+    heart_rate = 60.0 / avg_rr if avg_rr > 0 else np.nan
+    return {
+        "file_analyzed": file_path,
+        "num_beats": num_beats,
+        "avg_rr_interval_sec": round(float(avg_rr), 3) if not np.isnan(avg_rr) else None,
+        "estimated_heart_rate_bpm": round(float(heart_rate), 1) if not np.isnan(heart_rate) else None,
+    }
+
+
+def analyze_ecg(file_path=None, save_path=None, plot=False, plot_cache=None):
     """
     Analyze ECG signal to detect peaks and estimate heart rate.
-    Optionally save plot to save_path instead of displaying.
+    Reads .ecgb binary records or CSV/Parquet/Feather tables.
+    Plotting is a separate, optional stage on the trace downsampled to the
+    figure width: save_path renders it to a file, plot=True displays it,
+    and plot_cache stores the plot data in that folder for later rendering
+    (results["plot_id"], see plotting.render_plot).
     """
     # Load sample ECG or generate new one
-    if file_path is None:
-        df, file_path = generate_ecg()
-    else:
-        df = pd.read_csv(file_path)
-
-    signal = df["ecg"].values
-    time = df["time_sec"].values
+    with span("ecg.load"):
+        if file_path is not None and file_path.endswith(ECG_BINARY_EXT):
+            header, samples = read_ecg_binary(file_path)
+            signal = ecg_window(header, samples)
+            time = ecg_time(header)
+        else:
+            if file_path is None:
+                df, file_path = generate_ecg()
+            else:
+                df = read_table(file_path, columns=["time_sec", "ecg"])
+            signal = df["ecg"].values
+            time = df["time_sec"].values
+    count("ecg_samples", len(signal))
 
     # Peak detection (R-peaks)
-    peaks, _ = find_peaks(signal, distance=50, height=0.5)  
+    with span("ecg.peaks"):
+        peaks, _ = find_peaks(signal, distance=PEAK_DISTANCE, height=PEAK_HEIGHT)
 
-    rr_intervals = np.diff(time[peaks])
-    avg_rr = np.mean(rr_intervals) if len(rr_intervals) > 0 else np.nan
-    heart_rate = 60.0 / avg_rr if avg_rr > 0 else np.nan
+        rr_intervals = np.diff(time[peaks])
+        avg_rr = np.mean(rr_intervals) if len(rr_intervals) > 0 else np.nan
 
-    results = {
-        "file_analyzed": file_path,
-        "num_beats": len(peaks),
-        "avg_rr_interval_sec": round(float(avg_rr), 3) if not np.isnan(avg_rr) else None,
-        "estimated_heart_rate_bpm": round(float(heart_rate), 1) if not np.isnan(heart_rate) else None,
-    }
+    results = summarize_beats(file_path, len(peaks), avg_rr)
 
-    # Plot
-    plt.figure(figsize=(10, 4))
-    plt.plot(time, signal, label="ECG Signal")
-    plt.plot(time[peaks], signal[peaks], "ro", label="Detected Beats")
-    plt.title("ECG Analysis")
-    plt.xlabel("Time (s)")
-    plt.ylabel("Amplitude")
-    plt.legend()
-    plt.tight_layout()
+    if not (plot or save_path or plot_cache):
+        return results
 
+    with span("ecg.plot_data"):
+        data = ecg_plot_data(time, signal, peaks)
+        if plot_cache:
+            results["plot_id"] = store_plot("ecg", data, plot_cache)
     if save_path:
-        plt.savefig(save_path)
-        plt.close()
+        save_plot("ecg", data, save_path)
         print(f" ECG plot saved to {save_path}")
-    else:
-        plt.show()
+    elif plot:
+        show_plot("ecg", data)
 
     return results
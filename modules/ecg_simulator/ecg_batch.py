@@ -0,0 +1,150 @@
+
+import glob
+import os
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+from scipy.signal import find_peaks
+from .ecg_analyzer import PEAK_DISTANCE, PEAK_HEIGHT
+from ..plotting import PLOT_DPI, minmax_downsample
+from ..tabular_io import read_table
+from .ecg_binary import ECG_BINARY_EXT, ecg_time, read_ecg_binary
+
+# Columns of the batch results table
+RESULT_COLUMNS = [
+    "file_analyzed",
+    "lead",
+    "num_beats",
+    "avg_rr_interval_sec",
+    "estimated_heart_rate_bpm",
+    "sdnn_ms",
+    "rmssd_ms",
+    "pnn50_percent",
+    "error",
+]
+
+
+def load_ecg_leads(file_path):
+    """
+    Load every lead of an ECG record.
+    Returns (time, signals of shape (n_samples, n_leads), lead names).
+    CSV/Parquet/Feather records hold a time_sec column plus one column per lead.
+    """
+    if file_path.endswith(ECG_BINARY_EXT):
+        header, samples = read_ecg_binary(file_path)
+        signals = np.asarray(samples, dtype=float)
+        if header["dtype_code"] == 2:
+            signals = signals * header["scale"]
+        time = ecg_time(header)
+        names = ["ecg"] if header["channels"] == 1 else [f"lead_{i + 1}" for i in range(header["channels"])]
+        return time, signals, names
+
+    df = read_table(file_path, categorical=None)
+    time = df.pop("time_sec").to_numpy()
+    return time, df.to_numpy(dtype=float), list(df.columns)
+
+
+def hrv_summary(peak_times):
+    """
+    Vectorized RR/HRV statistics for many leads at once.
+
+    `peak_times` is a list with one array of R-peak times (s) per lead; the
+    RR intervals are packed into a NaN-padded matrix so every statistic is a
+    single NumPy reduction across leads. Returns a dict of per-lead arrays.
+    """
+    n_leads = len(peak_times)
+    num_beats = np.array([len(t) for t in peak_times])
+    width = max(num_beats.max(initial=0) - 1, 1)
+    rr = np.full((n_leads, width), np.nan)
+    for i, t in enumerate(peak_times):
+        rr[i, : max(len(t) - 1, 0)] = np.diff(t)
+    d_rr = np.diff(rr, axis=1)
+
+    n_rr = np.sum(~np.isnan(rr), axis=1)
+    n_drr = np.sum(~np.isnan(d_rr), axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        avg_rr = np.nansum(rr, axis=1) / n_rr
+        sdnn = np.sqrt(np.nansum((rr - avg_rr[:, None]) ** 2, axis=1) / (n_rr - 1))
+        rmssd = np.sqrt(np.nansum(d_rr**2, axis=1) / n_drr)
+        pnn50 = 100 * np.nansum(np.abs(d_rr) > 0.05, axis=1) / n_drr
+        heart_rate = 60.0 / avg_rr
+
+    return {
+        "num_beats": num_beats,
+        "avg_rr_interval_sec": avg_rr,
+        "estimated_heart_rate_bpm": heart_rate,
+        "sdnn_ms": 1000 * sdnn,
+        "rmssd_ms": 1000 * rmssd,
+        "pnn50_percent": pnn50,
+    }
+
+
+def _plot_record(file_path, time, signals, names, peaks, plot_folder):
+    from matplotlib.figure import Figure
+
+    fig = Figure(figsize=(10, 2 * len(names)), dpi=PLOT_DPI)
+    axes = fig.subplots(len(names), 1, sharex=True, squeeze=False)
+    for ax, name, signal, lead_peaks in zip(axes[:, 0], names, signals.T, peaks):
+        ax.plot(*minmax_downsample(time, signal), lw=0.8)
+        ax.plot(time[lead_peaks], signal[lead_peaks], "ro", ms=3)
+        ax.set_ylabel(name)
+    axes[-1, 0].set_xlabel("Time (s)")
+    fig.tight_layout()
+    save_path = os.path.join(plot_folder, os.path.splitext(os.path.basename(file_path))[0] + ".png")
+    fig.savefig(save_path)
+
+
+def analyze_ecg_record(file_path, distance=PEAK_DISTANCE, height=PEAK_HEIGHT, plot_folder=None):
+    """Detect R-peaks on every lead of one record; returns a list of result rows."""
+    try:
+        time, signals, names = load_ecg_leads(file_path)
+        peaks = [find_peaks(signal, distance=distance, height=height)[0] for signal in signals.T]
+        summary = hrv_summary([time[p] for p in peaks])
+        if plot_folder:
+            _plot_record(file_path, time, signals, names, peaks, plot_folder)
+    except Exception as e:
+        return [{"file_analyzed": file_path, "error": f"{type(e).__name__}: {e}"}]
+
+    return [
+        {"file_analyzed": file_path, "lead": name, **{k: v[i] for k, v in summary.items()}, "error": None}
+        for i, name in enumerate(names)
+    ]
+
+
+def analyze_ecg_batch(
+    records,
+    workers=None,
+    distance=PEAK_DISTANCE,
+    height=PEAK_HEIGHT,
+    plot_folder=None,
+):
+    """
+    Run R-peak detection and HR/RR/HRV summaries over many ECG records.
+
+    `records` is a list of CSV/Parquet/Feather/.ecgb paths or a directory
+    to scan. Records are spread over a process pool (`workers=1` runs
+    in-process) and every lead becomes one row of the returned DataFrame;
+    records that fail to load are reported in the `error` column. Plots are only rendered when
+    `plot_folder` is given.
+    """
+    if isinstance(records, str):
+        records = sorted(
+            path
+            for ext in (".csv", ".parquet", ".feather", ECG_BINARY_EXT)
+            for path in glob.glob(os.path.join(records, "*" + ext))
+        )
+    if plot_folder:
+        os.makedirs(plot_folder, exist_ok=True)
+
+    args = (records, [distance] * len(records), [height] * len(records), [plot_folder] * len(records))
+    if workers == 1:
+        per_record = map(analyze_ecg_record, *args)
+        rows = [row for record_rows in per_record for row in record_rows]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            chunksize = max(1, len(records) // (4 * (workers or os.cpu_count() or 1)))
+            per_record = pool.map(analyze_ecg_record, *args, chunksize=chunksize)
+            rows = [row for record_rows in per_record for row in record_rows]
+
+    print(f" Analyzed {len(records)} ECG records ({len(rows)} leads)")
+    return pd.DataFrame(rows, columns=RESULT_COLUMNS)
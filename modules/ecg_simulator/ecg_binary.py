@@ -0,0 +1,142 @@
+
+import os
+import numpy as np
+import pandas as pd
+
+# File extension of the binary ECG format
+ECG_BINARY_EXT = ".ecgb"
+
+# Fixed 64-byte little-endian header followed by a raw (n_samples, channels) array
+HEADER_DTYPE = np.dtype([
+    ("magic", "S4"),
+    ("version", "<u2"),
+    ("dtype_code", "<u2"),
+    ("channels", "<u4"),
+    ("fs", "<f8"),
+    ("start_time", "<f8"),  # timestamp of the first sample (s)
+    ("n_samples", "<u8"),
+    ("scale", "<f8"),  # physical units per int16 count (1.0 for float32)
+    ("reserved", "V20"),
+])
+MAGIC = b"ECGB"
+VERSION = 1
+SAMPLE_DTYPES = {1: np.dtype("<f4"), 2: np.dtype("<i2")}
+DTYPE_CODES = {"float32": 1, "int16": 2}
+
+
+def _write_header(f, channels, fs, start_time, n_samples, dtype_code, scale):
+    header = np.zeros(1, dtype=HEADER_DTYPE)
+    header[0] = (MAGIC, VERSION, dtype_code, channels, fs, start_time, n_samples, scale, b"")
+    f.seek(0)
+    f.write(header.tobytes())
+
+
+def _encode(signal, dtype_code, scale):
+    if dtype_code == 2:
+        return np.clip(np.round(signal / scale), -32768, 32767).astype("<i2")
+    return signal.astype("<f4")
+
+
+def write_ecg_binary(file_path, signal, fs, start_time=0.0, dtype="float32"):
+    """
+    Save an ECG signal (1-D, or 2-D as samples x channels) in the binary format.
+    int16 storage scales the signal to the full 16-bit range.
+    """
+    signal = np.asarray(signal, dtype=float)
+    if signal.ndim == 1:
+        signal = signal[:, None]
+    dtype_code = DTYPE_CODES[dtype]
+    scale = 1.0
+    if dtype_code == 2:
+        peak = np.max(np.abs(signal)) if signal.size else 0.0
+        scale = peak / 32767 if peak > 0 else 1.0
+
+    with open(file_path, "wb") as f:
+        _write_header(f, signal.shape[1], fs, start_time, signal.shape[0], dtype_code, scale)
+        f.write(_encode(signal, dtype_code, scale).tobytes())
+    return file_path
+
+
+def read_ecg_binary(file_path):
+    """
+    Memory-map a binary ECG file.
+    Returns (header dict, raw samples memmap of shape (n_samples, channels)).
+    """
+    header = np.fromfile(file_path, dtype=HEADER_DTYPE, count=1)
+    if len(header) == 0 or header["magic"][0] != MAGIC:
+        raise ValueError(f"{file_path} is not a binary ECG file")
+    header = {name: header[name][0].item() for name in HEADER_DTYPE.names if name not in ("magic", "reserved")}
+    if header["version"] != VERSION:
+        raise ValueError(f"Unsupported binary ECG version {header['version']}")
+
+    shape = (header["n_samples"], header["channels"])
+    dtype = SAMPLE_DTYPES[header["dtype_code"]]
+    if header["n_samples"] == 0:
+        return header, np.empty(shape, dtype=dtype)
+    samples = np.memmap(file_path, dtype=dtype, mode="r", offset=HEADER_DTYPE.itemsize, shape=shape)
+    return header, samples
+
+
+def ecg_window(header, samples, start=0, stop=None, channel=0):
+    """
+    Return one channel of samples[start:stop] in physical units.
+    float32 files are sliced with zero copies; int16 files are rescaled.
+    """
+    window = samples[start:stop, channel]
+    if header["dtype_code"] == 2:
+        return window * header["scale"]
+    return window
+
+
+def ecg_time(header, start=0, stop=None):
+    """Timestamps (s) of samples[start:stop]: start_time + index / fs."""
+    stop = header["n_samples"] if stop is None else min(stop, header["n_samples"])
+    return header["start_time"] + np.arange(start, stop) / header["fs"]
+
+
+def iter_ecg_binary(file_path, chunk_size=1_000_000, channel=0):
+    """Yield (time, signal) blocks from a binary ECG file, slicing the memmap."""
+    header, samples = read_ecg_binary(file_path)
+    for start in range(0, header["n_samples"], chunk_size):
+        window = ecg_window(header, samples, start, start + chunk_size, channel)
+        yield ecg_time(header, start, start + len(window)), window
+
+
+def convert_csv_to_binary(csv_file, binary_file=None, fs=None, dtype="float32", chunk_size=1_000_000):
+    """
+    Convert an ECG CSV (time_sec + one column per lead) to the binary format,
+    streaming it in chunks. The sampling rate is inferred from the time column
+    unless `fs` is given. Returns the binary file path.
+    """
+    if binary_file is None:
+        binary_file = os.path.splitext(csv_file)[0] + ECG_BINARY_EXT
+    dtype_code = DTYPE_CODES[dtype]
+    if dtype_code == 2:
+        # int16 needs the global peak amplitude before any sample is written
+        peak = 0.0
+        for chunk in pd.read_csv(csv_file, chunksize=chunk_size):
+            peak = max(peak, float(chunk.drop(columns="time_sec").abs().max().max()))
+        scale = peak / 32767 if peak > 0 else 1.0
+    else:
+        scale = 1.0
+
+    n_samples = 0
+    channels = None
+    first_t = last_t = 0.0
+    with open(binary_file, "wb") as f:
+        f.seek(HEADER_DTYPE.itemsize)
+        for chunk in pd.read_csv(csv_file, chunksize=chunk_size):
+            t = chunk.pop("time_sec").to_numpy()
+            if n_samples == 0:
+                channels = chunk.shape[1]
+                first_t = t[0]
+            last_t = t[-1]
+            f.write(_encode(chunk.to_numpy(dtype=float), dtype_code, scale).tobytes())
+            n_samples += len(t)
+
+        if fs is None:
+            fs = (n_samples - 1) / (last_t - first_t) if n_samples > 1 else 1.0
+        _write_header(f, channels or 1, fs, first_t, n_samples, dtype_code, scale)
+
+    print(f" Converted {csv_file} -> {binary_file} ({n_samples} samples @ {fs:.3f} Hz)")
+    return binary_file
@@ -1,16 +1,36 @@
 import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
 import random
 from datetime import datetime
 import os
+from .ecg_binary import ECG_BINARY_EXT, write_ecg_binary
+from ..plotting import pyplot
 
 # Folder for saving synthetic ECG samples
+# (created on first save, not at import)
 SAMPLE_FOLDER = os.path.join(os.path.dirname(__file__), "samples")
-os.makedirs(SAMPLE_FOLDER, exist_ok=True)
 
 
-def generate_ecg(duration=10, fs=250, noise_level=0.05):
+def ecg_waveform(t, hr, noise_level=0.05):
+    """
+    Raw (un-normalized) synthetic ECG samples at times `t` for heart rate `hr` bpm.
+    `t` may be 2-D (samples x channels) to draw independent noise per channel.
+    """
+    f = hr / 60
+
+    # ECG shape approximation using sinusoids + Gaussian peaks
+    ecg_wave = (
+        0.6 * np.sin(2 * np.pi * f * t) +  # P/T wave
+        0.9 * np.sign(np.sin(2 * np.pi * f * t)) +  # QRS spike
+        0.1 * np.random.randn(*np.shape(t))  # baseline noise
+    )
+
+    # Add adjustable random noise
+    ecg_wave += noise_level * np.random.randn(*np.shape(t))
+    return ecg_wave
+
+
+def generate_ecg(duration=10, fs=250, noise_level=0.05, file_format="csv", output_dir=None):
     """
     Generate synthetic ECG-like signal with noise.
 
@@ -18,26 +38,18 @@ def generate_ecg(duration=10, fs=250, noise_level=0.05):
         duration (int): Signal duration in seconds
         fs (int): Sampling frequency (Hz)
         noise_level (float): Noise amplitude
+        file_format (str): "csv", or "binary" for the memory-mapped format
+        output_dir (str): Folder for the record (default SAMPLE_FOLDER)
 
     Returns:
         pd.DataFrame: ECG signal with timestamps
     """
-    t = np.linspace(0, duration, duration * fs)
+    t = np.arange(int(duration * fs)) / fs  # spacing exactly 1/fs, as in the binary header
 
     # --- Generate synthetic ECG waveform ---
     # Base heartbeat frequency (60–100 bpm -> 1–1.67 Hz)
     hr = random.randint(60, 100)
-    f = hr / 60  
-
-    # ECG shape approximation using sinusoids + Gaussian peaks
-    ecg_wave = (
-        0.6 * np.sin(2 * np.pi * f * t) +  # P/T wave
-        0.9 * np.sign(np.sin(2 * np.pi * f * t)) +  # QRS spike
-        0.1 * np.random.randn(len(t))  # baseline noise
-    )
-
-    # Add adjustable random noise
-    ecg_wave += noise_level * np.random.randn(len(t))
+    ecg_wave = ecg_waveform(t, hr, noise_level)
 
     # Normalize signal
     ecg_wave = (ecg_wave - np.mean(ecg_wave)) / np.std(ecg_wave)
@@ -45,9 +57,16 @@ def generate_ecg(duration=10, fs=250, noise_level=0.05):
     # Save as DataFrame
     df = pd.DataFrame({"time_sec": t, "ecg": ecg_wave})
 
-    # Save CSV with timestamped name
-    filename = os.path.join(SAMPLE_FOLDER, f"ecg_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv")
-    df.to_csv(filename, index=False)
+    # Save with timestamped name
+    now = datetime.now()
+    output_dir = SAMPLE_FOLDER if output_dir is None else output_dir
+    os.makedirs(output_dir, exist_ok=True)
+    stem = os.path.join(output_dir, f"ecg_{now.strftime('%Y%m%d_%H%M%S')}")
+    if file_format == "binary":
+        filename = write_ecg_binary(stem + ECG_BINARY_EXT, ecg_wave, fs)  # t starts at 0, like the CSV
+    else:
+        filename = stem + ".csv"
+        df.to_csv(filename, index=False)
 
     return df, filename
 
@@ -58,6 +77,7 @@ if __name__ == "__main__":
     print(f"Synthetic ECG saved to {filepath}")
 
     # Plot for visualization
+    plt = pyplot(show=True)
     plt.figure(figsize=(10, 4))
     plt.plot(signal["time_sec"], signal["ecg"], label="ECG Signal")
     plt.title("Synthetic ECG Signal (Sample)")
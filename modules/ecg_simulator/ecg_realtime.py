@@ -0,0 +1,111 @@
+
+import asyncio
+import random
+import time
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from .ecg_analyzer import PEAK_DISTANCE, PEAK_HEIGHT
+from .ecg_generator import ecg_waveform
+
+
+def _ecg_packets(fs, packet_size, channels, duration, noise_level, hr):
+    """Yield (start_index, packet of shape (packet_size, channels)) without pacing."""
+    hr = random.randint(60, 100) if hr is None else hr
+    # Analytic std of ecg_waveform (sin, sign(sin) and noise terms), so packets
+    # are normalized like generate_ecg without seeing the whole signal
+    scale = np.sqrt(0.6**2 / 2 + 0.9**2 + 2 * 0.6 * 0.9 * 2 / np.pi + 0.1**2 + noise_level**2)
+    total = None if duration is None else int(duration * fs)
+    start = 0
+    while total is None or start < total:
+        n = packet_size if total is None else min(packet_size, total - start)
+        t = (start + np.arange(n)) / fs
+        t = np.broadcast_to(t[:, None], (n, channels))
+        yield start, ecg_waveform(t, hr, noise_level) / scale
+        start += n
+
+
+def stream_ecg(fs=250, packet_size=25, channels=1, duration=None, noise_level=0.05, hr=None, speed=1.0):
+    """
+    Emit a synthetic ECG as fixed-size packets paced like a device.
+
+    Yields (start_index, packet) where packet has shape (packet_size, channels).
+    Packets are released at `fs * speed` samples per second (speed=1 is real
+    time, speed=None disables pacing). `duration=None` streams forever.
+    """
+    t0 = time.perf_counter()
+    for start, packet in _ecg_packets(fs, packet_size, channels, duration, noise_level, hr):
+        if speed:
+            delay = t0 + (start + len(packet)) / (fs * speed) - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+        yield start, packet
+
+
+async def astream_ecg(fs=250, packet_size=25, channels=1, duration=None, noise_level=0.05, hr=None, speed=1.0):
+    """asyncio counterpart of stream_ecg; pacing yields to the event loop."""
+    t0 = time.perf_counter()
+    for start, packet in _ecg_packets(fs, packet_size, channels, duration, noise_level, hr):
+        if speed:
+            delay = t0 + (start + len(packet)) / (fs * speed) - time.perf_counter()
+            await asyncio.sleep(max(delay, 0))
+        yield start, packet
+
+
+class OnlineRPeakDetector:
+    """
+    Online multi-channel R-peak detector with bounded latency.
+
+    A sample is a beat when it reaches `height` and is the strict maximum of
+    the `distance` samples before it and no lower than the `distance` samples
+    after it, so beats are at least `distance` samples apart as with
+    find_peaks. A beat is therefore confirmed as soon as `distance` samples of
+    look-ahead have arrived: latency is at most `distance + packet_size - 1`
+    samples. All channels of a packet are processed in one vectorized pass.
+
+    Every beat it reports is also an R-peak of analyze_ecg; find_peaks may
+    additionally keep secondary maxima on broad QRS plateaus.
+    """
+
+    def __init__(self, fs, channels=1, distance=PEAK_DISTANCE, height=PEAK_HEIGHT):
+        self.fs = fs
+        self.distance = distance
+        self.height = height
+        # History starts as -inf so the first samples have a full left window
+        self._buf = np.full((distance, channels), -np.inf)
+        self._buf_start = -distance  # global index of _buf[0]
+        self._next = 0  # first global index not yet decided
+
+    def update(self, packet):
+        """
+        Feed the next packet (samples x channels, or 1-D for one channel).
+        Returns the newly confirmed beats as a list of
+        (channel, sample_index, latency_samples) tuples.
+        """
+        packet = np.asarray(packet, dtype=float)
+        if packet.ndim == 1:
+            packet = packet[:, None]
+        buf = np.concatenate([self._buf, packet])
+        d = self.distance
+        newest = self._buf_start + len(buf) - 1
+
+        # Candidates: undecided samples that already have d samples of look-ahead
+        lo = self._next - self._buf_start
+        hi = len(buf) - d
+        beats = []
+        if hi > lo:
+            window_max = sliding_window_view(buf, d, axis=0).max(axis=-1)
+            x = buf[lo:hi]
+            left_max = window_max[lo - d : hi - d]
+            right_max = window_max[lo + 1 : hi + 1]
+            is_beat = (x >= self.height) & (x > left_max) & (x >= right_max)
+            idx, channel = np.nonzero(is_beat)
+            for i in np.argsort(idx, kind="stable"):
+                sample = self._buf_start + lo + idx[i]
+                beats.append((int(channel[i]), int(sample), int(newest - sample)))
+            self._next = self._buf_start + hi
+
+        # Keep d samples of history before the next undecided sample
+        keep = self._next - d - self._buf_start
+        self._buf = buf[keep:]
+        self._buf_start += keep
+        return beats
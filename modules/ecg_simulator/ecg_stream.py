@@ -0,0 +1,122 @@
+
+import numpy as np
+import pandas as pd
+from scipy.signal import find_peaks
+from .ecg_analyzer import PEAK_DISTANCE, PEAK_HEIGHT, summarize_beats
+from .ecg_binary import ECG_BINARY_EXT, iter_ecg_binary
+
+
+def iter_ecg_csv(file_path, chunk_size=1_000_000):
+    """Yield (time, signal) array blocks from an ECG CSV without loading it whole."""
+    for chunk in pd.read_csv(file_path, usecols=["time_sec", "ecg"], chunksize=chunk_size):
+        yield chunk["time_sec"].to_numpy(), chunk["ecg"].to_numpy()
+
+
+def iter_ecg_stream_results(
+    blocks,
+    file_path=None,
+    distance=PEAK_DISTANCE,
+    height=PEAK_HEIGHT,
+    peaks_out=None,
+):
+    """
+    Detect R-peaks over a stream of (time, signal) blocks with bounded memory.
+
+    find_peaks' distance rule only lets a candidate (local maximum above
+    `height`) suppress candidates less than `distance` samples away, so
+    candidates split into clusters separated by gaps of at least `distance`
+    that are decided independently. Peaks are committed a cluster at a
+    time, once no later candidate can join it: the next candidate (or the
+    earliest position a not-yet-visible one could take, i.e. the start of
+    the trailing flat run) is at least `distance` samples past its last
+    candidate. The committed peaks are therefore exactly those of
+    find_peaks on the whole recording (up to the order in which it breaks
+    exact height ties). The buffer only holds the undecided cluster, which
+    on an ECG spans about one beat.
+
+    Yields the cumulative results dict (same keys as analyze_ecg plus
+    `samples_processed`) after every block. If `peaks_out` is a list, the
+    global sample indices of committed peaks are appended to it.
+    """
+    buf_t = np.empty(0)
+    buf_x = np.empty(0)
+    buf_start = 0  # global index of buf_x[0]
+    committed = 0  # peaks before this global index are final
+
+    num_beats = 0
+    first_t = last_t = np.nan
+
+    def commit(lo, hi):
+        nonlocal num_beats, first_t, last_t
+        peaks, _ = find_peaks(buf_x, distance=distance, height=height)
+        global_peaks = peaks + buf_start
+        peaks = peaks[(global_peaks >= lo) & (global_peaks < hi)]
+        if len(peaks) == 0:
+            return
+        if num_beats == 0:
+            first_t = buf_t[peaks[0]]
+        last_t = buf_t[peaks[-1]]
+        num_beats += len(peaks)
+        if peaks_out is not None:
+            peaks_out.extend((peaks + buf_start).tolist())
+
+    def results():
+        # Mean of consecutive RR intervals telescopes to (last - first) / (n - 1)
+        avg_rr = (last_t - first_t) / (num_beats - 1) if num_beats > 1 else np.nan
+        summary = summarize_beats(file_path, num_beats, avg_rr)
+        summary["samples_processed"] = buf_start + len(buf_x)
+        return summary
+
+    for t, x in blocks:
+        buf_t = np.concatenate([buf_t, t])
+        buf_x = np.concatenate([buf_x, x])
+        if len(buf_x) < 2:
+            yield results()
+            continue
+
+        # Pending candidates (buffer indices) and the earliest buffer index
+        # of a peak not visible yet: the start of the trailing flat run,
+        # or the next sample when that run is below `height`
+        candidates, _ = find_peaks(buf_x, height=height)
+        candidates = candidates[candidates + buf_start >= committed]
+        changes = np.flatnonzero(buf_x[1:] != buf_x[:-1])
+        tail = changes[-1] + 1 if len(changes) else 0
+        if buf_x[tail] < height:
+            tail = len(buf_x) - 1
+
+        gaps = np.diff(np.append(candidates, tail)) >= distance
+        if len(candidates) == 0 or gaps[-1]:
+            cut = tail  # every pending cluster is closed
+        elif gaps.any():
+            cut = candidates[np.flatnonzero(gaps)[-1]] + 1
+        else:
+            yield results()
+            continue
+
+        commit(committed, buf_start + cut)
+        committed = buf_start + cut
+        # Keep one sample before the cut: the rising edge of the next peak
+        buf_t = buf_t[cut - 1 :]
+        buf_x = buf_x[cut - 1 :]
+        buf_start += cut - 1
+        yield results()
+
+    commit(committed, buf_start + len(buf_x))
+    yield results()
+
+
+def analyze_ecg_stream(file_path, chunk_size=1_000_000, **kwargs):
+    """
+    Analyze a long ECG recording chunk by chunk and return the final
+    heart-rate results. Matches analyze_ecg on the same file.
+    Binary files are read as zero-copy memmap windows.
+    """
+    if file_path.endswith(ECG_BINARY_EXT):
+        blocks = iter_ecg_binary(file_path, chunk_size)
+    else:
+        blocks = iter_ecg_csv(file_path, chunk_size)
+    results = None
+    for results in iter_ecg_stream_results(blocks, file_path, **kwargs):
+        pass
+    results.pop("samples_processed")
+    return results
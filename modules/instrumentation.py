@@ -0,0 +1,237 @@
+
+# Lightweight instrumentation: stage spans, counters and optional cProfile.
+#
+# Off by default (set INSTRUMENTATION=1 or call enable()). When disabled a
+# span is a shared no-op context manager and count() returns after one flag
+# check, so the calls can stay in hot paths. When enabled, every span feeds
+# a latency histogram per stage and is also appended to the current thread's
+# trace (if one is open), which is how a request or job reports its own
+# per-stage breakdown. Only the standard library is used.
+import bisect
+import cProfile
+import contextlib
+import functools
+import io
+import math
+import os
+import pstats
+import threading
+import time
+
+METRIC_PREFIX = "biomed_"
+# Histogram bucket upper bounds (seconds)
+BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, math.inf)
+METRIC_HELP = {
+    "stage_seconds": "Time spent in each analysis stage",
+    "http_request_seconds": "API request latency",
+    "job_seconds": "Job run time in the worker pool",
+}
+# Functions listed in a cProfile report
+PROFILE_TOP = 40
+
+_enabled = os.environ.get("INSTRUMENTATION", "0").lower() in ("1", "true", "yes")
+_lock = threading.Lock()
+_histograms = {}  # (name, labels) -> [bucket counts..., sum, count]
+_counters = {}  # (name, labels) -> value
+_local = threading.local()
+_profile_lock = threading.Lock()  # one cProfile capture at a time per process
+_NULL = contextlib.nullcontext()
+
+
+def enable(on=True):
+    """Turn instrumentation on or off (child processes started later inherit it)."""
+    global _enabled
+    _enabled = bool(on)
+    os.environ["INSTRUMENTATION"] = "1" if on else "0"
+
+
+def enabled():
+    return _enabled
+
+
+def _key(name, labels):
+    return name, tuple(sorted(labels.items()))
+
+
+def observe(name, seconds, **labels):
+    """Add one observation to a histogram."""
+    key = _key(name, labels)
+    with _lock:
+        hist = _histograms.get(key)
+        if hist is None:
+            hist = _histograms[key] = [0] * len(BUCKETS) + [0.0, 0]
+        hist[bisect.bisect_left(BUCKETS, seconds)] += 1
+        hist[-2] += seconds
+        hist[-1] += 1
+
+
+def count(name, value=1, **labels):
+    """Increase a counter (exported as <prefix><name>_total)."""
+    if not _enabled:
+        return
+    key = _key(name, labels)
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + value
+    trace = getattr(_local, "trace", None)
+    if trace is not None:
+        trace["counts"][name] = trace["counts"].get(name, 0) + value
+
+
+class _Span:
+    __slots__ = ("name", "start")
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        elapsed = time.perf_counter() - self.start
+        observe("stage_seconds", elapsed, stage=self.name)
+        trace = getattr(_local, "trace", None)
+        if trace is not None:
+            trace["stages"].append([self.name, elapsed])
+        return False
+
+
+def span(name):
+    """Context manager timing one stage (a no-op when disabled)."""
+    return _Span(name) if _enabled else _NULL
+
+
+def timed(name):
+    """Decorator timing every call of a function as stage `name`."""
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            with _Span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+@contextlib.contextmanager
+def trace():
+    """
+    Collect the spans and counts recorded by this thread while open.
+    Yields {"stages": [[stage, seconds], ...], "counts": {name: value}}.
+    """
+    previous = getattr(_local, "trace", None)
+    collected = {"stages": [], "counts": {}}
+    _local.trace = collected
+    try:
+        yield collected
+    finally:
+        _local.trace = previous
+
+
+def add_to_trace(collected):
+    """Append a trace recorded elsewhere (e.g. in a worker) to this thread's open trace."""
+    trace = getattr(_local, "trace", None)
+    if trace is not None and collected:
+        trace["stages"].extend(collected.get("stages", []))
+        for name, value in collected.get("counts", {}).items():
+            trace["counts"][name] = trace["counts"].get(name, 0) + value
+
+
+def record_trace(collected):
+    """Merge a trace from another process into this process's histograms and counters."""
+    for stage, seconds in collected.get("stages", []):
+        observe("stage_seconds", seconds, stage=stage)
+    for name, value in collected.get("counts", {}).items():
+        key = _key(name, {})
+        with _lock:
+            _counters[key] = _counters.get(key, 0) + value
+
+
+class Profile:
+    """
+    cProfile capture; `text` holds the report (top functions by cumulative
+    time) afterwards. Only one capture runs per process at a time, a
+    concurrent one is skipped (`busy`) rather than failing the request.
+    """
+
+    def __init__(self, on=True):
+        self.on = on
+        self.busy = False
+        self.text = None
+        self._profiler = None
+
+    def __enter__(self):
+        if self.on:
+            if not _profile_lock.acquire(blocking=False):
+                self.busy = True
+                return self
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+        return self
+
+    def __exit__(self, *exc):
+        if self._profiler is not None:
+            self._profiler.disable()
+            _profile_lock.release()
+            out = io.StringIO()
+            pstats.Stats(self._profiler, stream=out).sort_stats("cumulative").print_stats(PROFILE_TOP)
+            self.text = out.getvalue()
+            self._profiler = None
+        return False
+
+
+def server_timing(collected):
+    """Server-Timing header value of a trace (stages summed by name, in ms)."""
+    totals = {}
+    for stage, seconds in collected["stages"]:
+        totals[stage] = totals.get(stage, 0.0) + seconds
+    return ", ".join(f'{stage.replace(".", "-")};dur={1000 * seconds:.2f}' for stage, seconds in totals.items())
+
+
+def _labels(labels, extra=()):
+    items = list(labels) + list(extra)
+    if not items:
+        return ""
+    escaped = (str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, v in items)
+    return "{" + ",".join(f'{k}="{v}"' for (k, _), v in zip(items, escaped)) + "}"
+
+
+def render_prometheus():
+    """All metrics in the Prometheus text exposition format (version 0.0.4)."""
+    with _lock:
+        histograms = {key: list(value) for key, value in _histograms.items()}
+        counters = dict(_counters)
+
+    lines = [
+        f"# HELP {METRIC_PREFIX}instrumentation_enabled Whether spans and counters are being recorded",
+        f"# TYPE {METRIC_PREFIX}instrumentation_enabled gauge",
+        f"{METRIC_PREFIX}instrumentation_enabled {int(_enabled)}",
+    ]
+    for name in sorted({name for name, _ in histograms}):
+        metric = METRIC_PREFIX + name
+        lines.append(f"# HELP {metric} {METRIC_HELP.get(name, name)}")
+        lines.append(f"# TYPE {metric} histogram")
+        for (hist_name, labels), hist in sorted(histograms.items()):
+            if hist_name != name:
+                continue
+            cumulative = 0
+            for bound, n in zip(BUCKETS, hist):
+                cumulative += n
+                le = "+Inf" if math.isinf(bound) else repr(bound)
+                lines.append(f"{metric}_bucket{_labels(labels, [('le', le)])} {cumulative}")
+            lines.append(f"{metric}_sum{_labels(labels)} {hist[-2]!r}")
+            lines.append(f"{metric}_count{_labels(labels)} {hist[-1]}")
+    for name in sorted({name for name, _ in counters}):
+        metric = f"{METRIC_PREFIX}{name}_total"
+        lines.append(f"# TYPE {metric} counter")
+        for (counter_name, labels), value in sorted(counters.items()):
+            if counter_name == name:
+                lines.append(f"{metric}{_labels(labels)} {value}")
+    return "\n".join(lines) + "\n"
+
+
+def reset():
+    with _lock:
+        _histograms.clear()
+        _counters.clear()
@@ -0,0 +1,284 @@
+
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+JOB_FOLDER = os.path.join("static", "jobs")
+JOB_WORKERS = 2
+# Jobs queued or running at once; further submissions are rejected
+MAX_PENDING = 16
+# Cached results (and their output folders) kept before LRU eviction
+CACHE_ENTRIES = 256
+# Finished job records remembered for polling
+MAX_JOBS = 1000
+RESULT_FILE = "result.json"
+_READ_BLOCK = 1 << 20
+
+
+class QueueFull(RuntimeError):
+    """Raised by JobQueue.submit when MAX_PENDING jobs are already waiting."""
+
+
+def file_digest(path):
+    """SHA-256 of a file's content, read in blocks."""
+    sha = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(_READ_BLOCK), b""):
+            sha.update(block)
+    return sha.hexdigest()
+
+
+def cache_key(task, params, files=()):
+    """Content address of a job: task name, canonical JSON params and the input files' content."""
+    sha = hashlib.sha256(task.encode())
+    sha.update(json.dumps(params, sort_keys=True, default=str).encode())
+    for path in files:
+        sha.update(file_digest(path).encode())
+    return sha.hexdigest()
+
+
+class ResultCache:
+    """
+    LRU cache of job results keyed by content address.
+
+    Each entry owns the folder root/<key>/ holding its inputs, output files
+    and result.json, so evicting an entry deletes its files. Entries found
+    on disk are reloaded (least recently written evicted first) so results
+    survive a restart.
+    """
+
+    def __init__(self, root=JOB_FOLDER, max_entries=CACHE_ENTRIES):
+        self.root = root
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        os.makedirs(root, exist_ok=True)
+        self._reload()
+
+    def _reload(self):
+        found = []
+        for key in os.listdir(self.root):
+            result_file = os.path.join(self.root, key, RESULT_FILE)
+            if os.path.isfile(result_file):
+                found.append((os.path.getmtime(result_file), key, result_file))
+        for _, key, result_file in sorted(found):
+            with open(result_file) as f:
+                self._entries[key] = json.load(f)
+        self._evict()
+
+    def folder(self, key):
+        return os.path.join(self.root, key)
+
+    def get(self, key):
+        with self._lock:
+            if key not in self._entries:
+                return None
+            self._entries.move_to_end(key)
+            return self._entries[key]
+
+    def put(self, key, result):
+        with open(os.path.join(self.folder(key), RESULT_FILE), "w") as f:
+            json.dump(result, f)
+        with self._lock:
+            self._entries[key] = result
+            self._entries.move_to_end(key)
+            self._evict()
+
+    def _evict(self):
+        while len(self._entries) > self.max_entries:
+            key, _ = self._entries.popitem(last=False)
+            shutil.rmtree(self.folder(key), ignore_errors=True)
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._entries
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class Job:
+    """One submitted task: status is queued, running, done or failed."""
+
+    __slots__ = ("id", "task", "key", "submitted_at", "finished_at", "cached", "result", "error", "future")
+
+    def __init__(self, task, key):
+        self.id = uuid.uuid4().hex
+        self.task = task
+        self.key = key
+        self.submitted_at = time.time()
+        self.finished_at = None
+        self.cached = False
+        self.result = None
+        self.error = None
+        self.future = None
+
+    @property
+    def status(self):
+        if self.error is not None:
+            return "failed"
+        if self.result is not None:
+            return "done"
+        return "running" if self.future is not None and self.future.running() else "queued"
+
+    def to_dict(self):
+        info = {
+            "job_id": self.id,
+            "task": self.task,
+            "status": self.status,
+            "cached": self.cached,
+            "submitted_at": self.submitted_at,
+            "finished_at": self.finished_at,
+        }
+        if self.result is not None:
+            info["result"] = self.result
+        if self.error is not None:
+            info["error"] = self.error
+        return info
+
+
+class JobQueue:
+    """
+    Bounded process pool for the API's analyses, in front of a ResultCache.
+
+    submit(task, params, files) hashes the inputs; a cached result is
+    returned at once as a finished job, an identical job already in flight
+    is shared, and anything else is queued for `run(task, params, inputs,
+    folder)` in a worker process, each job writing only into its own cache
+    folder. Submissions beyond `max_pending` unfinished jobs raise QueueFull.
+    `on_finish(job)`, if given, is called once each job that ran is done or failed.
+    """
+
+    def __init__(self, run, workers=JOB_WORKERS, max_pending=MAX_PENDING, cache=None, max_jobs=MAX_JOBS, on_finish=None):
+        self.run = run
+        self.on_finish = on_finish
+        self.workers = workers
+        self.max_pending = max_pending
+        self.max_jobs = max_jobs
+        self.cache = cache if cache is not None else ResultCache()
+        self._jobs = OrderedDict()
+        self._in_flight = {}  # key -> Job
+        self._lock = threading.Lock()
+        self._pool = None
+
+    def _executor(self):
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers)
+        return self._pool
+
+    def _start(self, task, params, inputs, folder):
+        """
+        Submit to the pool. A worker that died (OOM kill, segfault) leaves the
+        pool broken for good: its running jobs fail, and it is replaced here.
+        """
+        try:
+            return self._executor().submit(self.run, task, params, inputs, folder)
+        except BrokenProcessPool:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+            return self._executor().submit(self.run, task, params, inputs, folder)
+
+    def submit(self, task, params=None, files=()):
+        """
+        Submit a task on input files (which are moved into the job's folder).
+        Returns the Job; check job.status or poll get(job.id).
+        """
+        params = dict(params or {})
+        key = cache_key(task, params, files)
+        job = Job(task, key)
+        cached = self.cache.get(key)
+        with self._lock:
+            if cached is None and key in self._in_flight:
+                _discard(files)
+                return self._in_flight[key]
+            if cached is not None:
+                job.cached, job.result, job.finished_at = True, cached, time.time()
+                _discard(files)
+            else:
+                if len(self._in_flight) >= self.max_pending:
+                    _discard(files)
+                    raise QueueFull(f"{len(self._in_flight)} jobs pending; try again later")
+                folder = self.cache.folder(key)
+                os.makedirs(folder, exist_ok=True)
+                inputs = []
+                for i, path in enumerate(files):
+                    inputs.append(os.path.join(folder, f"input{i}" + os.path.splitext(path)[1]))
+                    shutil.move(path, inputs[-1])
+                try:
+                    job.future = self._start(task, params, inputs, folder)
+                except Exception:
+                    shutil.rmtree(folder, ignore_errors=True)
+                    raise
+                self._in_flight[key] = job
+            self._remember(job)
+        if job.future is not None:
+            job.future.add_done_callback(lambda future: self._finish(job, future))
+        return job
+
+    def _finish(self, job, future):
+        try:
+            result = future.result()
+            self.cache.put(job.key, result)
+            job.result = result
+        except Exception as e:
+            shutil.rmtree(self.cache.folder(job.key), ignore_errors=True)
+            job.error = f"{type(e).__name__}: {e}"
+        job.finished_at = time.time()
+        with self._lock:
+            self._in_flight.pop(job.key, None)
+        if self.on_finish is not None:
+            self.on_finish(job)
+
+    def _remember(self, job):
+        self._jobs[job.id] = job
+        while len(self._jobs) > self.max_jobs:
+            oldest = next(iter(self._jobs.values()))
+            if oldest.key in self._in_flight and self._in_flight[oldest.key] is oldest:
+                break
+            self._jobs.popitem(last=False)
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def wait(self, job, timeout=None):
+        """Block until the job finishes (or `timeout` seconds pass); returns the job."""
+        if job.future is not None:
+            try:
+                job.future.result(timeout)
+            except Exception:
+                pass
+            # The done callback may still be running in the pool's thread
+            deadline = time.time() + 1
+            while job.result is None and job.error is None and job.future.done() and time.time() < deadline:
+                time.sleep(0.001)
+        return job
+
+    def output_file(self, job, name):
+        """Path of an output file of a finished job (None if missing or evicted)."""
+        if job.status != "done" or os.path.basename(name) != name or name == RESULT_FILE:
+            return None
+        path = os.path.join(self.cache.folder(job.key), name)
+        return path if os.path.isfile(path) and job.key in self.cache else None
+
+    def pending(self):
+        with self._lock:
+            return len(self._in_flight)
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+
+def _discard(files):
+    for path in files:
+        if os.path.exists(path):
+            os.remove(path)
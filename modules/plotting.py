@@ -0,0 +1,201 @@
+
+# Rendering stage shared by the tools, kept apart from the analyses.
+#
+# Analyses only hand over plot *data*: arrays already downsampled to the
+# figure's pixel width. store_plot() saves them under a content hash, and
+# render_plot() draws the PNG once with the object-oriented Figure API
+# (no pyplot global state, so it is safe in Flask threads) and caches it.
+# matplotlib is only imported when a figure is actually drawn.
+import hashlib
+import os
+import uuid
+import numpy as np
+from .instrumentation import count, span
+
+PLOT_FOLDER = os.path.join("static", "plots")
+# Figure size in pixels (at PLOT_DPI); lines are downsampled to this width
+PLOT_WIDTH_PX = 1000
+PLOT_DPI = 100
+# Cached plot data/images kept (least recently stored or reused removed
+# first); at least twice the job cache's entries, so a cached job result
+# never points at an evicted plot (each job stores at most one plot)
+PLOT_CACHE_FILES = 512
+
+
+def pyplot(show=False):
+    """
+    matplotlib.pyplot, imported on first use. Figures that are only saved
+    (show=False) select the non-interactive Agg backend first, so no GUI
+    toolkit is loaded and headless servers/workers work.
+    """
+    import matplotlib
+
+    if not show:
+        matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    return plt
+
+
+def minmax_downsample(x, y, n_buckets=PLOT_WIDTH_PX):
+    """
+    Reduce a line to the minimum and maximum of each of `n_buckets` equal
+    index ranges, kept in their original order. Drawn at one bucket per
+    pixel column this looks identical to the full line (every spike
+    survives) with at most 2 * n_buckets points.
+    """
+    x, y = np.asarray(x), np.asarray(y)
+    n = len(y)
+    if n <= 2 * n_buckets:
+        return x, y
+    size = -(-n // n_buckets)
+    n_buckets = -(-n // size)
+    pad = n_buckets * size - n
+    padded = np.concatenate([y, np.full(pad, y[-1])]) if pad else y
+    blocks = padded.reshape(n_buckets, size)
+    offsets = np.arange(n_buckets) * size
+    lo = offsets + blocks.argmin(axis=1)
+    hi = offsets + blocks.argmax(axis=1)
+    index = np.minimum(np.sort(np.stack([lo, hi], axis=1), axis=1).ravel(), n - 1)
+    index = index[np.concatenate([[True], index[1:] != index[:-1]])]
+    return x[index], y[index]
+
+
+# --- Figure content per plot kind (draws onto a given Axes) ---
+
+def draw_ecg(ax, time, signal, peak_time, peak_signal):
+    ax.plot(time, signal, label="ECG Signal", lw=0.8)
+    ax.plot(peak_time, peak_signal, "ro", ms=3, label="Detected Beats")
+    ax.set_title("ECG Analysis")
+    ax.set_xlabel("Time (s)")
+    ax.set_ylabel("Amplitude")
+    ax.legend()
+
+
+def draw_dose_response(ax, dose, response, dose_fit, response_fit):
+    ax.scatter(dose, response, label="Experimental Data", color="blue")
+    ax.plot(dose_fit, response_fit, label="Fitted Curve", color="red")
+    ax.set_xscale("log")
+    ax.set_xlabel("Dose (µM)")
+    ax.set_ylabel("Response (%)")
+    ax.set_title("Dose-Response Curve Fit")
+    ax.legend()
+
+
+PLOT_KINDS = {
+    "ecg": (draw_ecg, (10, 4)),
+    "dose_response": (draw_dose_response, (8, 5)),
+}
+
+
+def ecg_plot_data(time, signal, peaks, width_px=PLOT_WIDTH_PX):
+    """
+    Plot data of an ECG analysis: the min/max-downsampled trace plus the
+    detected beats (also thinned to the pixel width on long recordings).
+    """
+    time, signal = np.asarray(time), np.asarray(signal)
+    t, x = minmax_downsample(time, signal, width_px)
+    peak_time, peak_signal = minmax_downsample(time[peaks], signal[peaks], width_px)
+    return {"time": t, "signal": x, "peak_time": peak_time, "peak_signal": peak_signal}
+
+
+def figure(kind, data):
+    """A standalone matplotlib Figure (not registered with pyplot) of `kind` drawn from `data`."""
+    from matplotlib.figure import Figure
+
+    draw, size = PLOT_KINDS[kind]
+    fig = Figure(figsize=size, dpi=PLOT_DPI)
+    draw(fig.add_subplot(), **data)
+    fig.tight_layout()
+    return fig
+
+
+def save_plot(kind, data, path):
+    """Render plot data to an image file (written atomically)."""
+    tmp = f"{path}.{uuid.uuid4().hex}.tmp.png"
+    with span(f"plot.render_{kind}"):
+        figure(kind, data).savefig(tmp)
+    os.replace(tmp, path)
+    return path
+
+
+def show_plot(kind, data):
+    """Display plot data in an interactive window (CLI use)."""
+    plt = pyplot(show=True)
+    draw, size = PLOT_KINDS[kind]
+    fig, ax = plt.subplots(figsize=size)
+    draw(ax, **data)
+    fig.tight_layout()
+    plt.show()
+
+
+def plot_id(kind, data):
+    """Content hash naming a plot: same kind and data -> same id."""
+    sha = hashlib.sha256(kind.encode())
+    for name in sorted(data):
+        values = np.ascontiguousarray(data[name], dtype=float)
+        sha.update(name.encode())
+        sha.update(values.tobytes())
+    return sha.hexdigest()[:32]
+
+
+def store_plot(kind, data, folder=PLOT_FOLDER):
+    """
+    Save plot data under its content hash for later rendering; returns the
+    plot id. Storing is cheap (downsampled arrays), so analyses can do it
+    unconditionally and leave the rendering to whoever asks for the image.
+    """
+    name = plot_id(kind, data)
+    path = os.path.join(folder, name + ".npz")
+    if touch_plot(name, folder):
+        return name
+    os.makedirs(folder, exist_ok=True)
+    tmp = f"{path}.{uuid.uuid4().hex}.tmp.npz"
+    np.savez(tmp, kind=kind, **data)
+    os.replace(tmp, path)
+    _prune(folder)
+    return name
+
+
+def touch_plot(name, folder=PLOT_FOLDER):
+    """Mark a stored plot as just used (eviction is by mtime); False if it does not exist."""
+    try:
+        os.utime(os.path.join(folder, name + ".npz"))
+        return True
+    except (FileNotFoundError, ValueError):
+        return False
+
+
+def render_plot(name, folder=PLOT_FOLDER):
+    """
+    PNG path of a stored plot, rendering it on first request only.
+    Returns None for unknown ids.
+    """
+    if not name.isalnum():
+        return None
+    image = os.path.join(folder, name + ".png")
+    if os.path.exists(image):
+        count("plot_cache_hits")
+        return image
+    source = os.path.join(folder, name + ".npz")
+    if not os.path.exists(source):
+        return None
+    with np.load(source) as stored:
+        kind = str(stored["kind"])
+        data = {key: stored[key] for key in stored.files if key != "kind"}
+    if kind not in PLOT_KINDS:
+        return None
+    return save_plot(kind, data, image)
+
+
+def _prune(folder, max_files=PLOT_CACHE_FILES):
+    stored = [e for e in os.scandir(folder) if e.name.endswith(".npz") and not e.name.endswith(".tmp.npz")]
+    if len(stored) <= max_files:
+        return
+    stored.sort(key=lambda entry: entry.stat().st_mtime)
+    for entry in stored[: len(stored) - max_files]:
+        for ext in (".npz", ".png"):
+            try:
+                os.remove(os.path.join(folder, entry.name[: -len(".npz")] + ext))
+            except FileNotFoundError:
+                pass
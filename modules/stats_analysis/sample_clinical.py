@@ -2,11 +2,12 @@
 import pandas as pd
 import numpy as np
 import random
+from ..tabular_io import write_table
 
 def generate_sample_clinical_data(filename="sample_clinical_data.csv", n_patients=50):
     """
     Generates randomized clinical dataset with Treatment and Control groups.
-    Saves to CSV for analysis.
+    Saves to CSV (or Parquet/Feather, by extension) for analysis.
     """
     np.random.seed(None)  # ensure different results each run
     
@@ -24,10 +25,49 @@ def generate_sample_clinical_data(filename="sample_clinical_data.csv", n_patient
         "Measurement": np.round(values, 2)
     })
     
-    data.to_csv(filename, index=False)
+    write_table(data, filename)
     print(f" Sample clinical dataset saved to {filename}")
     return data
 
+def generate_sample_trial_data(
+    filename=None,
+    n_patients=1000,
+    n_endpoints=50,
+    strata=None,
+    effect_fraction=0.2,
+    missing_fraction=0.02,
+    seed=None,
+):
+    """
+    Generates a wide multi-endpoint trial dataset: Patient_ID, Group,
+    stratification columns (default Sex and Site) and Endpoint_001... columns.
+    A fraction of the endpoints carry a true treatment effect and a few
+    values are missing. Saved to CSV/Parquet/Feather when filename is given.
+    """
+    rng = np.random.default_rng(seed)
+    if strata is None:
+        strata = {"Sex": ["F", "M"], "Site": ["Site_A", "Site_B", "Site_C"]}
+
+    data = {
+        "Patient_ID": [f"P{str(i).zfill(6)}" for i in range(1, n_patients + 1)],
+        "Group": rng.choice(["Treatment", "Control"], size=n_patients),
+    }
+    for col, levels in strata.items():
+        data[col] = rng.choice(levels, size=n_patients)
+
+    treated = (data["Group"] == "Treatment")[:, None]
+    effects = np.where(rng.random(n_endpoints) < effect_fraction, rng.normal(0, 5, n_endpoints), 0)
+    values = rng.normal(50, 10, size=(n_patients, n_endpoints)) + treated * effects
+    values[rng.random(values.shape) < missing_fraction] = np.nan
+    for j in range(n_endpoints):
+        data[f"Endpoint_{str(j + 1).zfill(3)}"] = np.round(values[:, j], 2)
+
+    df = pd.DataFrame(data)
+    if filename:
+        write_table(df, filename)
+        print(f" Sample trial dataset saved to {filename}")
+    return df
+
 if __name__ == "__main__":
     df = generate_sample_clinical_data()
     print(df.head())
@@ -1,24 +1,36 @@
 
 import pandas as pd
 from scipy import stats
-from modules.stat_analysis.sample_clinical import generate_sample_clinical_data
+from ..instrumentation import count, span
+from ..tabular_io import read_table
+from .sample_clinical import generate_sample_clinical_data
+from .stats_resampling import bootstrap_effect_ci, permutation_test
 
-def analyze_clinical_data(input_file="sample_clinical_data.csv"):
+def analyze_clinical_data(input_file="sample_clinical_data.csv", n_permutations=None, n_boot=None, seed=None, workers=1):
     """
-    Performs summary statistics and hypothesis testing on clinical dataset.
+    Performs summary statistics and hypothesis testing on clinical dataset
+    (CSV, Parquet or Feather; Group is loaded as a categorical).
+    Optionally adds a permutation test of the mean difference
+    (n_permutations) and a bootstrap CI of Hedges' g (n_boot), reproducible
+    with `seed`.
+    Returns (summary, (t_stat, p_val)); when resampling was requested a
+    third element holds the "permutation" and/or "bootstrap" results.
     """
-    try:
-        df = pd.read_csv(input_file)
-        print(f" Loaded dataset: {input_file}")
-    except FileNotFoundError:
-        print(" No dataset found, generating new sample data...")
-        df = generate_sample_clinical_data(input_file)
+    with span("clinical.load"):
+        try:
+            df = read_table(input_file)
+            print(f" Loaded dataset: {input_file}")
+        except FileNotFoundError:
+            print(" No dataset found, generating new sample data...")
+            df = generate_sample_clinical_data(input_file)
+    count("clinical_rows", len(df))
     
     print("\n First 5 rows of dataset:")
     print(df.head())
     
     # Summary statistics
-    summary = df.groupby("Group")["Measurement"].describe()
+    with span("clinical.summary"):
+        summary = df.groupby("Group", observed=True)["Measurement"].describe()
     print("\n Summary Statistics by Group:")
     print(summary)
     
@@ -27,7 +39,8 @@ def analyze_clinical_data(input_file="sample_clinical_data.csv"):
     control = df[df["Group"] == "Control"]["Measurement"]
     
     # T-test
-    t_stat, p_val = stats.ttest_ind(treatment, control, equal_var=False)
+    with span("clinical.ttest"):
+        t_stat, p_val = stats.ttest_ind(treatment, control, equal_var=False)
     print("\n Hypothesis Test (t-test, unequal variance):")
     print(f"T-statistic: {t_stat:.3f}, P-value: {p_val:.4f}")
     
@@ -35,7 +48,21 @@ def analyze_clinical_data(input_file="sample_clinical_data.csv"):
         print(" Significant difference between Treatment and Control groups.")
     else:
         print(" No significant difference detected.")
+
+    resampling = {}
+    if n_permutations:
+        with span("clinical.permutation"):
+            perm = permutation_test(treatment, control, "mean_diff", n_permutations, seed=seed, workers=workers)
+        print(f" Permutation test ({perm['n_permutations']} relabelings): P-value: {perm['p_value']:.4f}")
+        resampling["permutation"] = perm
+    if n_boot:
+        with span("clinical.bootstrap"):
+            boot = bootstrap_effect_ci(treatment, control, "hedges_g", n_boot, seed=seed, workers=workers)
+        print(f" Hedges' g: {boot['estimate']:.3f}, 95% bootstrap CI [{boot['ci_low']:.3f}, {boot['ci_high']:.3f}]")
+        resampling["bootstrap"] = boot
     
+    if resampling:
+        return summary, (t_stat, p_val), resampling
     return summary, (t_stat, p_val)
 
 if __name__ == "__main__":
@@ -0,0 +1,208 @@
+
+import numpy as np
+import pandas as pd
+from scipy import stats
+from ..tabular_io import write_table
+
+CORRECTIONS = ("bonferroni", "bh")
+
+# Elements (rows x endpoints) ranked at once; bounds the temporary arrays
+RANK_BLOCK_ELEMENTS = 2_000_000
+
+
+def adjust_pvalues(p_values, method="bh"):
+    """
+    Multiple-comparison adjusted p-values (NaNs are ignored and kept).
+    "bonferroni" multiplies by the number of tests; "bh" applies the
+    Benjamini-Hochberg step-up procedure (false discovery rate).
+    """
+    if method not in CORRECTIONS:
+        raise ValueError(f"Unknown correction {method!r}; expected one of {CORRECTIONS}")
+    p = np.asarray(p_values, dtype=float)
+    adjusted = np.full(p.shape, np.nan)
+    valid = ~np.isnan(p)
+    m = int(valid.sum())
+    if m == 0:
+        return adjusted
+    pv = p[valid]
+    if method == "bonferroni":
+        adjusted[valid] = np.minimum(pv * m, 1.0)
+    else:
+        order = np.argsort(pv)
+        scaled = pv[order] * m / np.arange(1, m + 1)
+        monotone = np.minimum.accumulate(scaled[::-1])[::-1]
+        result = np.empty(m)
+        result[order] = np.minimum(monotone, 1.0)
+        adjusted[valid] = result
+    return adjusted
+
+
+def welch_from_stats(n1, mean1, var1, n2, mean2, var2):
+    """Vectorized Welch t-test from per-group count, mean and variance. Returns (t, dof, p)."""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        a, b = var1 / n1, var2 / n2
+        t = (mean1 - mean2) / np.sqrt(a + b)
+        dof = (a + b) ** 2 / (a**2 / (n1 - 1) + b**2 / (n2 - 1))
+        p = 2 * stats.t.sf(np.abs(t), dof)
+    return t, dof, p
+
+
+def mann_whitney_from_ranks(n1, rank_sum1, n2, tie_term):
+    """
+    Vectorized two-sided Mann-Whitney U test (normal approximation with tie
+    and continuity correction, as scipy's asymptotic method) from the rank
+    sum of group 1 and the tie term sum(t**3 - t). Returns (U1, p).
+    """
+    with np.errstate(divide="ignore", invalid="ignore"):
+        n = n1 + n2
+        u1 = rank_sum1 - n1 * (n1 + 1) / 2
+        u = np.maximum(u1, n1 * n2 - u1)
+        sigma = np.sqrt(n1 * n2 / 12 * ((n + 1) - tie_term / (n * (n - 1))))
+        z = (u - n1 * n2 / 2 - 0.5) / sigma
+        p = np.clip(2 * stats.norm.sf(z), 0, 1)
+    return u1, p
+
+
+def _stratum_labels(index):
+    if isinstance(index, pd.MultiIndex):
+        return [" / ".join(map(str, key)) for key in index]
+    return [str(key) for key in index]
+
+
+def _rank_statistics(values, code_sets, in_first):
+    """
+    Per-stratum rank sums of the first group and tie terms sum(t**3 - t)
+    for every column of `values` (rows x endpoints, NaN = missing) and every
+    stratification in `code_sets` (integer stratum code per row).
+
+    Each block of columns is sorted by value once; per stratification a
+    stable sort of the small-integer codes makes each stratum a contiguous
+    run of (stratum, value)-sorted rows. Average ranks and tie sizes come
+    from running max/min of tie-group boundaries and per-stratum sums from
+    one np.add.reduceat. Returns [(rank_sums, tie_terms)] with arrays of
+    shape (n_strata, n_endpoints).
+    """
+    n, n_endpoints = values.shape
+    layouts, results = [], []
+    for codes in code_sets:
+        n_strata = int(codes.max()) + 1 if n else 0
+        counts = np.bincount(codes, minlength=n_strata)
+        starts = np.concatenate([[0], np.cumsum(counts)[:-1]]).astype(np.intp)
+        layouts.append((codes.astype(np.min_scalar_type(max(n_strata - 1, 0))), starts))
+        results.append((np.zeros((n_strata, n_endpoints)), np.zeros((n_strata, n_endpoints))))
+    if n == 0:
+        return results
+
+    block = max(1, RANK_BLOCK_ELEMENTS // n)
+    index = np.arange(n)
+    for lo in range(0, n_endpoints, block):
+        cols = np.ascontiguousarray(values[:, lo : lo + block].T)  # endpoints x rows
+        by_value = np.argsort(cols, axis=1, kind="stable")
+        for (codes, starts), (rank_sums, tie_terms) in zip(layouts, results):
+            order = np.take_along_axis(by_value, np.argsort(codes[by_value], axis=1, kind="stable"), axis=1)
+            v, c = np.take_along_axis(cols, order, axis=1), codes[order]
+            valid = ~np.isnan(v)
+
+            # Tie groups: runs of equal values within the same stratum
+            new_group = np.ones_like(valid)
+            new_group[:, 1:] = (v[:, 1:] != v[:, :-1]) | (c[:, 1:] != c[:, :-1])
+            end_group = np.ones_like(valid)
+            end_group[:, :-1] = new_group[:, 1:]
+            first = np.maximum.accumulate(np.where(new_group, index, 0), axis=1)
+            last = np.minimum.accumulate(np.where(end_group, index, n)[:, ::-1], axis=1)[:, ::-1]
+            avg_rank = (first + last) / 2 - starts[c] + 1
+            ties = last - first + 1
+
+            in_group = valid & in_first[order]
+            rank_sums[:, lo : lo + block] = np.add.reduceat(np.where(in_group, avg_rank, 0), starts, axis=1).T
+            tie_terms[:, lo : lo + block] = np.add.reduceat(np.where(valid, ties**2 - 1.0, 0), starts, axis=1).T
+    return results
+
+
+def _compare(values, groups, keys, labels, endpoints, rank_sums, tie_term):
+    """Welch + Mann-Whitney results of every endpoint within each stratum defined by `keys`."""
+    first, second = labels
+    by_cell = values.groupby(keys + [groups], observed=True, sort=True)
+    counts, means, variances = by_cell.count(), by_cell.mean(), by_cell.var()
+    strata_index = values.groupby(keys, observed=True, sort=True).size().index
+
+    def cell(frame, label):
+        return frame.xs(label, level=-1).reindex(strata_index).to_numpy(dtype=float)
+
+    n1, n2 = np.nan_to_num(cell(counts, first)), np.nan_to_num(cell(counts, second))
+    m1, m2 = cell(means, first), cell(means, second)
+    v1, v2 = cell(variances, first), cell(variances, second)
+    t, dof, p_welch = welch_from_stats(n1, m1, v1, n2, m2, v2)
+    u1, p_mw = mann_whitney_from_ranks(n1, rank_sums, n2, tie_term)
+
+    n_strata, n_endpoints = n1.shape
+    return pd.DataFrame({
+        "Stratum": np.repeat(_stratum_labels(strata_index), n_endpoints),
+        "Endpoint": np.tile(endpoints, n_strata),
+        f"n_{first}": n1.ravel().astype(int),
+        f"mean_{first}": m1.ravel(),
+        f"sd_{first}": np.sqrt(v1).ravel(),
+        f"n_{second}": n2.ravel().astype(int),
+        f"mean_{second}": m2.ravel(),
+        f"sd_{second}": np.sqrt(v2).ravel(),
+        "mean_diff": (m1 - m2).ravel(),
+        "welch_t": t.ravel(),
+        "welch_df": dof.ravel(),
+        "welch_p": p_welch.ravel(),
+        "mw_u": u1.ravel(),
+        "mw_p": p_mw.ravel(),
+    })
+
+
+def analyze_endpoints(
+    df,
+    endpoints=None,
+    group_col="Group",
+    groups=("Treatment", "Control"),
+    strata=None,
+    correction="bh",
+    results_file=None,
+):
+    """
+    Grouped summaries and Welch/Mann-Whitney tests for many endpoints x strata.
+
+    `endpoints` defaults to every numeric column. `strata` lists
+    stratification columns (a tuple/list item crosses several columns); the
+    unstratified comparison ("All") is always included. Per stratifier,
+    counts, means, variances, rank sums and tie terms of all endpoints are
+    computed with one grouped pass each (ranks share one value sort per
+    block of endpoints) and both tests are evaluated as
+    array expressions from those sufficient statistics. p-values are
+    adjusted across all rows with `correction` ("bh" or "bonferroni").
+    Returns one row per (stratifier, stratum, endpoint).
+    """
+    if endpoints is None:
+        endpoints = [c for c in df.columns if pd.api.types.is_numeric_dtype(df[c]) and c != group_col]
+    endpoints = list(endpoints)
+    df = df[df[group_col].isin(groups)]
+    values = df[endpoints].astype(float)
+    group = df[group_col].astype(str).rename(group_col)
+
+    stratifiers = [("All", [pd.Series("All", index=df.index, name="Stratum")])]
+    for item in strata or []:
+        cols = [item] if isinstance(item, str) else list(item)
+        stratifiers.append((" x ".join(cols), [df[c].astype(str) for c in cols]))
+
+    code_sets = [values.groupby(keys, observed=True, sort=True).ngroup().to_numpy() for _, keys in stratifiers]
+    rank_stats = _rank_statistics(values.to_numpy(dtype=float), code_sets, (group == groups[0]).to_numpy())
+
+    parts = []
+    for (name, keys), (rank_sums, tie_term) in zip(stratifiers, rank_stats):
+        part = _compare(values, group, keys, list(groups), endpoints, rank_sums, tie_term)
+        part.insert(0, "Stratifier", name)
+        parts.append(part)
+    results = pd.concat(parts, ignore_index=True)
+
+    results["welch_p_adj"] = adjust_pvalues(results["welch_p"], correction)
+    results["mw_p_adj"] = adjust_pvalues(results["mw_p"], correction)
+    print(f" Tested {len(endpoints)} endpoints x {len(results) // max(len(endpoints), 1)} strata ({correction} correction)")
+
+    if results_file:
+        write_table(results, results_file)
+        print(f" Endpoint results saved to {results_file}")
+    return results
@@ -0,0 +1,244 @@
+
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+from ..tabular_io import CHUNK_ROWS, iter_table_chunks
+from .stats_engine import welch_from_stats
+
+# t-digest compression (about this many centroids are kept per digest)
+COMPRESSION = 100
+DESCRIBE_QUANTILES = (0.25, 0.5, 0.75)
+DESCRIBE_COLUMNS = ["count", "mean", "std", "min", "25%", "50%", "75%", "max"]
+
+
+class TDigest:
+    """
+    Mergeable quantile sketch (merging t-digest with the k1 scale function).
+
+    Values are buffered and folded into weighted centroids when the buffer
+    fills: all points are sorted once and assigned to buckets of the scale
+    function k(q) = compression / pi * asin(2q - 1), then each bucket is
+    collapsed with np.add.reduceat. Centroids are small near the tails,
+    so extreme quantiles stay accurate. While every centroid still holds a
+    single value, quantiles are exact (linear interpolation, as pandas).
+    """
+
+    def __init__(self, compression=COMPRESSION):
+        self.compression = compression
+        self.means = np.empty(0)
+        self.weights = np.empty(0)
+        self._buffer = []
+        self.count = 0
+        self.min = np.inf
+        self.max = -np.inf
+
+    def add(self, value):
+        self._buffer.append(value)
+        self.count += 1
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+        if len(self._buffer) >= 5 * self.compression:
+            self._compress()
+
+    def add_many(self, values):
+        values = np.asarray(values, dtype=float)
+        values = values[~np.isnan(values)]
+        if len(values) == 0:
+            return
+        self._buffer.extend(values.tolist())
+        self.count += len(values)
+        self.min = min(self.min, values.min())
+        self.max = max(self.max, values.max())
+        if len(self._buffer) >= 5 * self.compression:
+            self._compress()
+
+    def merge(self, other):
+        """Fold another digest into this one."""
+        self._compress()
+        other._compress()
+        self.means = np.concatenate([self.means, other.means])
+        self.weights = np.concatenate([self.weights, other.weights])
+        self.count += other.count
+        self.min, self.max = min(self.min, other.min), max(self.max, other.max)
+        self._compress(force=True)
+        return self
+
+    def _compress(self, force=False):
+        if not self._buffer and not force:
+            return
+        means = np.concatenate([self.means, self._buffer])
+        weights = np.concatenate([self.weights, np.ones(len(self._buffer))])
+        self._buffer = []
+        order = np.argsort(means, kind="stable")
+        means, weights = means[order], weights[order]
+        if len(means) <= self.compression:
+            self.means, self.weights = means, weights
+            return
+
+        total = weights.sum()
+        cumulative = np.cumsum(weights)
+        q = (cumulative - weights / 2) / total
+        bucket = np.floor(self.compression / np.pi * np.arcsin(2 * q - 1) + self.compression / 2)
+        starts = np.flatnonzero(np.concatenate([[True], bucket[1:] != bucket[:-1]]))
+        merged_weights = np.add.reduceat(weights, starts)
+        self.means = np.add.reduceat(means * weights, starts) / merged_weights
+        self.weights = merged_weights
+
+    def quantile(self, q):
+        """Approximate quantile(s) q in [0, 1]."""
+        self._compress()
+        if self.count == 0:
+            return np.full(np.shape(q), np.nan) if np.ndim(q) else np.nan
+        if np.all(self.weights == 1):
+            return np.quantile(self.means, q)
+        centers = np.cumsum(self.weights) - self.weights / 2
+        x = np.concatenate([[0], centers, [self.count]])
+        y = np.concatenate([[self.min], self.means, [self.max]])
+        return np.interp(np.asarray(q) * self.count, x, y)
+
+
+class RunningStats:
+    """Count, Welford mean/M2, min/max and a t-digest for one group."""
+
+    def __init__(self, compression=COMPRESSION):
+        self.n = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.digest = TDigest(compression)
+
+    def update(self, value):
+        """O(1) Welford update with one value."""
+        if value != value:  # NaN
+            return
+        self.n += 1
+        delta = value - self.mean
+        self.mean += delta / self.n
+        self.m2 += delta * (value - self.mean)
+        self.digest.add(value)
+
+    def update_many(self, values):
+        """Add a batch: its moments are computed vectorized and combined with Chan's formula."""
+        values = np.asarray(values, dtype=float)
+        values = values[~np.isnan(values)]
+        if len(values):
+            self._combine(len(values), values.mean(), ((values - values.mean()) ** 2).sum())
+            self.digest.add_many(values)
+
+    def _combine(self, n, mean, m2):
+        total = self.n + n
+        delta = mean - self.mean
+        self.mean += delta * n / total
+        self.m2 += m2 + delta**2 * self.n * n / total
+        self.n = total
+
+    def merge(self, other):
+        if other.n:
+            self._combine(other.n, other.mean, other.m2)
+            self.digest.merge(other.digest)
+        return self
+
+    @property
+    def variance(self):
+        return self.m2 / (self.n - 1) if self.n > 1 else np.nan
+
+
+class ClinicalAccumulator:
+    """
+    Incremental per-group summary of a measurement column.
+
+    Rows can arrive one at a time (update) or in frames (update_frame);
+    accumulators built on separate shards combine with merge. describe()
+    reproduces df.groupby(group_col)[value_col].describe() (quantiles from
+    the t-digest) and ttest() runs Welch's test from the accumulated
+    count/mean/variance, so neither needs the raw data again.
+    """
+
+    def __init__(self, group_col="Group", value_col="Measurement", compression=COMPRESSION):
+        self.group_col = group_col
+        self.value_col = value_col
+        self.compression = compression
+        self.groups = {}
+
+    def _group(self, name):
+        if name not in self.groups:
+            self.groups[name] = RunningStats(self.compression)
+        return self.groups[name]
+
+    def update(self, group, value):
+        self._group(group).update(float(value))
+        return self
+
+    def update_frame(self, df):
+        for name, values in df.groupby(self.group_col, observed=True)[self.value_col]:
+            self._group(name).update_many(values.to_numpy(dtype=float))
+        return self
+
+    def merge(self, other):
+        for name, running in other.groups.items():
+            self._group(name).merge(running)
+        return self
+
+    @property
+    def n_rows(self):
+        return sum(running.n for running in self.groups.values())
+
+    def describe(self):
+        rows = {}
+        for name in sorted(self.groups):
+            running = self.groups[name]
+            q25, q50, q75 = running.digest.quantile(DESCRIBE_QUANTILES)
+            rows[name] = {
+                "count": float(running.n),
+                "mean": running.mean if running.n else np.nan,
+                "std": np.sqrt(running.variance),
+                "min": running.digest.min if running.n else np.nan,
+                "25%": q25,
+                "50%": q50,
+                "75%": q75,
+                "max": running.digest.max if running.n else np.nan,
+            }
+        summary = pd.DataFrame.from_dict(rows, orient="index", columns=DESCRIBE_COLUMNS)
+        summary.index.name = self.group_col
+        return summary
+
+    def ttest(self, first="Treatment", second="Control"):
+        """Welch t-test between two groups from the accumulated sufficient statistics: (t, p)."""
+        a = self.groups.get(first, RunningStats())
+        b = self.groups.get(second, RunningStats())
+        n1, n2 = np.float64(a.n), np.float64(b.n)
+        t, _, p = welch_from_stats(n1, a.mean, a.variance, n2, b.mean, b.variance)
+        return float(t), float(p)
+
+
+def _accumulate_file(path, group_col, value_col, compression, chunk_size):
+    acc = ClinicalAccumulator(group_col, value_col, compression)
+    for chunk in iter_table_chunks(path, chunk_size):
+        acc.update_frame(chunk[[group_col, value_col]])
+    return acc
+
+
+def accumulate_files(
+    paths,
+    group_col="Group",
+    value_col="Measurement",
+    compression=COMPRESSION,
+    workers=None,
+    chunk_size=CHUNK_ROWS,
+):
+    """
+    Build one accumulator per shard file (CSV/Parquet/Feather, streamed in
+    chunks) across a process pool and merge them.
+    """
+    paths = [paths] if isinstance(paths, str) else list(paths)
+    args = (group_col, value_col, compression, chunk_size)
+    if workers == 1 or len(paths) <= 1:
+        shards = [_accumulate_file(path, *args) for path in paths]
+    else:
+        n = len(paths)
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            shards = list(pool.map(_accumulate_file, paths, *([arg] * n for arg in args)))
+    merged = ClinicalAccumulator(group_col, value_col, compression)
+    for shard in shards:
+        merged.merge(shard)
+    print(f" Accumulated {merged.n_rows} measurements from {len(paths)} shard(s)")
+    return merged
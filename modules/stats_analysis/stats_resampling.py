@@ -0,0 +1,176 @@
+
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+
+# Default memory budget (MB) for one block of resampled index/value matrices
+MEMORY_MB = 64
+# Bytes per resampled element: index + gathered value + temporaries
+_BYTES_PER_ELEMENT = 32
+
+
+def mean_diff(a, b):
+    return a.mean(axis=1) - b.mean(axis=1)
+
+
+def median_diff(a, b):
+    return np.median(a, axis=1) - np.median(b, axis=1)
+
+
+def welch_t(a, b):
+    va, vb = a.var(axis=1, ddof=1) / a.shape[1], b.var(axis=1, ddof=1) / b.shape[1]
+    return mean_diff(a, b) / np.sqrt(va + vb)
+
+
+def cohens_d(a, b):
+    na, nb = a.shape[1], b.shape[1]
+    pooled = ((na - 1) * a.var(axis=1, ddof=1) + (nb - 1) * b.var(axis=1, ddof=1)) / (na + nb - 2)
+    return mean_diff(a, b) / np.sqrt(pooled)
+
+
+def hedges_g(a, b):
+    n = a.shape[1] + b.shape[1]
+    return cohens_d(a, b) * (1 - 3 / (4 * n - 9))
+
+
+# Row-wise statistics of (resamples x group_a) and (resamples x group_b) matrices
+STATISTICS = {
+    "mean_diff": mean_diff,
+    "median_diff": median_diff,
+    "welch_t": welch_t,
+    "cohens_d": cohens_d,
+    "hedges_g": hedges_g,
+}
+
+
+def _block_plan(n_resamples, row_elements, memory_mb, block_size=None):
+    """Split n_resamples into blocks whose index/value matrices fit the memory budget."""
+    if block_size is None:
+        block_size = max(1, int(memory_mb * 2**20) // (_BYTES_PER_ELEMENT * max(row_elements, 1)))
+    return [min(block_size, n_resamples - start) for start in range(0, n_resamples, block_size)]
+
+
+def _permutation_block(pooled, n_a, statistic, seed, size):
+    """Statistic of `size` random relabelings: one permutation index matrix per block."""
+    rng = np.random.default_rng(seed)
+    index = np.tile(np.arange(len(pooled)), (size, 1))
+    rng.permuted(index, axis=1, out=index)
+    values = pooled[index]
+    return STATISTICS[statistic](values[:, :n_a], values[:, n_a:])
+
+
+def _bootstrap_block(a, b, statistic, seed, size):
+    """Statistic of `size` bootstrap resamples drawn as index matrices (groups resampled separately)."""
+    rng = np.random.default_rng(seed)
+    index_a = rng.integers(0, len(a), size=(size, len(a)))
+    index_b = rng.integers(0, len(b), size=(size, len(b)))
+    return STATISTICS[statistic](a[index_a], b[index_b])
+
+
+def _run_blocks(func, args, sizes, seed, workers):
+    """
+    Run func(*args, seed, size) over blocks, in-process or across a process
+    pool. Each block gets its own child of SeedSequence(seed), so results
+    depend only on the seed and block sizes, not on the worker count.
+    """
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    if workers == 1 or len(sizes) <= 1:
+        parts = [func(*args, s, size) for s, size in zip(seeds, sizes)]
+    else:
+        n = len(sizes)
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            parts = list(pool.map(func, *([arg] * n for arg in args), seeds, sizes))
+    return np.concatenate(parts) if parts else np.empty(0)
+
+
+def _check(a, b, statistic):
+    if statistic not in STATISTICS:
+        raise ValueError(f"Unknown statistic {statistic!r}; expected one of {list(STATISTICS)}")
+    a = np.asarray(a, dtype=float)
+    b = np.asarray(b, dtype=float)
+    return a[~np.isnan(a)], b[~np.isnan(b)]
+
+
+def permutation_test(
+    a,
+    b,
+    statistic="mean_diff",
+    n_permutations=10_000,
+    alternative="two-sided",
+    seed=None,
+    memory_mb=MEMORY_MB,
+    workers=1,
+    block_size=None,
+):
+    """
+    Two-sample permutation test of `statistic` (see STATISTICS).
+
+    Group labels are reshuffled in blocks of permutation index matrices
+    sized to `memory_mb`; each block's statistics come from row-wise matrix
+    operations. Blocks can run across `workers` processes and are seeded
+    from SeedSequence(seed), so a seed reproduces the p-value exactly.
+    The p-value counts the observed labeling ((k + 1) / (n + 1)).
+    """
+    a, b = _check(a, b, statistic)
+    observed = STATISTICS[statistic](a[None, :], b[None, :])[0]
+    pooled = np.concatenate([a, b])
+    sizes = _block_plan(n_permutations, len(pooled), memory_mb, block_size)
+    null = _run_blocks(_permutation_block, (pooled, len(a), statistic), sizes, seed, workers)
+
+    if alternative == "greater":
+        extreme = null >= observed
+    elif alternative == "less":
+        extreme = null <= observed
+    elif alternative == "two-sided":
+        extreme = np.abs(null) >= abs(observed)
+    else:
+        raise ValueError("alternative must be 'two-sided', 'greater' or 'less'")
+    # Tolerance so relabelings equal to the observed one count despite rounding
+    if alternative == "two-sided":
+        extreme |= np.isclose(np.abs(null), abs(observed), rtol=1e-12, atol=0)
+    else:
+        extreme |= np.isclose(null, observed, rtol=1e-12, atol=0)
+
+    return {
+        "statistic": statistic,
+        "observed": float(observed),
+        "p_value": (int(extreme.sum()) + 1) / (len(null) + 1),
+        "n_permutations": len(null),
+        "alternative": alternative,
+    }
+
+
+def bootstrap_effect_ci(
+    a,
+    b,
+    statistic="hedges_g",
+    n_boot=10_000,
+    confidence=0.95,
+    seed=None,
+    memory_mb=MEMORY_MB,
+    workers=1,
+    block_size=None,
+):
+    """
+    Percentile bootstrap confidence interval of an effect size (see STATISTICS).
+
+    Each group is resampled with replacement using blocks of bootstrap index
+    matrices bounded by `memory_mb`, optionally across `workers` processes,
+    with per-block seeds derived from SeedSequence(seed).
+    """
+    a, b = _check(a, b, statistic)
+    estimate = STATISTICS[statistic](a[None, :], b[None, :])[0]
+    sizes = _block_plan(n_boot, len(a) + len(b), memory_mb, block_size)
+    replicates = _run_blocks(_bootstrap_block, (a, b, statistic), sizes, seed, workers)
+    replicates = replicates[np.isfinite(replicates)]
+    alpha = (1 - confidence) / 2
+    low, high = np.quantile(replicates, [alpha, 1 - alpha]) if len(replicates) else (np.nan, np.nan)
+    return {
+        "statistic": statistic,
+        "estimate": float(estimate),
+        "ci_low": float(low),
+        "ci_high": float(high),
+        "confidence": confidence,
+        "n_boot": len(replicates),
+        "std_error": float(np.std(replicates, ddof=1)) if len(replicates) > 1 else np.nan,
+    }
+
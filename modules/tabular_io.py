@@ -0,0 +1,131 @@
+
+import os
+import pandas as pd
+
+# File extension -> table format (anything else is read and written as CSV)
+TABLE_FORMATS = {
+    ".csv": "csv",
+    ".tsv": "csv",
+    ".parquet": "parquet",
+    ".pq": "parquet",
+    ".feather": "feather",
+    ".arrow": "feather",
+}
+# Compression suffixes (e.g. "x.csv.gz"); pandas handles them for CSV only
+COMPRESSION_EXTS = (".gz", ".bz2", ".xz", ".zip", ".zst")
+
+# Low-cardinality label columns loaded as pandas categoricals (per-row IDs
+# such as Patient_ID are left as strings: categories would cost memory)
+CATEGORICAL_COLUMNS = ["Group", "Modality", "Compound"]
+
+# Rows per chunk when streaming tables
+CHUNK_ROWS = 100_000
+
+
+def _extensions(path):
+    """(table extension, compression extension or "") of a file name."""
+    root, ext = os.path.splitext(str(path).lower())
+    if ext in COMPRESSION_EXTS:
+        return os.path.splitext(root)[1], ext
+    return ext, ""
+
+
+def table_format(path):
+    """
+    Format ("csv", "parquet" or "feather") of a table file from its
+    extension, looking through a compression suffix; unknown extensions
+    are CSV. Compressed Parquet/Feather files raise ValueError (both
+    formats compress internally).
+    """
+    ext, compression = _extensions(path)
+    fmt = TABLE_FORMATS.get(ext, "csv")
+    if compression and fmt != "csv":
+        raise ValueError(f"Compressed {fmt} files are not supported: {path}")
+    return fmt
+
+
+def _csv_sep(path):
+    return "\t" if _extensions(path)[0] == ".tsv" else ","
+
+
+def _categorize(df, categorical):
+    cols = [c for c in categorical or [] if c in df.columns and not isinstance(df[c].dtype, pd.CategoricalDtype)]
+    if cols:
+        df[cols] = df[cols].astype("category")
+    return df
+
+
+def read_table(path, columns=None, categorical=CATEGORICAL_COLUMNS, dtype_backend=None):
+    """
+    Read a CSV, Parquet or Feather table into a DataFrame.
+
+    Only `columns` are loaded (all when None); Parquet/Feather read them
+    column-wise without touching the rest of the file. Columns listed in
+    `categorical` that are present come back as categoricals, and
+    dtype_backend="pyarrow" keeps every column Arrow-backed.
+    """
+    fmt = table_format(path)
+    kwargs = {} if dtype_backend is None else {"dtype_backend": dtype_backend}
+    if fmt == "parquet":
+        df = pd.read_parquet(path, columns=columns, **kwargs)
+    elif fmt == "feather":
+        df = pd.read_feather(path, columns=columns, **kwargs)
+    else:
+        sep = _csv_sep(path)
+        dtype = {c: "category" for c in categorical or []}
+        df = pd.read_csv(path, sep=sep, usecols=columns, dtype=dtype, **kwargs)
+    return _categorize(df, categorical)
+
+
+def write_table(df, path, categorical=CATEGORICAL_COLUMNS):
+    """
+    Write a DataFrame as CSV, Parquet or Feather (by extension).
+    Parquet/Feather store `categorical` columns dictionary-encoded.
+    """
+    fmt = table_format(path)
+    if fmt == "csv":
+        sep = _csv_sep(path)
+        df.to_csv(path, sep=sep, index=False)
+        return path
+    df = _categorize(df.reset_index(drop=True), categorical)
+    if fmt == "parquet":
+        df.to_parquet(path, index=False)
+    else:
+        df.to_feather(path)
+    return path
+
+
+def iter_table_chunks(path, chunk_size=CHUNK_ROWS, dtype=None):
+    """
+    Yield a table as DataFrames of at most chunk_size rows with bounded memory.
+    CSV is parsed chunk-wise (`dtype` overrides inferred column types);
+    Parquet and Feather are read record batch by record batch.
+    """
+    fmt = table_format(path)
+    if fmt == "csv":
+        sep = _csv_sep(path)
+        yield from pd.read_csv(path, sep=sep, chunksize=chunk_size, dtype=dtype)
+        return
+
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    if fmt == "parquet":
+        batches = pq.ParquetFile(path).iter_batches(batch_size=chunk_size)
+    else:
+        reader = pa.ipc.open_file(pa.memory_map(str(path)))
+        batches = (
+            piece
+            for i in range(reader.num_record_batches)
+            for piece in pa.Table.from_batches([reader.get_batch(i)]).to_batches(max_chunksize=chunk_size)
+        )
+    for batch in batches:
+        df = batch.to_pandas()
+        yield df.astype(dtype) if dtype else df
+
+
+def convert_table(input_file, output_file, categorical=CATEGORICAL_COLUMNS):
+    """Convert a table between CSV, Parquet and Feather."""
+    write_table(read_table(input_file, categorical=categorical), output_file, categorical)
+    print(f" Converted {input_file} -> {output_file}")
+    return output_file
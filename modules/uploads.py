@@ -0,0 +1,87 @@
+
+import os
+import time
+
+# Upload kind -> (job task, accepted file extensions; first one is the default)
+UPLOAD_KINDS = {
+    "fasta": ("fasta", (".fasta", ".fa", ".fna", ".fastq", ".fq", ".fasta.gz", ".fa.gz", ".fastq.gz", ".fq.gz")),
+    "ecg": ("ecg_stream", (".csv", ".ecgb")),
+    "dose_response": ("dose_table", (".csv", ".tsv", ".parquet", ".feather")),
+    "dicom": ("dicom", (".dcm",)),
+}
+
+MAX_UPLOAD_BYTES = int(os.environ.get("UPLOAD_MAX_MB", 512)) * 2**20
+# Whole upload must arrive within this many seconds
+UPLOAD_TIMEOUT_SEC = float(os.environ.get("UPLOAD_TIMEOUT_SEC", 300))
+# Longest pause between body reads: the socket timeout the server must set,
+# since a client that stalls mid-body blocks inside read() (see save_stream)
+UPLOAD_STALL_SEC = float(os.environ.get("UPLOAD_STALL_SEC", 30))
+UPLOAD_CHUNK = 1 << 20
+
+
+class UploadError(ValueError):
+    """A rejected upload; `status` is the HTTP status code to answer with."""
+
+    status = 400
+
+
+class UploadTooLarge(UploadError):
+    status = 413
+
+
+class UploadTimeout(UploadError):
+    status = 408
+
+
+def upload_extension(kind, filename=None):
+    """Validated file extension for an upload of `kind` named `filename` (default: the kind's first)."""
+    if kind not in UPLOAD_KINDS:
+        raise UploadError(f"Unknown upload kind {kind!r}; expected one of {list(UPLOAD_KINDS)}")
+    extensions = UPLOAD_KINDS[kind][1]
+    if not filename:
+        return extensions[0]
+    name = filename.lower()
+    # Longest match first so "x.fasta.gz" keeps both suffixes
+    for ext in sorted(extensions, key=len, reverse=True):
+        if name.endswith(ext):
+            return ext
+    raise UploadError(f"{filename!r} is not a {kind} file ({', '.join(extensions)})")
+
+
+def save_stream(stream, path, max_bytes=MAX_UPLOAD_BYTES, timeout=UPLOAD_TIMEOUT_SEC, chunk_size=UPLOAD_CHUNK):
+    """
+    Copy a request body stream to `path` chunk by chunk, so memory stays at
+    one chunk whatever the upload size. Raises UploadTooLarge past
+    `max_bytes` and UploadTimeout when the body takes longer than `timeout`
+    seconds; the partial file is removed. Returns the number of bytes written.
+
+    `timeout` is only checked between chunks: a client that stops sending
+    mid-body blocks inside stream.read(), which only the server's socket
+    timeout can interrupt (app.py runs the development server with
+    UPLOAD_STALL_SEC; set the equivalent, e.g. gunicorn --timeout, in
+    production). Such a read timeout is reported as UploadTimeout too.
+    """
+    deadline = time.monotonic() + timeout
+    size = 0
+    try:
+        with open(path, "wb") as f:
+            while True:
+                try:
+                    chunk = stream.read(chunk_size)
+                except TimeoutError:
+                    raise UploadTimeout("Upload stalled") from None
+                if not chunk:
+                    break
+                size += len(chunk)
+                if size > max_bytes:
+                    raise UploadTooLarge(f"Upload exceeds {max_bytes // 2**20} MB")
+                if time.monotonic() > deadline:
+                    raise UploadTimeout(f"Upload took longer than {timeout:.0f} s")
+                f.write(chunk)
+    except BaseException:
+        os.remove(path)
+        raise
+    if size == 0:
+        os.remove(path)
+        raise UploadError("Empty upload")
+    return size